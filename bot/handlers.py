@@ -0,0 +1,309 @@
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from bot.models import TgUser
+from bot.outbox import MESSAGE_LIMIT, OutgoingMessage
+from bot.state import State, get_state_store
+from goals.models import Goal, GoalCategory, BoardParticipant
+
+logger = logging.getLogger(__name__)
+
+allowed_commands = ['/goals', '/create', '/cancel']
+
+# Шаги диалога создания цели (/create)
+CREATE_CATEGORY = "create_category"
+CREATE_TITLE = "create_title"
+CREATE_DESCRIPTION = "create_description"
+CREATE_DUE_DATE = "create_due_date"
+
+
+@dataclass
+class IncomingMessage:
+    """ Текстовое сообщение пользователя, независимо от способа получения (polling, webhook) """
+    chat_id: int
+    chat_type: str
+    user_id: int
+    username: Optional[str]
+    first_name: Optional[str]
+    text: str
+    # Нажатие кнопки под сообщением бота: данные кнопки, id запроса и сообщения с кнопкой
+    data: Optional[str] = None
+    callback_query_id: Optional[str] = None
+    message_id: Optional[int] = None
+
+    @classmethod
+    def from_update(cls, update) -> Optional["IncomingMessage"]:
+        """ Из `telegram.Update`; None — для обновлений без текста, которые бот не обрабатывает """
+        query = update.callback_query
+        if query is not None:
+            if query.message is None or query.data is None:
+                return None
+            chat = query.message.chat
+            return cls(chat_id=chat.id, chat_type=chat.type, user_id=query.from_user.id,
+                       username=query.from_user.username, first_name=chat.first_name, text="",
+                       data=query.data, callback_query_id=query.id, message_id=query.message.message_id)
+        message = update.message
+        if message is None or message.text is None or message.from_user is None:
+            return None
+        return cls(chat_id=message.chat.id, chat_type=message.chat.type, user_id=message.from_user.id,
+                   username=message.from_user.username, first_name=message.chat.first_name, text=message.text)
+
+    @property
+    def command(self) -> Optional[str]:
+        if not self.text.startswith("/"):
+            return None
+        return self.text.split()[0].split("@")[0][1:]
+
+
+# Ответ бота уходит через очередь исходящих сообщений (bot/outbox.py) как есть
+Reply = OutgoingMessage
+
+
+def handle(msg: IncomingMessage) -> list[Reply]:
+    """
+    Точка входа обработки сообщения: работает с БД синхронно, поэтому вызывается из пула потоков.
+    Возвращает ответы в порядке отправки.
+    """
+    replies = []
+    try:
+        if msg.data is not None:
+            handle_callback(msg, replies)
+        elif msg.command in ('start', 'help', 'cancel'):
+            handle_user_without_verification(msg, replies)
+        elif msg.chat_type == 'private':
+            handle_message(msg, replies)
+    finally:
+        close_old_connections()
+    return replies
+
+
+def get_tg_user(msg: IncomingMessage) -> TgUser:
+    tg_user, _ = TgUser.objects.get_or_create(user_ud=msg.user_id,
+                                              defaults={"chat_id": msg.chat_id, "username": msg.username})
+    return tg_user
+
+
+def handle_user_without_verification(msg: IncomingMessage, replies: list):
+    """ Проверочный код. Обрабатывать пользователя без проверки """
+    tg_user = get_tg_user(msg)
+    store = get_state_store()
+    state = store.get(msg.chat_id)
+
+    if tg_user.user:
+        send_welcome(msg, state, replies)
+
+    else:
+        replies.append(Reply(
+            msg.chat_id,
+            'Добро пожаловать!\n'
+            'Для продолжения работы необходимо привязать\n'
+            'Ваш аккаунт на сайте http://51.250.18.239/\n',
+        ))
+        tg_user.set_verification_code()
+        tg_user.save(update_fields=["verification_code"])
+        replies.append(Reply(msg.chat_id, f"Верификационный  код: {tg_user.verification_code}"))
+
+    if state is not None:
+        store.clear(msg.chat_id)
+        replies.append(Reply(tg_user.chat_id, 'Операция отменена'))
+
+
+def send_welcome(msg: IncomingMessage, state: Optional[State], replies: list):
+    """ Отправка приветственного сообщения и помощи в командах """
+    if msg.text == '/start':
+        replies.append(Reply(msg.chat_id, f"Приветствую! {msg.first_name}\n"
+                                          'Бот может работать и обрабатывает следующие команды:\n'
+                                          '/board -> выводит список досок задач\n'
+                                          '/category -> выводит список категорий\n'
+                                          '/goals -> выводит список целей\n'
+                                          '/create -> позволяет создавать новые цели\n'
+                                          '/cancel -> позволяет отменить создание цели '
+                                          '(только на этапе создания)\n'))
+
+    elif state is None and (msg.text not in allowed_commands):
+        replies.append(Reply(msg.chat_id, 'Неизвестная команда'))
+
+
+def handle_message(msg: IncomingMessage, replies: list):
+    """
+    Обработка команд и шагов диалога. Обработчик выбирается по словарю:
+    для команды — по ее тексту, для остального текста — по текущему шагу диалога в этом чате.
+    """
+    tg_user = get_tg_user(msg)
+
+    command = COMMANDS.get(msg.text)
+    if command is not None:
+        command(msg, tg_user, replies)
+        return
+
+    state = get_state_store().get(msg.chat_id)
+    step = STEPS.get(state.name) if state is not None else None
+    if step is not None and msg.text not in allowed_commands:
+        step(msg, tg_user, state, replies)
+    elif msg.text not in allowed_commands:
+        replies.append(Reply(msg.chat_id, 'Неизвестная команда'))
+
+
+def handle_callback(msg: IncomingMessage, replies: list):
+    """ Нажатие кнопки листания списка: данные вида `<список>:<смещение>` """
+    kind, _, offset = msg.data.partition(':')
+    page = PAGES.get(kind)
+    if page is not None and offset.isdigit():
+        page(msg, get_tg_user(msg), replies, int(offset))
+
+
+def list_page(msg: IncomingMessage, kind: str, queryset, offset: int, render, title: str, empty: str) -> Reply:
+    """
+    Одна страница списка одним сообщением: строки выбираются запросом с LIMIT/OFFSET
+    (на одну больше — чтобы знать, есть ли следующая страница). Каждой строке отводится равная доля
+    от MESSAGE_LIMIT, поэтому страница всегда помещается в сообщение, а границы страниц не зависят от текста.
+    При листании сообщение с кнопками редактируется, а не отправляется заново.
+    """
+    size = settings.BOT_PAGE_SIZE
+    rows = list(queryset[offset:offset + size + 1])
+    if not rows:
+        return Reply(msg.chat_id, empty, edit_message_id=msg.message_id)
+
+    header = f'{title} {offset + 1}–{offset + min(len(rows), size)}\n\n'
+    budget = (MESSAGE_LIMIT - len(header)) // size - 2
+    text = header + '\n\n'.join(truncate(render(row), budget) for row in rows[:size])
+
+    buttons = []
+    if offset > 0:
+        buttons.append(('◀ Назад', f'{kind}:{max(offset - size, 0)}'))
+    if len(rows) > size:
+        buttons.append(('Вперед ▶', f'{kind}:{offset + size}'))
+    return Reply(msg.chat_id, text, buttons=tuple(buttons), edit_message_id=msg.message_id)
+
+
+def truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def show_boards(msg: IncomingMessage, tg_user: TgUser, replies: list, offset: int = 0):
+    participants = (BoardParticipant.objects.filter(user=tg_user.user)
+                    .select_related('board').order_by('board__title', 'board_id'))
+    replies.append(list_page(msg, 'board', participants, offset,
+                             lambda item: f"Название карточек: {item.board}",
+                             "Доски", "Нет у вас Board"))
+
+
+def show_categories(msg: IncomingMessage, tg_user: TgUser, replies: list):
+    resp_categories: list[str] = [
+        f'{category.id} {category.title}'
+        for category in GoalCategory.objects.filter(
+            board__participants__user=tg_user.user_id, is_deleted=False)]
+    if resp_categories:
+        replies.append(Reply(msg.chat_id,
+                             "🏷 Ваши категории\n===================\n" + '\n'.join(resp_categories)))
+    else:
+        replies.append(Reply(msg.chat_id, 'У Вас нет ни одной категории!'))
+
+
+def show_goals(msg: IncomingMessage, tg_user: TgUser, replies: list, offset: int = 0):
+    goals = Goal.objects.filter(user=tg_user.user).select_related('category', 'user').order_by('id')
+    replies.append(list_page(msg, 'goals', goals, offset, render_goal, "Цели", "Список целей пуст."))
+
+
+def render_goal(goal: Goal) -> str:
+    return (f'Название: {goal.title},\n'
+            f'Категория: {goal.category},\n'
+            f'Описание: {goal.description},\n'
+            f'Статус: {goal.get_status_display()},\n'
+            f'Пользователь: {goal.user},\n'
+            f'Дедлайн {goal.due_date if goal.due_date else "Нет"}')
+
+
+# ===================== CREATE GOALS ===========================================
+def start_create(msg: IncomingMessage, tg_user: TgUser, replies: list):
+    categories = list(GoalCategory.objects.filter(user=tg_user.user, is_deleted=False))
+    if not categories:
+        replies.append(Reply(msg.chat_id, 'У Вас нет ни одной категории!'))
+        return
+    cat_text = ''.join(f'{cat.id}: {cat.title} \n' for cat in categories)
+    replies.append(Reply(tg_user.chat_id,
+                         f'Выберите номер категории для новой цели:\n========================\n{cat_text}'
+                         f'Или нажмите /cancel для отмены'))
+    get_state_store().set(msg.chat_id, State(CREATE_CATEGORY, {"categories": [cat.id for cat in categories]}))
+
+
+def choose_category(msg: IncomingMessage, tg_user: TgUser, state: State, replies: list):
+    category = handle_save_category(msg, tg_user, state)
+    if category is None:
+        replies.append(Reply(msg.chat_id, 'Выберите номер категории из списка или нажмите /cancel для отмены'))
+        return
+    get_state_store().set(msg.chat_id, State(CREATE_TITLE, {"category": category.id}))
+    replies.append(Reply(tg_user.chat_id, f'Выбрана категория:\n {category}.\nВведите заголовок цели.'))
+
+
+# =============== ВВОД ЗАГОЛОВКА И ЗАПРОС НА ОПИСАНИЕ =============
+def enter_title(msg: IncomingMessage, tg_user: TgUser, state: State, replies: list):
+    get_state_store().set(msg.chat_id, State(CREATE_DESCRIPTION, {**state.data, "title": msg.text}))
+    replies.append(Reply(msg.chat_id, 'Введите описание'))
+
+
+# =============== ВВОД ОПИСАНИЯ И ЗАПРОС НА ДЕДЛАЙН ===============
+def enter_description(msg: IncomingMessage, tg_user: TgUser, state: State, replies: list):
+    get_state_store().set(msg.chat_id, State(CREATE_DUE_DATE, {**state.data, "description": msg.text}))
+    replies.append(Reply(msg.chat_id, 'Введите дату дедлайна в формате ГГГГ-ММ-ДД(2022-01-01)'))
+
+
+# ============== ВВОД ДЕДЛАЙНА И СОХРАНЕНИЯ В БД ==================
+def enter_due_date(msg: IncomingMessage, tg_user: TgUser, state: State, replies: list):
+    try:
+        due_date = datetime.date.fromisoformat(msg.text.strip())
+    except ValueError:
+        replies.append(Reply(msg.chat_id, 'Введите дату дедлайна в формате ГГГГ-ММ-ДД(2022-01-01)'))
+        return
+
+    category = GoalCategory.objects.filter(user=tg_user.user, is_deleted=False, pk=state.data["category"]).first()
+    if category is None:
+        get_state_store().clear(msg.chat_id)
+        replies.append(Reply(msg.chat_id, 'Категория удалена, операция отменена'))
+        return
+
+    goal = Goal.objects.create(title=state.data["title"],
+                               user=tg_user.user,
+                               category=category,
+                               description=state.data["description"],
+                               due_date=due_date)
+    logger.info(goal)
+    get_state_store().clear(msg.chat_id)
+    replies.append(Reply(tg_user.chat_id, f'Цель: {goal.title} создана в БД'))
+# =============== END CREATE GOALS ==========================================================
+
+
+def handle_save_category(msg: IncomingMessage, tg_user: TgUser, state: State) -> Optional[GoalCategory]:
+    """ Категория для сохранения: одна из предложенных в начале диалога """
+    try:
+        category_id = int(msg.text)
+    except ValueError:
+        return None
+    if category_id not in state.data["categories"]:
+        return None
+    return GoalCategory.objects.filter(user=tg_user.user, is_deleted=False, pk=category_id).first()
+
+
+COMMANDS = {
+    '/board': show_boards,
+    '/category': show_categories,
+    '/goals': show_goals,
+    '/create': start_create,
+}
+
+STEPS = {
+    CREATE_CATEGORY: choose_category,
+    CREATE_TITLE: enter_title,
+    CREATE_DESCRIPTION: enter_description,
+    CREATE_DUE_DATE: enter_due_date,
+}
+
+PAGES = {
+    'board': show_boards,
+    'goals': show_goals,
+}
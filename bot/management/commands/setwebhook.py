@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from bot.tg.client import TgClient, TgError
+from bot.webhook import ALLOWED_UPDATES
+
+
+class Command(BaseCommand):
+    help = "Регистрирует webhook бота (адрес вида https://<домен>/bot/webhook) или, с --delete, снимает его"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", nargs="?", help="Публичный HTTPS-адрес представления bot:webhook")
+        parser.add_argument("--delete", action="store_true", help="Снять webhook и вернуться к runbot")
+        parser.add_argument("--drop-pending-updates", action="store_true",
+                            help="При снятии удалить недоставленные обновления")
+
+    def handle(self, *args, **options):
+        client = TgClient(settings.BOT_TOKEN)
+        try:
+            if options["delete"]:
+                client.delete_webhook(options["drop_pending_updates"])
+                self.stdout.write("Webhook снят")
+                return
+            if not options["url"]:
+                raise CommandError("Укажите адрес webhook или --delete")
+            if not settings.BOT_WEBHOOK_SECRET:
+                raise CommandError("Не задан BOT_WEBHOOK_SECRET")
+            client.set_webhook(options["url"], settings.BOT_WEBHOOK_SECRET, ALLOWED_UPDATES)
+        except TgError as e:
+            raise CommandError(f"Telegram отказал: {e}")
+        self.stdout.write(f"Webhook зарегистрирован: {options['url']}")
@@ -0,0 +1,26 @@
+# Generated by Django 4.1.7 on 2026-10-18 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatState',
+            fields=[
+                ('chat_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Чат ID')),
+                ('state', models.CharField(max_length=64, verbose_name='Состояние')),
+                ('data', models.JSONField(default=dict, verbose_name='Данные диалога')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='Истекает')),
+            ],
+            options={
+                'verbose_name': 'Состояние чата',
+                'verbose_name_plural': 'Состояния чатов',
+            },
+        ),
+    ]
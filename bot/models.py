@@ -32,3 +32,20 @@ class TgUser(models.Model):
         verbose_name = "Телеграм Пользователь"
         verbose_name_plural = "Телеграм Пользователи"
 
+
+class ChatState(models.Model):
+    """
+    Состояние диалога бота в чате для DatabaseStateStore (bot/state.py):
+    несколько процессов бота видят одно и то же состояние. Истекшие записи удаляются при обращении.
+    """
+    chat_id = models.BigIntegerField(verbose_name='Чат ID', primary_key=True)
+    state = models.CharField(max_length=64, verbose_name="Состояние")
+    data = models.JSONField(verbose_name="Данные диалога", default=dict)
+    expires = models.DateTimeField(verbose_name="Истекает", db_index=True)
+
+    def __str__(self):
+        return '{}: {}'.format(self.chat_id, self.state)
+
+    class Meta:
+        verbose_name = "Состояние чата"
+        verbose_name_plural = "Состояния чатов"
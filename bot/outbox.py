@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096  # символов в одном сообщении Telegram
+
+
+@dataclass
+class OutgoingMessage:
+    """ Исходящее сообщение: новое или, если задан `edit_message_id`, замена текста уже отправленного """
+    chat_id: int
+    text: str
+    buttons: tuple = ()  # кнопки под сообщением: пары (надпись, данные)
+    edit_message_id: Optional[int] = None
+
+    def can_join(self, other: "OutgoingMessage") -> bool:
+        """ Можно ли отправить `other` одним сообщением с этим """
+        return (not self.buttons and not other.buttons and self.edit_message_id is None
+                and other.edit_message_id is None and len(self.text) + len(other.text) + 2 <= MESSAGE_LIMIT)
+
+
+class TokenBucket:
+    """
+    Ограничение частоты: `rate` токенов в секунду, не больше `burst` накопленных.
+    Токен берется в долг — `reserve` возвращает, сколько ждать до отправки.
+    """
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        self.refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def wait(self) -> float:
+        """ Сколько ждать до появления токена (не забирая его) """
+        self.refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    @property
+    def full(self) -> bool:
+        self.refill()
+        return self.tokens >= self.burst
+
+
+@dataclass
+class Item:
+    message: OutgoingMessage
+    futures: list
+    enqueued: float
+    attempts: int = 0
+
+
+@dataclass
+class ChatQueue:
+    bucket: TokenBucket
+    items: deque = field(default_factory=deque)
+    scheduled: bool = False  # чат в очереди готовых или ждет своего токена/повтора
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений с ограничением частоты: общим (`rate` в секунду) и по каждому чату (`chat_rate`).
+    Сообщения одного чата уходят по порядку; подряд идущие короткие сообщения чату склеиваются в одно.
+    Очередь разбирают `workers` задач; чат попадает в очередь готовых, только когда для него есть токен,
+    поэтому ждущие чаты не занимают обработчиков.
+    Ошибка с `retry_after` (429 от Telegram) откладывает чат на указанное время, временные ошибки (`is_transient`) —
+    на экспоненциально растущую паузу со случайной добавкой; после `max_retries` попыток сообщение считается
+    неотправленным.
+    `put` возвращает future с результатом `send` — его можно ждать, можно и не ждать.
+    """
+
+    def __init__(self, send: Callable[[OutgoingMessage], Awaitable], workers: int = 4, rate: float = 30,
+                 chat_rate: float = 1, chat_burst: float = 1, max_retries: int = 5,
+                 is_transient: Callable[[Exception], bool] = None, backoff: float = 0.5, clock=time.monotonic):
+        self.send = send
+        self.workers_count = workers
+        self.bucket = TokenBucket(rate, rate, clock)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.is_transient = is_transient or (lambda error: False)
+        self.backoff = backoff
+        self.clock = clock
+        self.chats: dict[Hashable, ChatQueue] = {}
+        self.ready: Optional[asyncio.Queue] = None
+        self.workers = []
+        self.depth = 0
+        self.idle = None
+        self.next_purge = clock()
+        self.sent = self.failed = self.retries = 0
+        self.latency = deque(maxlen=1000)
+
+    def start(self) -> None:
+        """ Запуск обработчиков в текущем цикле событий; вызывается при первой постановке в очередь """
+        if self.ready is not None:
+            return
+        self.ready = asyncio.Queue()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.workers = [asyncio.create_task(self.work()) for _ in range(self.workers_count)]
+
+    def put(self, message: OutgoingMessage) -> asyncio.Future:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        chat = self.chats.get(message.chat_id)
+        if chat is None:
+            self.purge()
+            chat = self.chats[message.chat_id] = ChatQueue(TokenBucket(self.chat_rate, self.chat_burst, self.clock))
+        chat.items.append(Item(message, [future], self.clock()))
+        self.depth += 1
+        self.idle.clear()
+        if not chat.scheduled:
+            chat.scheduled = True
+            self.schedule(message.chat_id, chat.bucket.wait())
+        return future
+
+    def purge(self) -> None:
+        """ Забывает чаты без сообщений, чей лимит уже восстановился (не чаще раза в секунду) """
+        now = self.clock()
+        if now < self.next_purge:
+            return
+        self.next_purge = now + 1
+        self.chats = {chat_id: chat for chat_id, chat in self.chats.items()
+                      if chat.items or chat.scheduled or not chat.bucket.full}
+
+    def schedule(self, chat_id: Hashable, delay: float) -> None:
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self.ready.put_nowait, chat_id)
+        else:
+            self.ready.put_nowait(chat_id)
+
+    def take(self, chat: ChatQueue) -> Item:
+        """ Первое сообщение чата вместе со следующими, которые можно к нему приклеить """
+        item = chat.items.popleft()
+        while chat.items and item.message.can_join(chat.items[0].message):
+            following = chat.items.popleft()
+            message = OutgoingMessage(item.message.chat_id, f"{item.message.text}\n\n{following.message.text}")
+            item = Item(message, item.futures + following.futures, item.enqueued, item.attempts)
+        return item
+
+    async def work(self) -> None:
+        while True:
+            chat_id = await self.ready.get()
+            chat = self.chats[chat_id]
+            await asyncio.sleep(max(chat.bucket.reserve(), self.bucket.reserve()))
+            item = self.take(chat)
+            pause = 0.0
+            try:
+                result = await self.send(item.message)
+            except Exception as e:
+                delay = self.retry_delay(item, e)
+                if delay is None:
+                    logger.warning("message to chat %s not sent: %s", chat_id, e)
+                    self.done(item, error=e)
+                else:
+                    self.retries += 1
+                    chat.items.appendleft(item)
+                    pause = delay
+            else:
+                self.latency.append(self.clock() - item.enqueued)
+                self.done(item, result=result)
+            if chat.items:
+                self.schedule(chat_id, max(pause, chat.bucket.wait()))
+            else:
+                chat.scheduled = False
+
+    def retry_delay(self, item: Item, error: Exception) -> Optional[float]:
+        """ Пауза перед повтором или None, если повторять не нужно """
+        item.attempts += 1
+        if item.attempts > self.max_retries:
+            return None
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return float(retry_after)
+        if self.is_transient(error):
+            return self.backoff * 2 ** (item.attempts - 1) * random.uniform(1, 1.5)
+        return None
+
+    def done(self, item: Item, result=None, error: Exception = None) -> None:
+        for future in item.futures:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        if error is None:
+            self.sent += len(item.futures)
+        else:
+            self.failed += len(item.futures)
+        self.depth -= len(item.futures)
+        if not self.depth:
+            self.idle.set()
+
+    async def join(self) -> None:
+        """ Ожидание отправки всех сообщений из очереди """
+        if self.idle is not None:
+            await self.idle.wait()
+
+    async def close(self) -> None:
+        await self.join()
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+        self.ready = None
+
+    def stats(self) -> dict:
+        """ Глубина очереди, счетчики и задержка отправки (от постановки в очередь) по последним сообщениям """
+        latency = sorted(self.latency)
+        return {
+            "depth": self.depth,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "latency_avg": round(sum(latency) / len(latency), 4) if latency else None,
+            "latency_p95": round(latency[int(len(latency) * 0.95)], 4) if latency else None,
+        }
+
+
+class BackgroundOutbox:
+    """
+    Outbox для синхронного кода (TgClient в процессе Django): цикл событий в отдельном потоке,
+    а блокирующая отправка `send` выполняется в его пуле потоков.
+    """
+
+    def __init__(self, send: Callable[[OutgoingMessage], object], **options):
+        self.loop = asyncio.new_event_loop()
+        self.outbox = Outbox(lambda message: self.loop.run_in_executor(None, send, message), **options)
+        threading.Thread(target=self.loop.run_forever, name="tg-outbox", daemon=True).start()
+
+    def put(self, message: OutgoingMessage):
+        """ Постановка в очередь из любого потока; возвращает concurrent.futures.Future с результатом отправки """
+        async def deliver():
+            return await self.outbox.put(message)
+
+        return asyncio.run_coroutine_threadsafe(deliver(), self.loop)
+
+    def stats(self) -> dict:
+        async def collect():
+            return self.outbox.stats()
+
+        # Счетчики меняются в потоке цикла событий — читаем их там же
+        return asyncio.run_coroutine_threadsafe(collect(), self.loop).result(timeout=5)
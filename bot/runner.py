@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Hashable
+
+from django.conf import settings
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+from bot import handlers
+from bot.outbox import OutgoingMessage, Outbox
+
+logger = logging.getLogger(__name__)
+
+
+class ChatDispatcher:
+    """
+    Распределяет обновления по чатам: обновления одного чата обрабатываются строго по очереди,
+    разных чатов — параллельно, но не больше `concurrency` одновременно.
+    Для чата с необработанными обновлениями живет одна задача, которая завершается, разобрав его очередь;
+    простаивающие чаты ничего не занимают.
+    """
+
+    def __init__(self, process: Callable[[object], Awaitable], concurrency: int, max_pending: int):
+        self.process = process
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_pending = max_pending
+        self.queues: dict[Hashable, deque] = {}
+        self.tasks = set()
+        self.pending = 0
+        self.has_capacity = asyncio.Event()
+        self.has_capacity.set()
+
+    def submit(self, chat_id: Hashable, update) -> None:
+        self.pending += 1
+        if self.pending >= self.max_pending:
+            self.has_capacity.clear()
+        queue = self.queues.get(chat_id)
+        if queue is not None:
+            queue.append(update)
+            return
+        self.queues[chat_id] = deque([update])
+        task = asyncio.create_task(self.drain(chat_id))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def drain(self, chat_id: Hashable) -> None:
+        queue = self.queues[chat_id]
+        try:
+            while queue:
+                async with self.semaphore:
+                    try:
+                        await self.process(queue[0])
+                    except Exception:
+                        logger.exception("update processing failed, chat %s", chat_id)
+                queue.popleft()
+                self.pending -= 1
+                if self.pending < self.max_pending:
+                    self.has_capacity.set()
+        finally:
+            # Между проверкой пустой очереди и удалением нет await — новое обновление не потеряется
+            del self.queues[chat_id]
+
+    async def wait_capacity(self) -> None:
+        """ Ожидание, пока число необработанных обновлений не опустится ниже `max_pending` """
+        await self.has_capacity.wait()
+
+    async def join(self) -> None:
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+
+
+class BotRunner:
+    """
+    Асинхронный бот на python-telegram-bot: получает обновления long polling'ом и раздает их ChatDispatcher.
+    Обработчики (bot/handlers.py) работают с ORM синхронно, поэтому выполняются в пуле из `db_threads` потоков:
+    число одновременных соединений с БД ограничено размером пула.
+    Ответы уходят через Outbox с ограничением частоты отправки в Telegram.
+    """
+
+    def __init__(self, bot, concurrency: int = None, db_threads: int = None, max_pending: int = None,
+                 poll_timeout: int = None):
+        self.bot = bot
+        self.poll_timeout = poll_timeout or settings.BOT_POLL_TIMEOUT
+        self.concurrency = concurrency or settings.BOT_CONCURRENT_UPDATES
+        self.max_pending = max_pending or settings.BOT_MAX_PENDING_UPDATES
+        self.executor = ThreadPoolExecutor(max_workers=db_threads or settings.BOT_DB_THREADS,
+                                           thread_name_prefix="bot-db")
+        self.dispatcher = None
+        self.outbox = Outbox(self.deliver, workers=settings.BOT_OUTBOX_WORKERS, rate=settings.BOT_RATE_LIMIT,
+                             chat_rate=settings.BOT_CHAT_RATE_LIMIT, chat_burst=settings.BOT_CHAT_BURST,
+                             max_retries=settings.BOT_SEND_RETRIES, is_transient=self.is_transient)
+
+    async def run(self) -> None:
+        self.dispatcher = ChatDispatcher(self.process, self.concurrency, self.max_pending)
+        offset = 0
+        async with self.bot:
+            report = asyncio.create_task(self.report())
+            try:
+                while True:
+                    await self.dispatcher.wait_capacity()
+                    try:
+                        updates = await self.bot.get_updates(offset=offset, timeout=self.poll_timeout,
+                                                             allowed_updates=["message", "callback_query"])
+                    except RetryAfter as e:
+                        await asyncio.sleep(e.retry_after)
+                        continue
+                    except TelegramError as e:
+                        logger.warning("get_updates failed: %s", e)
+                        await asyncio.sleep(1)
+                        continue
+                    for update in updates:
+                        offset = update.update_id + 1
+                        self.submit(update)
+            finally:
+                report.cancel()
+                await self.dispatcher.join()
+                await self.outbox.close()
+                self.executor.shutdown()
+
+    async def report(self, interval: int = 60) -> None:
+        """ Периодически пишет в лог глубину очереди исходящих и задержку отправки """
+        while True:
+            await asyncio.sleep(interval)
+            logger.info("outbox %s", self.outbox.stats())
+
+    def submit(self, update) -> None:
+        chat = update.effective_chat
+        self.dispatcher.submit(chat.id if chat is not None else None, update)
+
+    async def process(self, update) -> None:
+        message = handlers.IncomingMessage.from_update(update)
+        if message is None:
+            return
+        if message.callback_query_id is not None:
+            # Без ответа на нажатие кнопка в клиенте показывает индикатор загрузки
+            await self.bot.answer_callback_query(message.callback_query_id)
+        replies = await asyncio.get_running_loop().run_in_executor(self.executor, handlers.handle, message)
+        # Ждем отправки, чтобы следующее обновление чата не обгоняло ответы на предыдущее;
+        # ошибки отправки Outbox уже записал в лог
+        await asyncio.gather(*[self.outbox.put(reply) for reply in replies], return_exceptions=True)
+
+    async def deliver(self, reply: OutgoingMessage):
+        markup = None
+        if reply.buttons:
+            markup = InlineKeyboardMarkup([[InlineKeyboardButton(text, callback_data=data)
+                                            for text, data in reply.buttons]])
+        if reply.edit_message_id is not None:
+            return await self.bot.edit_message_text(reply.text, chat_id=reply.chat_id,
+                                                    message_id=reply.edit_message_id, reply_markup=markup)
+        return await self.bot.send_message(reply.chat_id, reply.text, reply_markup=markup)
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        """ Сетевые ошибки и таймауты повторяем, отказ Telegram (400) — нет """
+        return isinstance(error, NetworkError) and not isinstance(error, BadRequest)
@@ -0,0 +1,103 @@
+import datetime
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from bot.models import ChatState
+
+
+@dataclass
+class State:
+    """ Шаг диалога в чате и накопленные на нем данные (только JSON-совместимые значения) """
+    name: str
+    data: dict = field(default_factory=dict)
+
+
+class MemoryStateStore:
+    """
+    Состояния чатов в памяти процесса: для одного процесса бота.
+    Обработчики выполняются в пуле потоков, поэтому доступ защищен блокировкой.
+    Истекшие состояния удаляются при чтении и при записи (проходом не чаще раза в `ttl`).
+    """
+
+    def __init__(self, ttl: int, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.states: dict[int, tuple[float, State]] = {}
+        self.lock = threading.Lock()
+        self.next_purge = clock() + ttl
+
+    def get(self, chat_id: int) -> Optional[State]:
+        with self.lock:
+            item = self.states.get(chat_id)
+            if item is None:
+                return None
+            expires, state = item
+            if expires <= self.clock():
+                del self.states[chat_id]
+                return None
+            return State(state.name, dict(state.data))
+
+    def set(self, chat_id: int, state: State) -> None:
+        with self.lock:
+            now = self.clock()
+            if now >= self.next_purge:
+                self.states = {key: item for key, item in self.states.items() if item[0] > now}
+                self.next_purge = now + self.ttl
+            self.states[chat_id] = (now + self.ttl, State(state.name, dict(state.data)))
+
+    def clear(self, chat_id: int) -> None:
+        with self.lock:
+            self.states.pop(chat_id, None)
+
+
+class DatabaseStateStore:
+    """
+    Состояния чатов в таблице ChatState: общие для всех процессов бота и переживают перезапуск.
+    Брошенные диалоги удаляются при записи проходом не чаще раза в `ttl`.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.next_purge = time.monotonic() + ttl
+
+    def get(self, chat_id: int) -> Optional[State]:
+        row = ChatState.objects.filter(chat_id=chat_id).first()
+        if row is None:
+            return None
+        if row.expires <= timezone.now():
+            ChatState.objects.filter(chat_id=chat_id, expires__lte=timezone.now()).delete()
+            return None
+        return State(row.state, row.data)
+
+    def set(self, chat_id: int, state: State) -> None:
+        if time.monotonic() >= self.next_purge:
+            self.next_purge = time.monotonic() + self.ttl
+            self.purge()
+        expires = timezone.now() + datetime.timedelta(seconds=self.ttl)
+        ChatState.objects.update_or_create(chat_id=chat_id,
+                                           defaults={"state": state.name, "data": state.data, "expires": expires})
+
+    def clear(self, chat_id: int) -> None:
+        ChatState.objects.filter(chat_id=chat_id).delete()
+
+    @staticmethod
+    def purge() -> int:
+        """ Удаляет истекшие состояния """
+        deleted, _ = ChatState.objects.filter(expires__lte=timezone.now()).delete()
+        return deleted
+
+
+_store = None
+
+
+def get_state_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.BOT_STATE_BACKEND)(ttl=settings.BOT_STATE_TTL)
+    return _store
@@ -1,23 +1,81 @@
+import json
+import random
+import threading
+from typing import Iterable, Optional, Union
 
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
+from bot.outbox import BackgroundOutbox, OutgoingMessage
 from bot.tg.schemas import GetUpdatesResponse, SendMessageResponse
 
+_outboxes: dict[tuple[str, str], BackgroundOutbox] = {}
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+# Схемы marshmallow строятся один раз: создание Schema() дороже самого разбора ответа
+GET_UPDATES_SCHEMA = GetUpdatesResponse.Schema()
+SEND_MESSAGE_SCHEMA = SendMessageResponse.Schema()
+
+
+class TgError(Exception):
+    """ Отказ Telegram API: `retry_after` задан для 429 Too Many Requests """
+
+    def __init__(self, response: dict):
+        super().__init__(response.get("description"))
+        self.error_code: Optional[int] = response.get("error_code")
+        self.retry_after: Optional[int] = (response.get("parameters") or {}).get("retry_after")
+
+
+class JitterRetry(Retry):
+    """ Повторы со случайной добавкой к паузе, чтобы клиенты не повторяли запросы одновременно """
+
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * random.uniform(1, 1.5)
+
+
+def get_session() -> requests.Session:
+    """
+    Общая для процесса HTTP-сессия к Telegram: соединения keep-alive переиспользуются из пула
+    на BOT_HTTP_POOL_SIZE соединений. Повторяются неудачные соединения (запрос еще не отправлен)
+    и, только для идемпотентного GET, ошибки чтения и 5xx; 429 повторяет очередь исходящих по `retry_after`.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            retry = JitterRetry(total=settings.BOT_HTTP_RETRIES, connect=settings.BOT_HTTP_RETRIES,
+                                read=settings.BOT_HTTP_RETRIES, status=settings.BOT_HTTP_RETRIES,
+                                allowed_methods=frozenset({"GET"}), status_forcelist={500, 502, 503, 504},
+                                backoff_factor=0.3, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.BOT_HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
 
 class TgClient:
-    def __init__(self, token):
+    def __init__(self, token, api_url: str = None, session: requests.Session = None):
         self.token = token
+        self.api_url = api_url or settings.BOT_API_URL
+        self.session = session or get_session()
+        self.timeout = (settings.BOT_CONNECT_TIMEOUT, settings.BOT_READ_TIMEOUT)
 
     def get_url(self, method: str) -> str:
         """ URL для запроса к Telegram боту через токен """
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return f"{self.api_url}/bot{self.token}/{method}"
 
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
         """ Получение ботом исходящих сообщений от пользователя """
         url = self.get_url("getUpdates")
-        resp = requests.get(url, params={"offset": offset, "timeout": timeout,
-                                         "allowed_updates": ["update_id", "message"]})
-        return GetUpdatesResponse.Schema().load(resp.json())
+        # Ответ long polling приходит не раньше `timeout` секунд — ждем его сверх обычного таймаута чтения
+        resp = self.session.get(url, params={"offset": offset, "timeout": timeout,
+                                             "allowed_updates": ["update_id", "message"]},
+                                timeout=(self.timeout[0], self.timeout[1] + timeout))
+        return GET_UPDATES_SCHEMA.load(resp.json())
 
     # def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
     #     """ Получение пользователем сообщений от бота """
@@ -26,7 +84,81 @@ class TgClient:
     #     return SendMessageResponse.Schema().load(resp.json())
 
     def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
-        """ Получение пользователем сообщений от бота """
-        url = self.get_url("sendMessage")
-        resp = requests.post(url, params={"chat_id": chat_id, "text": text}).json()
-        return SendMessageResponse(**resp)
\ No newline at end of file
+        """
+        Получение пользователем сообщений от бота. Сообщение уходит через общую для процесса очередь
+        с ограничением частоты (bot/outbox.py); метод ждет отправки.
+        """
+        return self.outbox.put(OutgoingMessage(chat_id, text)).result()
+
+    def send_many(self, messages: Iterable[tuple[int, str]]) -> list[Union[SendMessageResponse, Exception]]:
+        """
+        Рассылка сообщений (пары chat_id, текст): все ставятся в очередь сразу и уходят параллельно
+        по соединениям из пула с учетом лимитов. Результаты — в порядке сообщений, для неотправленных — ошибка.
+        """
+        futures = [self.outbox.put(OutgoingMessage(chat_id, text)) for chat_id, text in messages]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def post_message(self, message: OutgoingMessage) -> SendMessageResponse:
+        """ Непосредственная отправка сообщения (или замена текста отправленного), без очереди """
+        params = {"chat_id": message.chat_id, "text": message.text}
+        if message.buttons:
+            params["reply_markup"] = json.dumps({"inline_keyboard": [
+                [{"text": text, "callback_data": data} for text, data in message.buttons]]})
+        method = "sendMessage"
+        if message.edit_message_id is not None:
+            method = "editMessageText"
+            params["message_id"] = message.edit_message_id
+        return SEND_MESSAGE_SCHEMA.load(self.call(method, params))
+
+    def answer_callback_query(self, callback_query_id: str) -> None:
+        """ Ответ на нажатие кнопки — без него клиент показывает индикатор загрузки """
+        self.call("answerCallbackQuery", {"callback_query_id": callback_query_id})
+
+    def set_webhook(self, url: str, secret_token: str, allowed_updates: list[str]) -> dict:
+        return self.call("setWebhook", {"url": url, "secret_token": secret_token,
+                                        "allowed_updates": json.dumps(allowed_updates)})
+
+    def delete_webhook(self, drop_pending_updates: bool = False) -> dict:
+        return self.call("deleteWebhook", {"drop_pending_updates": json.dumps(drop_pending_updates)})
+
+    def call(self, method: str, params: dict) -> dict:
+        """ POST-запрос метода API; отказ Telegram — TgError """
+        resp = self.session.post(self.get_url(method), data=params, timeout=self.timeout).json()
+        if not resp.get("ok"):
+            raise TgError(resp)
+        return resp
+
+    @property
+    def outbox(self) -> BackgroundOutbox:
+        """ Очередь исходящих одна на процесс для каждого бота — лимиты Telegram считаются по боту """
+        key = (self.api_url, self.token)
+        with _lock:
+            if key not in _outboxes:
+                _outboxes[key] = BackgroundOutbox(self.post_message, workers=settings.BOT_OUTBOX_WORKERS,
+                                                  rate=settings.BOT_RATE_LIMIT, chat_rate=settings.BOT_CHAT_RATE_LIMIT,
+                                                  chat_burst=settings.BOT_CHAT_BURST,
+                                                  max_retries=settings.BOT_SEND_RETRIES, is_transient=is_transient)
+            return _outboxes[key]
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Повторяем ошибки сервера Telegram и неудачные соединения. Таймаут чтения — нет: сообщение
+    могло уже уйти, и повтор отправил бы его дважды.
+    """
+    if isinstance(error, TgError):
+        return error.error_code is not None and error.error_code >= 500
+    return isinstance(error, requests.ConnectionError)
+
+
+def get_outbox_stats() -> dict:
+    """ Состояние очередей исходящих этого процесса, по ботам """
+    with _lock:
+        outboxes = list(_outboxes.values())
+    return {"outboxes": [outbox.stats() for outbox in outboxes]}
@@ -4,4 +4,6 @@ from . import views
 
 urlpatterns = [
     path("verify", views.VerificationView.as_view(), name='verify'),
+    path("webhook", views.WebhookView.as_view(), name='webhook'),
+    path("outbox/stats", views.OutboxStatsView.as_view(), name='outbox_stats'),
 ]
\ No newline at end of file
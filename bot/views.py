@@ -1,11 +1,14 @@
+import hmac
+
 from django.conf import settings
-from rest_framework import permissions
+from rest_framework import permissions, status
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 
 from bot.models import TgUser
 from bot.serializers import TgUserSerializer
-from bot.tg.client import TgClient
+from bot.tg.client import TgClient, get_outbox_stats
+from bot.webhook import get_webhook_queue
 
 
 class VerificationView(GenericAPIView):
@@ -24,4 +27,37 @@ class VerificationView(GenericAPIView):
         tg_client = TgClient(settings.BOT_TOKEN)
         tg_client.send_message(tg_user.chat_id, "[verification has been completed]")
 
-        return Response(instance_s.data)
\ No newline at end of file
+        return Response(instance_s.data)
+
+
+class OutboxStatsView(GenericAPIView):
+    """ Модель представления очереди исходящих сообщений бота в этом процессе: глубина, задержка, ошибки """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_outbox_stats())
+
+
+class WebhookView(GenericAPIView):
+    """
+    Модель представления приема обновлений Telegram (webhook). Запрос подлинный, если в заголовке
+    X-Telegram-Bot-Api-Secret-Token пришел BOT_WEBHOOK_SECRET. Обновление ставится в очередь и ответ
+    возвращается сразу; при переполненной очереди — 503, и Telegram повторит доставку,
+    на неразбираемое обновление — 400.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request, *args, **kwargs):
+        secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        # Сравниваем байты: compare_digest не принимает строки с не-ASCII символами
+        if not settings.BOT_WEBHOOK_SECRET or \
+                not hmac.compare_digest(secret.encode(), settings.BOT_WEBHOOK_SECRET.encode()):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            accepted = get_webhook_queue().submit(request.data)
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        if not accepted:
+            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response()
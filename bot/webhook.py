@@ -0,0 +1,82 @@
+import logging
+import queue
+import threading
+from typing import Optional
+
+from django.conf import settings
+from telegram import Update
+
+from bot import handlers
+from bot.tg.client import TgClient
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+
+class WebhookQueue:
+    """
+    Очередь обновлений, принятых через webhook: представление только ставит обновление в очередь и сразу отвечает
+    Telegram, а обработчики (те же, что у runbot) выполняются в `workers` потоках.
+    Обновления одного чата попадают в очередь одного потока и обрабатываются по порядку.
+    Очереди ограничены: когда места нет, `submit` возвращает False и Telegram повторит доставку позже.
+    Неразбираемое обновление `submit` отклоняет с ValueError.
+    """
+
+    def __init__(self, workers: int, max_pending: int, client: TgClient = None):
+        self.client = client or TgClient(settings.BOT_TOKEN)
+        self.queues = [queue.Queue(maxsize=max(max_pending // workers, 1)) for _ in range(workers)]
+        for number, updates in enumerate(self.queues):
+            threading.Thread(target=self.work, args=(updates,), name=f"bot-webhook-{number}", daemon=True).start()
+
+    def submit(self, data: dict) -> bool:
+        try:
+            message = handlers.IncomingMessage.from_update(Update.de_json(data, None))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"malformed update: {e}") from e
+        if message is None:
+            return True
+        try:
+            self.queues[hash(message.chat_id) % len(self.queues)].put_nowait(message)
+        except queue.Full:
+            return False
+        return True
+
+    def work(self, updates: queue.Queue) -> None:
+        while True:
+            message = updates.get()
+            try:
+                self.process(message)
+            except Exception:
+                logger.exception("webhook update processing failed, chat %s", message.chat_id)
+            finally:
+                updates.task_done()
+
+    def process(self, message: handlers.IncomingMessage) -> None:
+        if message.callback_query_id is not None:
+            self.client.answer_callback_query(message.callback_query_id)
+        replies = handlers.handle(message)
+        # Ждем отправки, чтобы следующее обновление чата не обгоняло ответы на предыдущее;
+        # ошибки отправки очередь исходящих уже записала в лог
+        for future in [self.client.outbox.put(reply) for reply in replies]:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def join(self) -> None:
+        """ Ожидание обработки всех принятых обновлений """
+        for updates in self.queues:
+            updates.join()
+
+
+_queue: Optional[WebhookQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_webhook_queue() -> WebhookQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WebhookQueue(settings.BOT_WEBHOOK_WORKERS, settings.BOT_WEBHOOK_MAX_PENDING)
+        return _queue
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from goals.models import GoalCategory, Board, BoardParticipant
+from goals.models import GoalCategory, Board, BoardParticipant, CascadeTask
 
 
 @admin.register(GoalCategory)
@@ -16,3 +16,9 @@ class BoardAdmin(admin.ModelAdmin):
 @admin.register(BoardParticipant)
 class BoardParticipantAdmin(admin.ModelAdmin):
     list_display = ['board', 'user', 'role']
+
+
+@admin.register(CascadeTask)
+class CascadeTaskAdmin(admin.ModelAdmin):
+    list_display = ["board", "category", "user", "status", "processed", "total", "updated"]
+    readonly_fields = ["created", "updated"]
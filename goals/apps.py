@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GoalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'goals'
+
+    def ready(self):
+        # Сброс версий кеша списков (goals/cache.py) при изменении досок, категорий и участников
+        from goals import signals  # noqa: F401
@@ -0,0 +1,87 @@
+import datetime
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from goals.events import publish
+from goals.models import ArchivedComment, ArchivedGoal, Goal, GoalComment
+
+GOAL_COLUMNS = ("id", "created", "updated", "status", "priority", "user_id", "category_id", "board_id", "title",
+                "description", "due_date")
+COMMENT_COLUMNS = ("id", "created", "updated", "goal_id", "user_id", "board_id", "text")
+
+
+def move_rows(cursor, source, target, columns, where: str, params: list, values: Optional[dict] = None) -> list:
+    """
+    Переносит строки одним запросом `DELETE ... RETURNING` + `INSERT ... SELECT`, без загрузки в Python.
+    `values` — SQL-выражения для колонок, которые в новой таблице отличаются от исходных.
+    Возвращает (id, board_id) перенесенных строк.
+    """
+    values = values or {}
+    target_columns = list(columns) + [column for column in values if column not in columns]
+    select = [values.get(column, column) for column in target_columns]
+    cursor.execute(
+        "WITH moved AS (DELETE FROM {source} WHERE {where} RETURNING {columns}) "
+        "INSERT INTO {target} ({target_columns}) SELECT {select} FROM moved RETURNING id, board_id".format(
+            source=source._meta.db_table, target=target._meta.db_table, where=where, columns=", ".join(columns),
+            target_columns=", ".join(target_columns), select=", ".join(select),
+        ),
+        params,
+    )
+    return cursor.fetchall()
+
+
+def archive_goals(age: Optional[datetime.timedelta] = None, batch_size: Optional[int] = None,
+                  max_batches: Optional[int] = None) -> dict:
+    """
+    Переносит цели, находящиеся в архиве дольше `age` (по `updated`), вместе с их комментариями
+    в ArchivedGoal/ArchivedComment. Порциями по `batch_size` целей, каждая — в своей транзакции:
+    строки блокируются ненадолго, а занятые другой транзакцией пропускаются (`SKIP LOCKED`)
+    и переносятся следующим запуском.
+    Удаление из основных таблиц обрабатывают их триггеры: сводка доски уменьшается,
+    для синхронизации остаются записи об удаленных целях и комментариях.
+    """
+    if age is None:
+        age = datetime.timedelta(days=settings.GOALS_ARCHIVE_AFTER_DAYS)
+    batch_size = batch_size or settings.GOALS_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - age
+    report = {"goals": 0, "comments": 0, "batches": 0}
+
+    while max_batches is None or report["batches"] < max_batches:
+        with transaction.atomic(), connection.cursor() as cursor:
+            ids = list(
+                Goal.objects.select_for_update(skip_locked=True)
+                .filter(status=Goal.Status.archived, updated__lt=cutoff)
+                .order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            comments = move_rows(cursor, GoalComment, ArchivedComment, COMMENT_COLUMNS, "goal_id = ANY(%s)", [ids])
+            goals = move_rows(cursor, Goal, ArchivedGoal, GOAL_COLUMNS, "id = ANY(%s)", [ids],
+                              {"archived": "now()"})
+            by_board = defaultdict(list)
+            for goal_id, board_id in goals:
+                by_board[board_id].append(goal_id)
+            for board_id, board_ids in by_board.items():
+                publish("goal", "deleted", board_id, board_ids)
+        report["goals"] += len(goals)
+        report["comments"] += len(comments)
+        report["batches"] += 1
+    return report
+
+
+def restore_goal(archived: ArchivedGoal, status: int = Goal.Status.to_do) -> Goal:
+    """
+    Возвращает цель и ее комментарии из архива в основные таблицы с прежними id.
+    Цель получает статус `status` (по умолчанию «К выполнению») и новую дату изменения.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        goals = move_rows(cursor, ArchivedGoal, Goal, GOAL_COLUMNS, "id = %s", [archived.id],
+                          {"updated": "now()", "status": str(int(status))})
+        if goals:
+            move_rows(cursor, ArchivedComment, GoalComment, COMMENT_COLUMNS, "goal_id = %s", [archived.id])
+            publish("goal", "saved", archived.board_id, [archived.id])
+    return Goal.objects.get(id=archived.id)
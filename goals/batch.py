@@ -0,0 +1,124 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from goals.events import publish
+from goals.models import Goal, GoalCategory
+from goals.permissions import get_board_roles
+from goals.serializers import GoalBatchCreateSerializer, GoalBatchOperationSerializer, GoalBatchUpdateSerializer
+
+
+class GoalBatch:
+    """
+    Пакетное создание, редактирование и смена статуса целей.
+        - Роли пользователя, категории и изменяемые цели загружаются по одному запросу на весь пакет.
+        - Каждая операция проверяется отдельно: ошибка в одной строке не отменяет остальные.
+        - Запись выполняется через `bulk_create`/`bulk_update` в одной транзакции,
+          даты `created`/`updated` проставляются так же, как в DatesModelMixin.
+    """
+    max_operations = 500
+    batch_size = 500
+
+    def __init__(self, request):
+        self.request = request
+        self.roles = get_board_roles(request)
+        self.results = []
+        self.to_create = []
+        self.to_update = {}
+        self.update_fields = {"updated"}
+        self.touched = set()
+
+    def run(self, operations) -> list[dict]:
+        if not isinstance(operations, list):
+            raise serializers.ValidationError("Ожидается список операций")
+        if len(operations) > self.max_operations:
+            raise serializers.ValidationError(f"Не больше {self.max_operations} операций за запрос")
+
+        parsed = []
+        for index, raw in enumerate(operations):
+            s = GoalBatchOperationSerializer(data=raw)
+            if s.is_valid():
+                parsed.append((index, s.validated_data))
+            else:
+                self.results.append(self.error(index, s.errors))
+
+        context = {"request": self.request, "categories": self.load_categories(parsed)}
+        goals = self.load_goals(parsed)
+        now = timezone.now()
+        for index, operation in parsed:
+            if operation["action"] == "create":
+                self.create(index, operation, context, now)
+            else:
+                self.update(index, operation, goals, context, now)
+
+        with transaction.atomic():
+            created = Goal.objects.bulk_create([goal for _, goal in self.to_create], batch_size=self.batch_size)
+            Goal.objects.bulk_update(self.to_update.values(), fields=sorted(self.update_fields),
+                                     batch_size=self.batch_size)
+            # bulk_create/bulk_update не вызывают сигналы — одно событие на доску
+            by_board = defaultdict(list)
+            for goal in list(created) + list(self.to_update.values()):
+                by_board[goal.board_id].append(goal.id)
+            for board_id, ids in by_board.items():
+                publish("goal", "saved", board_id, ids)
+
+        self.results += [{"index": index, "status": "created", "id": goal.id}
+                         for (index, _), goal in zip(self.to_create, created)]
+        self.results += [{"index": index, "status": "updated", "id": goal.id}
+                         for index, goal in self.to_update.items()]
+        return sorted(self.results, key=lambda result: result["index"])
+
+    def load_categories(self, parsed) -> dict:
+        ids = set()
+        for _, operation in parsed:
+            category_id = operation["data"].get("category")
+            if isinstance(category_id, (int, str)) and str(category_id).isdigit():
+                ids.add(int(category_id))
+        return GoalCategory.objects.in_bulk(ids)
+
+    def load_goals(self, parsed) -> dict:
+        ids = {operation["id"] for _, operation in parsed if operation["action"] != "create"}
+        return Goal.objects.filter(board_id__in=self.roles.board_ids).in_bulk(ids)
+
+    def create(self, index: int, operation: dict, context: dict, now) -> None:
+        s = GoalBatchCreateSerializer(data=operation["data"], context=context)
+        if not s.is_valid():
+            self.results.append(self.error(index, s.errors))
+            return
+        goal = Goal(**s.validated_data, created=now, updated=now)
+        goal.board_id = goal.category.board_id
+        self.to_create.append((index, goal))
+
+    def update(self, index: int, operation: dict, goals: dict, context: dict, now) -> None:
+        goal = goals.get(operation["id"])
+        if goal is None:
+            self.results.append(self.error(index, {"id": "Цель не найдена"}))
+            return
+        if not self.roles.can_edit(goal.board_id):
+            self.results.append(self.error(index, {"id": "Недостаточно прав для изменения цели"}))
+            return
+        if goal.id in self.touched:
+            self.results.append(self.error(index, {"id": "Цель уже изменяется в этом пакете"}))
+            return
+
+        if operation["action"] == "status":
+            changes = {"status": operation["status"]}
+        else:
+            s = GoalBatchUpdateSerializer(goal, data=operation["data"], partial=True, context=context)
+            if not s.is_valid():
+                self.results.append(self.error(index, s.errors))
+                return
+            changes = s.validated_data
+
+        for field, value in changes.items():
+            setattr(goal, field, value)
+        goal.updated = now
+        self.update_fields.update(changes)
+        self.to_update[index] = goal
+        self.touched.add(goal.id)
+
+    @staticmethod
+    def error(index: int, errors) -> dict:
+        return {"index": index, "status": "error", "errors": errors}
@@ -0,0 +1,123 @@
+import datetime
+import hashlib
+import json
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from rest_framework.response import Response
+
+from goals.permissions import get_board_roles
+from goals.renderers import FastJSONRenderer
+
+CACHE_ALIAS = "goals"
+STATS_KEYS = {"hits": "goals:stats:hits", "misses": "goals:stats:misses"}
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def user_version_key(user_id) -> str:
+    return f"goals:v:user:{user_id}"
+
+
+def board_version_key(board_id) -> str:
+    return f"goals:v:board:{board_id}"
+
+
+def bump_user_versions(*user_ids) -> None:
+    """ Сбрасывает кеш, зависящий от состава досок пользователя """
+    get_cache().set_many({user_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None)
+
+
+def bump_board_versions(*board_ids) -> None:
+    """ Сбрасывает кеш, зависящий от доски и ее категорий """
+    get_cache().set_many({board_version_key(board_id): uuid.uuid4().hex for board_id in board_ids}, timeout=None)
+
+
+def get_versions(keys: list) -> dict:
+    """
+    Версии по ключам. Версия — случайный токен, а не счетчик: если ключ версии вытеснен,
+    новый токен не совпадет ни с одной старой записью, и устаревшие данные не вернутся.
+    """
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def count(stat: str) -> None:
+    cache = get_cache()
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats() -> dict:
+    cache = get_cache()
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else None
+    if hasattr(cache, "size"):
+        stats["size"] = cache.size
+        stats["max_size"] = cache.max_size
+    return stats
+
+
+class CachedListMixin:
+    """
+    Кеш списков с версионированными ключами (ставится перед ConditionalGetMixin).
+    Ключ строится из версии пользователя, версий всех его досок и пути запроса, поэтому
+    сигналы Board / GoalCategory / BoardParticipant (goals/signals.py) сбрасывают кеш
+    простым изменением версии, без поиска и удаления записей.
+    При попадании в кеш запросов к БД нет: список досок пользователя тоже кешируется по его версии.
+    """
+    cache_namespace = None
+    cache_timeout = DEFAULT_TIMEOUT  # TIMEOUT из настроек кеша
+
+    def get_user_board_ids(self, user_version: str) -> list:
+        cache = get_cache()
+        key = f"goals:boards-of:{self.request.user.pk}:{user_version}"
+        board_ids = cache.get(key)
+        if board_ids is None:
+            board_ids = sorted(get_board_roles(self.request).board_ids)
+            cache.set(key, board_ids, self.cache_timeout)
+        return board_ids
+
+    def get_cache_key(self) -> str:
+        user_key = user_version_key(self.request.user.pk)
+        user_version = get_versions([user_key])[user_key]
+        board_keys = [board_version_key(board_id) for board_id in self.get_user_board_ids(user_version)]
+        board_versions = get_versions(board_keys)
+        parts = [self.request.user.pk, user_version, self.request.get_full_path()]
+        parts += [board_versions[key] for key in board_keys]
+        digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+        return f"goals:list:{self.cache_namespace}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key()
+        entry = cache.get(key)
+        if entry is not None:
+            count("hits")
+            etag, last_modified, data = entry
+            if last_modified is not None:
+                last_modified = datetime.datetime.fromtimestamp(last_modified, tz=datetime.timezone.utc)
+            return self.conditional_response(request, etag, last_modified, lambda: Response(data))
+
+        count("misses")
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            etag, last_modified = self.validators
+            # В кеш кладутся простые структуры: данные сериализатора держат ссылки на запрос
+            data = json.loads(FastJSONRenderer().render(response.data))
+            cache.set(key, (etag, last_modified.timestamp() if last_modified else None, data), self.cache_timeout)
+        return response
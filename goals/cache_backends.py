@@ -0,0 +1,71 @@
+import pickle
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+# Размеры записей по имени кеша, как и хранилище LocMemCache, общие для всех потоков процесса
+_sizes = {}
+
+
+class SizeBoundedLocMemCache(LocMemCache):
+    """
+    LocMemCache с ограничением по объему: OPTIONS["MAX_SIZE"] — предел суммарного размера
+    сериализованных значений в байтах. При превышении вытесняются давно не читанные записи (LRU).
+    Записи больше предела не кешируются вовсе.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.max_size = int(params.get("OPTIONS", {}).get("MAX_SIZE", 64 * 1024 * 1024))
+        self._sizes = _sizes.setdefault(name, {"total": 0, "items": {}})
+
+    @property
+    def size(self) -> int:
+        return self._sizes["total"]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if len(pickle.dumps(value, self.pickle_protocol)) > self.max_size:
+            self.delete(key, version=version)
+            return
+        super().set(key, value, timeout, version)
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self._forget(key)
+        # Самые старые по чтению записи — в конце OrderedDict
+        while self._cache and self._sizes["total"] + len(value) > self.max_size:
+            old_key, _ = self._cache.popitem()
+            self._expire_info.pop(old_key, None)
+            self._forget(old_key)
+        super()._set(key, value, timeout)
+        self._remember(key)
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        with self._lock:
+            internal_key = self.make_and_validate_key(key, version=version)
+            self._forget(internal_key)
+            self._remember(internal_key)
+        return value
+
+    def _cull(self):
+        super()._cull()
+        for key in set(self._sizes["items"]) - set(self._cache):
+            self._forget(key)
+
+    def _delete(self, key):
+        self._forget(key)
+        return super()._delete(key)
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self._sizes["items"].clear()
+            self._sizes["total"] = 0
+
+    def _remember(self, key):
+        size = len(self._cache[key])
+        self._sizes["items"][key] = size
+        self._sizes["total"] += size
+
+    def _forget(self, key):
+        self._sizes["total"] -= self._sizes["items"].pop(key, 0)
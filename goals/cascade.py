@@ -0,0 +1,93 @@
+import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from goals.cache import bump_board_versions
+from goals.events import event_kind, publish
+from goals.models import Board, CascadeTask, Goal, GoalCategory
+
+
+def start_cascade(user, board: Optional[Board] = None, category: Optional[GoalCategory] = None,
+                  claimed: bool = False) -> CascadeTask:
+    """
+    Сразу помечает доску или категорию удаленной и ставит каскад в очередь.
+    С `claimed` задача создается уже взятой (`running`) — для выполнения здесь же, без воркера:
+    `claim_next_task` не заберет ее, пока она не зависнет.
+    """
+    target = board or category
+    status = CascadeTask.Status.running if claimed else CascadeTask.Status.pending
+    with transaction.atomic():
+        target.is_deleted = True
+        target.save()
+        return CascadeTask.objects.create(board=board, category=category, user=user, status=status)
+
+
+def cascade_steps(task: CascadeTask) -> list:
+    """ Оставшиеся объекты каскада и изменения для них: `[(queryset, {поле: значение}), ...]` """
+    # `updated` сдвигается и при массовом update(), иначе ETag/Last-Modified списков не изменятся
+    archive = {"status": Goal.Status.archived, "updated": Now()}
+    if task.board_id:
+        return [
+            (GoalCategory.objects.filter(board_id=task.board_id, is_deleted=False),
+             {"is_deleted": True, "updated": Now()}),
+            (Goal.objects.filter(board_id=task.board_id).exclude(status=Goal.Status.archived), archive),
+        ]
+    return [(Goal.objects.filter(category_id=task.category_id).exclude(status=Goal.Status.archived), archive)]
+
+
+def run_cascade(task: CascadeTask, chunk_size: Optional[int] = None) -> CascadeTask:
+    """
+    Выполняет каскад порциями по `chunk_size` строк, каждая — в своей короткой транзакции,
+    поэтому блокировки строк держатся недолго. Повторный запуск продолжает с места остановки.
+    """
+    chunk_size = chunk_size or settings.GOALS_CASCADE_CHUNK_SIZE
+    board_id = task.board_id or task.category.board_id
+    steps = cascade_steps(task)
+    task.status = CascadeTask.Status.running
+    task.total = task.processed + sum(queryset.count() for queryset, _ in steps)
+    task.save()
+
+    try:
+        for queryset, changes in steps:
+            while True:
+                with transaction.atomic():
+                    ids = list(queryset.order_by().values_list("id", flat=True)[:chunk_size])
+                    if not ids:
+                        break
+                    queryset.model.objects.filter(id__in=ids).update(**changes)
+                    publish(event_kind(queryset.model), "saved", board_id, ids)
+                    task.processed += len(ids)
+                    task.save(update_fields=["processed", "updated"])
+    except Exception as e:
+        task.status = CascadeTask.Status.failed
+        task.error = str(e)
+        task.save()
+        raise
+
+    # Массовый update() не вызывает сигналы — сбрасываем кеш списков доски вручную
+    bump_board_versions(board_id)
+    task.status = CascadeTask.Status.done
+    task.save()
+    return task
+
+
+def claim_next_task() -> Optional[CascadeTask]:
+    """
+    Забирает из очереди следующий каскад. `SKIP LOCKED` позволяет запускать несколько воркеров,
+    а зависшие задачи (воркер упал во время выполнения) подхватываются повторно.
+    """
+    stale = timezone.now() - datetime.timedelta(seconds=settings.GOALS_CASCADE_STALE_AFTER)
+    with transaction.atomic():
+        task = CascadeTask.objects.select_for_update(skip_locked=True).filter(
+            Q(status=CascadeTask.Status.pending) | Q(status=CascadeTask.Status.running, updated__lt=stale),
+        ).order_by("id").first()
+        if task is None:
+            return None
+        task.status = CascadeTask.Status.running
+        task.save()
+    return task
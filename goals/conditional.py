@@ -0,0 +1,70 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from goals.permissions import get_board_roles
+
+
+def make_etag(*parts) -> str:
+    """ Слабый ETag из произвольных значений: ответ эквивалентен по смыслу, а не побайтно """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return "W/" + quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET (ETag / Last-Modified) для списков и объектов.
+    Валидаторы считаются дешево — по `max(updated)` и количеству строк видимого набора —
+    и 304 Not Modified отдается до выборки и сериализации данных.
+    В ETag списка входят и роли пользователя на досках: смена участия меняет видимый набор,
+    не меняя ни одной строки в нем.
+    """
+
+    def get_etag_querysets(self) -> list:
+        """ Наборы строк, изменение которых меняет ответ списка """
+        return [self.filter_queryset(self.get_queryset())]
+
+    def get_list_validators(self):
+        roles = sorted(get_board_roles(self.request).roles.items())
+        parts = [self.request.user.pk, self.request.get_full_path(), roles]
+        last_modified = None
+        for queryset in self.get_etag_querysets():
+            stats = queryset.order_by().aggregate(last=Max("updated"), count=Count("id"))
+            parts += [stats["last"], stats["count"]]
+            if stats["last"] and (last_modified is None or stats["last"] > last_modified):
+                last_modified = stats["last"]
+        return make_etag(*parts), last_modified
+
+    def get_object_validators(self, instance):
+        parts = [self.request.user.pk, instance._meta.label, instance.pk, instance.updated,
+                 getattr(instance, "comments_count", None)]
+        return make_etag(*parts), instance.updated
+
+    def conditional_response(self, request, etag, last_modified, render):
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if response is None:
+            response = render()
+        response["ETag"] = etag
+        if last_modified_ts is not None:
+            response["Last-Modified"] = http_date(last_modified_ts)
+        # Клиент может хранить ответ, но обязан каждый раз перепроверять его по валидаторам
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.validators = self.get_list_validators()
+        return self.conditional_response(request, etag, last_modified,
+                                         lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        return self.conditional_response(request, etag, last_modified,
+                                         lambda: self.render_object(instance))
+
+    def render_object(self, instance):
+        return Response(self.get_serializer(instance).data)
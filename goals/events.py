@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import psycopg2
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Больше id в одном событии не перечисляем: клиенту все равно дешевле дозапросить изменения через `sync`
+MAX_EVENT_IDS = 100
+
+
+def event_kind(model) -> str:
+    """ Тип объекта в событии: goal, category, comment, participant, board """
+    name = model._meta.model_name
+    return {"goalcategory": "category", "goalcomment": "comment", "boardparticipant": "participant"}.get(name, name)
+
+
+def board_channel(board_id) -> str:
+    return f"board:{board_id}"
+
+
+def user_channel(user_id) -> str:
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """
+    Подписка одного потока на каналы хаба. Держит только ограниченную очередь событий:
+    простаивающее соединение не занимает ничего, кроме нее, и не обращается к БД.
+    """
+
+    def __init__(self, channels: Iterable[str], max_queue: int):
+        self.channels = set(channels)
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def put(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать — отдаем ему одно событие о полной пересинхронизации
+            self.overflowed = True
+
+
+class EventHub:
+    """
+    Внутрипроцессная шина: раскладывает события по подпискам на каналы `board:<id>` и `user:<id>`.
+    Работает в цикле событий ASGI-сервера; публиковать можно из любого потока.
+    """
+
+    def __init__(self):
+        self.channels = defaultdict(set)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, channels: Iterable[str], max_queue: int = 100) -> Subscription:
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(channels, max_queue)
+        for channel in subscription.channels:
+            self.channels[channel].add(subscription)
+        return subscription
+
+    def resubscribe(self, subscription: Subscription, channels: Iterable[str]) -> None:
+        self.unsubscribe(subscription)
+        subscription.channels = set(channels)
+        for channel in subscription.channels:
+            self.channels[channel].add(subscription)
+
+    def resync(self) -> None:
+        """ События могли потеряться (например, пропадало соединение LISTEN) — всем потокам уходит `resync` """
+        for subscription in set().union(*self.channels.values()):
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.overflowed = False
+            subscription.queue.put_nowait({"kind": "resync"})
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self.channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[channel]
+
+    def dispatch(self, event: dict) -> None:
+        """ Доставка из любого потока: само раскладывание выполняется в цикле событий """
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self.channels:
+            return
+        loop.call_soon_threadsafe(self.deliver, event)
+
+    def deliver(self, event: dict) -> None:
+        delivered = set()
+        for channel in event["channels"]:
+            for subscription in self.channels.get(channel, ()):
+                if subscription not in delivered:
+                    delivered.add(subscription)
+                    subscription.put(event)
+
+
+hub = EventHub()
+
+
+class LocalBackend:
+    """ События доходят только до потоков этого процесса: подходит для одного воркера """
+
+    def publish(self, event: dict) -> None:
+        # Подписчики узнают об изменении только после фиксации транзакции
+        transaction.on_commit(lambda: hub.dispatch(event))
+
+    async def listen(self, hub: EventHub) -> None:
+        pass
+
+
+class PostgresBackend:
+    """
+    События идут через PostgreSQL `NOTIFY` и доходят до потоков всех воркеров.
+    NOTIFY транзакционный: уведомление уходит только при фиксации. Каждый воркер держит
+    одно соединение с `LISTEN`, которое читается неблокирующе из цикла событий.
+    Если соединение пропало (перезапуск БД, таймаут простоя), оно переоткрывается с растущей паузой,
+    а потоки получают `resync`: события за время разрыва потеряны.
+    """
+    channel = "goals_events"
+    reconnect_delay = 0.5
+    max_reconnect_delay = 30
+
+    def __init__(self):
+        self.listener = None
+        self.fileno = None
+        self.loop = None
+        self.reconnecting = None
+
+    def publish(self, event: dict) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, json.dumps(event)])
+
+    def connect(self):
+        listener = psycopg2.connect(**connections[DEFAULT_DB_ALIAS].get_connection_params())
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return listener
+
+    async def listen(self, hub: EventHub) -> None:
+        loop = asyncio.get_running_loop()
+        if self.loop is loop:
+            return
+        self.listener = self.connect()
+        self.loop = loop
+        self.add_reader(hub)
+
+    def add_reader(self, hub: EventHub) -> None:
+        # Номер сокета запоминаем: у оборванного соединения его уже не спросить
+        self.fileno = self.listener.fileno()
+        self.loop.add_reader(self.fileno, self.read, hub)
+
+    def read(self, hub: EventHub) -> None:
+        try:
+            self.listener.poll()
+        except psycopg2.Error as e:
+            logger.warning("events listener connection lost: %s", e)
+            self.loop.remove_reader(self.fileno)
+            self.listener.close()
+            self.reconnecting = self.loop.create_task(self.reconnect(hub))
+            return
+        while self.listener.notifies:
+            notify = self.listener.notifies.pop(0)
+            try:
+                hub.deliver(json.loads(notify.payload))
+            except ValueError:
+                logger.warning("invalid event payload: %s", notify.payload)
+
+    async def reconnect(self, hub: EventHub) -> None:
+        delay = self.reconnect_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                self.listener = await self.loop.run_in_executor(None, self.connect)
+            except psycopg2.Error as e:
+                logger.warning("events listener reconnect failed: %s", e)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            self.add_reader(hub)
+            hub.resync()
+            return
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.GOALS_EVENTS_BACKEND)()
+    return _backend
+
+
+def publish(kind: str, action: str, board_id: int, ids: Optional[list] = None, user_ids: Iterable[int] = ()) -> None:
+    """
+    Публикует изменение объектов `kind` на доске. Событие несет только ссылки на объекты,
+    сами данные клиент получает через `goals/sync`. `user_ids` дополнительно получают событие
+    в личный канал — так участник узнает, что его добавили на доску или удалили с нее.
+    """
+    user_ids = list(user_ids)
+    event = {
+        "kind": kind,
+        "action": action,
+        "board": board_id,
+        "ids": ids if ids is not None and len(ids) <= MAX_EVENT_IDS else None,
+        "users": user_ids,
+        "channels": [board_channel(board_id)] + [user_channel(user_id) for user_id in user_ids],
+    }
+    get_backend().publish(event)
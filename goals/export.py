@@ -0,0 +1,116 @@
+import csv
+import json
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from goals.models import GoalComment
+
+CSV_COLUMNS = ["record", "id", "goal", "category", "category_title", "title", "description", "status",
+               "priority", "due_date", "user", "text", "created", "updated"]
+
+GOAL_FIELDS = {
+    "id": "id",
+    "category": "category_id",
+    "category_title": "category__title",
+    "title": "title",
+    "description": "description",
+    "status": "status",
+    "priority": "priority",
+    "due_date": "due_date",
+    "user": "user__username",
+    "created": "created",
+    "updated": "updated",
+}
+
+COMMENT_FIELDS = {
+    "id": "id",
+    "goal": "goal_id",
+    "text": "text",
+    "user": "user__username",
+    "created": "created",
+    "updated": "updated",
+}
+
+
+class Echo:
+    """ Псевдо-файл для csv.writer: строка возвращается, а не накапливается в буфере """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ExportStreamingHttpResponse(StreamingHttpResponse):
+    """
+    Потоковый ответ, который можно перебирать и синхронно (WSGI), и асинхронно (`async for`).
+    Django 4.1 под ASGI перебирает `streaming_content` прямо в цикле событий, где запросы к БД запрещены,
+    и выгрузка обрывается после заголовка. Поэтому todolist.asgi.ASGIHandler перебирает такой ответ
+    через `__aiter__`: каждая следующая часть читается в потоке запроса (`sync_to_async`),
+    там же, где работало представление и открыт серверный курсор.
+    """
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        parts = iter(self.streaming_content)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                return
+            yield part
+
+
+class BoardExport:
+    """
+    Выгрузка целей доски и их комментариев потоком.
+        - Строки читаются серверным курсором порциями по `chunk_size` (`QuerySet.iterator`)
+          и сразу отдаются клиенту, поэтому память не растет с размером доски.
+        - Читаются только нужные колонки (`values_list`), без создания объектов моделей.
+        - Цели идут в порядке индекса (board, priority, due_date): первые строки приходят
+          без сортировки всей доски, а заголовок отдается еще до запроса к БД.
+    """
+    chunk_size = 2000
+
+    def __init__(self, board_id: int, goals: QuerySet, comments: bool = True):
+        self.board_id = board_id
+        self.goals = goals.order_by("priority", "due_date", "id")
+        self.comments = comments
+
+    def rows(self) -> Iterator[list]:
+        """ Пары (тип записи, словарь полей) порциями по `chunk_size` """
+        goal_names = list(GOAL_FIELDS)
+        goals = self.goals.values_list(*GOAL_FIELDS.values()).iterator(chunk_size=self.chunk_size)
+        yield from self.chunked("goal", goal_names, goals)
+
+        if self.comments:
+            comment_names = list(COMMENT_FIELDS)
+            comments = GoalComment.objects.filter(
+                board_id=self.board_id, goal__in=self.goals.order_by().values("id"),
+            ).order_by("-id").values_list(*COMMENT_FIELDS.values()).iterator(chunk_size=self.chunk_size)
+            yield from self.chunked("comment", comment_names, comments)
+
+    def chunked(self, record: str, names: list, values) -> Iterator[list]:
+        chunk = []
+        for row in values:
+            chunk.append((record, dict(zip(names, row))))
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def csv(self) -> Iterator[str]:
+        writer = csv.DictWriter(Echo(), fieldnames=CSV_COLUMNS)
+        yield writer.writeheader()
+        for chunk in self.rows():
+            yield "".join(writer.writerow({"record": record, **fields}) for record, fields in chunk)
+
+    def ndjson(self) -> Iterator[str]:
+        yield json.dumps({"record": "export", "board": self.board_id}) + "\n"
+        for chunk in self.rows():
+            yield "".join(
+                json.dumps({"record": record, **fields}, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+                for record, fields in chunk
+            )
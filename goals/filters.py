@@ -1,6 +1,12 @@
+import re
+
 import django_filters
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
 from django.db import models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, Concat
 from django_filters import rest_framework
+from rest_framework import filters
 
 from goals.models import Goal
 
@@ -15,9 +21,52 @@ class GoalDateFilter(rest_framework.FilterSet):
             "category": ("exact", "in"),
             "status": ("exact", "in"),
             "priority": ("exact", "in"),
-            #"category__board": ("exact",),
+            "board": ("exact",),
         }
 
     filter_overrides = {
         models.DateTimeField: {"filter_class": django_filters.IsoDateTimeFilter},
     }
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск PostgreSQL по полю `search_vector` (GIN индекс, русская морфология)
+    вместо `icontains` из SearchFilter. Параметр тот же — `?search=`.
+        - Каждое слово ищется как префикс, поэтому поиск работает «по мере набора».
+        - Если не передан `?ordering=`, результаты сортируются по релевантности (`search_rank`).
+        - `?highlight=1` добавляет `search_headline` — фрагмент `search_fields` с подсвеченными совпадениями.
+    """
+    search_config = "russian"
+    highlight_param = "highlight"
+
+    def filter_queryset(self, request, queryset, view):
+        words = [word for term in self.get_search_terms(request) for word in re.findall(r"\w+", term)]
+        if not words:
+            return queryset
+
+        query = SearchQuery(" & ".join(f"{word}:*" for word in words), config=self.search_config, search_type="raw")
+        # Ранг приводится к double precision, чтобы значение без потерь проходило через курсор пагинации
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+        )
+        if request.query_params.get(self.highlight_param):
+            queryset = queryset.annotate(search_headline=SearchHeadline(
+                self.get_headline_source(view), query, config=self.search_config,
+                start_sel="<b>", stop_sel="</b>",
+            ))
+        if filters.OrderingFilter.ordering_param not in request.query_params:
+            queryset = queryset.order_by("-search_rank", *queryset.query.order_by)
+        return queryset
+
+    @staticmethod
+    def get_headline_source(view):
+        fields = getattr(view, "search_fields", None) or ["title"]
+        if len(fields) == 1:
+            return fields[0]
+        parts = []
+        for field in fields:
+            if parts:
+                parts.append(Value(". "))
+            parts.append(Coalesce(field, Value("")))
+        return Concat(*parts)
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import IO, Iterator, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from goals.events import publish
+from goals.models import Goal, GoalCategory
+from goals.serializers import GoalBatchCreateSerializer
+
+IMPORT_FIELDS = ("category", "title", "description", "status", "priority", "due_date")
+COPY_COLUMNS = ("id", "created", "updated", "status", "priority", "user_id", "category_id", "board_id", "title",
+                "description", "due_date")
+
+
+def read_rows(stream: IO[str], file_type: str) -> Iterator[tuple[int, dict]]:
+    """
+    Строки файла по одной: (номер строки, поля). Файл не читается в память целиком.
+    Понимает и выгрузку `board/<pk>/export`: записи, отличные от целей, пропускаются.
+    """
+    if file_type == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_num, None
+            continue
+        yield line_num, row
+
+
+class GoalImport:
+    """
+    Массовая загрузка целей в существующие категории.
+        - Каждая строка проверяется по правилам GoalCreateSerializer (категория не удалена,
+          роль владельца или редактора), но одним экземпляром сериализатора на весь файл.
+        - Категория загружается из БД один раз при первой встрече, роли пользователя — один раз на импорт.
+        - Корректные строки записываются через PostgreSQL `COPY` порциями по `batch_size`, каждая в своей
+          транзакции: без построения моделей и SQL на каждую строку. id заранее берутся из последовательности,
+          поэтому известны без `RETURNING`. Триггеры (поиск, сводка, синхронизация) срабатывают и на COPY.
+        - Ошибки копятся по номерам строк (не больше `max_errors`) и не останавливают загрузку.
+    """
+    batch_size = 1000
+    max_errors = 1000
+
+    def __init__(self, user, batch_size: int = None):
+        self.user = user
+        self.batch_size = batch_size or self.batch_size
+        # Сериализатору нужен только пользователь запроса: для CurrentUserDefault и get_board_roles
+        request = SimpleNamespace(user=user)
+        self.categories = {}
+        self.serializer = GoalBatchCreateSerializer(context={"request": request, "categories": self.categories})
+        self.defaults = {field: Goal._meta.get_field(field).get_default()
+                         for field in ("status", "priority", "description", "due_date")}
+        self.batch = []
+        self.created = 0
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, stream: IO[str], file_type: str) -> dict:
+        started = time.monotonic()
+        rows = 0
+        for line_num, row in read_rows(stream, file_type):
+            if isinstance(row, dict) and row.get("record", "goal") != "goal":
+                continue
+            rows += 1
+            goal = self.validate(line_num, row)
+            if goal is not None:
+                self.batch.append(goal)
+                if len(self.batch) >= self.batch_size:
+                    self.flush()
+        self.flush()
+
+        elapsed = time.monotonic() - started
+        return {
+            "rows": rows,
+            "created": self.created,
+            "errors": self.errors,
+            "error_count": self.error_count,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed) if elapsed else rows,
+        }
+
+    def validate(self, line_num: int, row) -> Optional[dict]:
+        if not isinstance(row, dict):
+            self.error(line_num, {"non_field_errors": ["Строка не разобрана"]})
+            return None
+        data = {field: row[field] for field in IMPORT_FIELDS if row.get(field) not in (None, "")}
+        self.load_category(data.get("category"))
+        try:
+            validated = self.serializer.run_validation(data)
+        except serializers.ValidationError as e:
+            self.error(line_num, e.detail)
+            return None
+        category = validated.pop("category")
+        validated.pop("user")
+        return {**self.defaults, **validated, "category_id": category.id, "board_id": category.board_id}
+
+    def load_category(self, category_id) -> None:
+        try:
+            category_id = int(category_id)
+        except (TypeError, ValueError):
+            return
+        if category_id not in self.categories:
+            # Несуществующая категория тоже запоминается (None), чтобы не искать ее повторно
+            self.categories[category_id] = GoalCategory.objects.filter(id=category_id).first()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(pg_get_serial_sequence('goals_goal', 'id')) FROM generate_series(1, %s)",
+                           [len(self.batch)])
+            ids = [row[0] for row in cursor.fetchall()]
+
+            # None пишется пустым значением — для COPY это NULL (пустые строки отброшены еще при разборе)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            by_board = defaultdict(list)
+            for goal_id, goal in zip(ids, self.batch):
+                goal.update(id=goal_id, created=now, updated=now, user_id=self.user.pk)
+                writer.writerow([goal[column] for column in COPY_COLUMNS])
+                by_board[goal["board_id"]].append(goal_id)
+            buffer.seek(0)
+            cursor.copy_expert("COPY goals_goal ({}) FROM STDIN WITH (FORMAT csv)".format(", ".join(COPY_COLUMNS)),
+                               buffer)
+
+            # COPY не вызывает сигналы — одно событие на доску
+            for board_id, board_ids in by_board.items():
+                publish("goal", "saved", board_id, board_ids)
+        self.created += len(ids)
+        self.batch = []
+
+    def error(self, line_num: int, errors) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_num, "errors": errors})
+
+
+def import_file(user, file: IO[bytes], file_type: str, batch_size: int = None) -> dict:
+    """ Импорт из бинарного файла (загрузка или открытый на диске) в кодировке UTF-8 """
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        return GoalImport(user, batch_size).run(stream, file_type)
+    finally:
+        stream.detach()
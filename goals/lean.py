@@ -0,0 +1,154 @@
+from typing import Callable, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Поля, значения которых из БД уже совпадают с их представлением в DRF
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def datetime_representation(value, tz):
+    """ То же, что DateTimeField.to_representation с форматом ISO 8601 """
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def date_representation(value, tz):
+    return value.isoformat()
+
+
+def float_representation(value, tz):
+    return float(value)
+
+
+class LeanSerializer:
+    """
+    Быстрый путь чтения для списков: строки берутся через `values_list` без создания моделей,
+    а словари собираются заранее скомпилированными функциями по полям исходного сериализатора DRF.
+    Текущий часовой пояс определяется один раз на список и передается функциям вместе со строкой.
+    Порядок и формат полей берутся у самого сериализатора, поэтому ответ совпадает побайтно.
+    Если у сериализатора есть поле, которое так не собрать (например, метод без аннотации
+    в queryset), `compile` возвращает None и список отдается обычным путем.
+    """
+    _compiled = {}
+    # Сочетаний `?fields=` может быть много — больше этого числа сборщики компилируются заново
+    max_compiled = 256
+
+    def __init__(self, columns: list[str], builders: list[tuple[str, Callable]]):
+        self.columns = columns
+        self.builders = builders
+
+    @classmethod
+    def compile(cls, serializer, queryset: QuerySet) -> Optional["LeanSerializer"]:
+        """ Сборщик для экземпляра сериализатора: учитывает и поля, оставленные `?fields=` / `?omit=` """
+        annotations = tuple(sorted(queryset.query.annotations))
+        key = (type(serializer), queryset.model, annotations, tuple(serializer.fields))
+        if key not in cls._compiled:
+            if len(cls._compiled) >= cls.max_compiled:
+                cls._compiled.clear()
+            columns = []
+            builders = cls.compile_fields(serializer, queryset.model, set(annotations), "", columns)
+            cls._compiled[key] = cls(columns, builders) if builders is not None else None
+        return cls._compiled[key]
+
+    @classmethod
+    def compile_fields(cls, serializer, model, annotations: set, prefix: str, columns: list):
+        builders = []
+        concrete = {field.name for field in model._meta.concrete_fields}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = name if field.source == "*" else field.source
+            if "." in source:
+                return None
+
+            if isinstance(field, serializers.Serializer):
+                related = model._meta.get_field(source).related_model
+                nested = cls.compile_fields(field, related, set(), f"{prefix}{source}__", columns)
+                if nested is None:
+                    return None
+                builders.append((name, cls.nested_builder(nested)))
+                continue
+
+            method = isinstance(field, serializers.SerializerMethodField)
+            if source not in annotations and (method or source not in concrete):
+                if method:
+                    # Метод читается только из одноименной аннотации (`comments_count`), иначе — обычный путь
+                    return None
+                if field.required:
+                    return None
+                # Необязательное поле без аннотации (`search_rank` без поиска) DRF пропускает — здесь так же
+                continue
+
+            if isinstance(field, serializers.DateTimeField):
+                convert = datetime_representation
+            elif isinstance(field, serializers.DateField):
+                convert = date_representation
+            elif isinstance(field, serializers.FloatField):
+                convert = float_representation
+            elif method or isinstance(field, IDENTITY_FIELDS):
+                convert = None
+            else:
+                return None
+            columns.append(prefix + source)
+            builders.append((name, cls.value_builder(len(columns) - 1, convert)))
+        return builders
+
+    @staticmethod
+    def value_builder(index: int, convert: Optional[Callable]) -> Callable:
+        if convert is None:
+            return lambda row, tz: row[index]
+
+        def build(row, tz):
+            value = row[index]
+            return None if value is None else convert(value, tz)
+        return build
+
+    @staticmethod
+    def nested_builder(builders: list) -> Callable:
+        return lambda row, tz: {name: build(row, tz) for name, build in builders}
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        """
+        Выбираются только колонки выводимых полей: без вложенного `user` нет и join с пользователями,
+        аннотации вне списка (например, подзапрос `comments_count`) не вычисляются.
+        Поля сортировки добавляются в конец — по ним KeysetPagination строит курсор.
+        """
+        columns = list(self.columns)
+        for field in list(queryset.query.order_by) + ["id"]:
+            if isinstance(field, str):
+                name = field.lstrip("-")
+                name = "id" if name == "pk" else name
+                if name not in columns:
+                    columns.append(name)
+        return queryset.values_list(*columns, named=True)
+
+    def represent(self, rows) -> list[dict]:
+        builders, tz = self.builders, timezone.get_current_timezone()
+        return [{name: build(row, tz) for name, build in builders} for row in rows]
+
+
+class LeanListMixin:
+    """ list() через LeanSerializer вместо ModelSerializer (ставится после ConditionalGetMixin) """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lean = LeanSerializer.compile(self.get_serializer(), queryset)
+        if lean is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = lean.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(lean.represent(page))
+        return Response(lean.represent(rows))
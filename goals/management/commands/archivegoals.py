@@ -0,0 +1,20 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from goals.archive import archive_goals
+
+
+class Command(BaseCommand):
+    help = "move long-archived goals and their comments to archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Сколько дней цель должна пробыть в архиве, по умолчанию GOALS_ARCHIVE_AFTER_DAYS")
+        parser.add_argument("--batch-size", type=int, default=None, help="Целей в одной транзакции")
+        parser.add_argument("--max-batches", type=int, default=None, help="Остановиться после стольких порций")
+
+    def handle(self, *args, **options):
+        age = datetime.timedelta(days=options["days"]) if options["days"] is not None else None
+        report = archive_goals(age, options["batch_size"], options["max_batches"])
+        self.stdout.write("Перенесено целей: {goals}, комментариев: {comments}, порций: {batches}".format(**report))
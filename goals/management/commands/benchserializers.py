@@ -0,0 +1,88 @@
+import datetime
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.models import User
+from goals.lean import LeanSerializer
+from goals.models import Board, Goal, GoalCategory, GoalComment
+from goals.renderers import FastJSONRenderer
+from goals.serializers import GoalSerializer
+from goals.views import goal_queryset
+
+
+class Command(BaseCommand):
+    help = "benchmark goal list serialization: ModelSerializer + JSONRenderer vs LeanSerializer + FastJSONRenderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--goals", type=int, default=1000, help="Целей на тестовой доске")
+        parser.add_argument("--repeat", type=int, default=5, help="Повторов, берется лучшее время")
+
+    def handle(self, *args, **options):
+        # Тестовые данные создаются в транзакции, которая в конце откатывается
+        with transaction.atomic():
+            queryset = self.create_goals(options["goals"])
+            before, before_body = self.measure(options["repeat"], lambda: self.drf(queryset))
+            after, after_body = self.measure(options["repeat"], lambda: self.lean(queryset))
+            transaction.set_rollback(True)
+
+        per_thousand = 1000 / options["goals"]
+        for name, timings in (("ModelSerializer + JSONRenderer", before), ("LeanSerializer + FastJSONRenderer", after)):
+            self.stdout.write("{}: выборка {:.1f} мс, сериализация {:.1f} мс, JSON {:.1f} мс, всего {:.1f} мс "
+                              "на 1000 целей".format(
+                name, *(value * 1000 * per_thousand for value in timings)))
+        self.stdout.write("Ускорение: {:.1f}x, ответы совпадают: {}".format(
+            before[3] / after[3], "да" if before_body == after_body else "НЕТ"))
+
+    @staticmethod
+    def create_goals(count: int):
+        user = User.objects.create(username="bench-serializers", first_name="Иван", email="bench@example.com")
+        board = Board.objects.create(title="bench")
+        category = GoalCategory.objects.create(title="bench", board=board, user=user)
+        now, today = timezone.now(), datetime.date.today()
+        goals = Goal.objects.bulk_create(
+            Goal(user=user, category=category, board=board, title=f"Цель {i}", description="описание " * 10,
+                 created=now, updated=now,
+                 priority=i % 4 + 1, status=i % 3 + 1, due_date=today + datetime.timedelta(days=i % 30) if i % 5 else None)
+            for i in range(count)
+        )
+        GoalComment.objects.bulk_create(
+            GoalComment(user=user, goal=goal, board=board, text="комментарий", created=now, updated=now)
+            for goal in goals[::3]
+        )
+        return goal_queryset().filter(board=board).order_by("priority", "due_date", "id")
+
+    @staticmethod
+    def measure(repeat: int, run) -> tuple:
+        best, body = None, None
+        for _ in range(repeat):
+            timings, body = run()
+            if best is None or timings[3] < best[3]:
+                best = timings
+        return best, body
+
+    @staticmethod
+    def drf(queryset) -> tuple:
+        started = time.perf_counter()
+        goals = list(queryset.all())
+        fetched = time.perf_counter()
+        data = GoalSerializer(goals, many=True).data
+        serialized = time.perf_counter()
+        body = JSONRenderer().render(data)
+        rendered = time.perf_counter()
+        return (fetched - started, serialized - fetched, rendered - serialized, rendered - started), body
+
+    @staticmethod
+    def lean(queryset) -> tuple:
+        started = time.perf_counter()
+        lean = LeanSerializer.compile(GoalSerializer(), queryset)
+        rows = list(lean.rows(queryset))
+        fetched = time.perf_counter()
+        data = lean.represent(rows)
+        serialized = time.perf_counter()
+        body = FastJSONRenderer().render(data)
+        rendered = time.perf_counter()
+        return (fetched - started, serialized - fetched, rendered - serialized, rendered - started), body
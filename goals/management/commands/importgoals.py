@@ -0,0 +1,30 @@
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.importer import import_file
+
+
+class Command(BaseCommand):
+    help = "import goals from csv or ndjson file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл с целями")
+        parser.add_argument("--user", required=True, help="Имя пользователя, от которого создаются цели")
+        parser.add_argument("--type", choices=["csv", "ndjson"], default=None,
+                            help="Формат файла, по умолчанию — по расширению")
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Строк в одной порции COPY (каждая — своя транзакция)")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError("Пользователь {} не найден".format(options["user"]))
+        file_type = options["type"] or ("csv" if options["path"].endswith(".csv") else "ndjson")
+
+        with open(options["path"], "rb") as file:
+            report = import_file(user, file, file_type, options["batch_size"])
+
+        for error in report["errors"]:
+            self.stderr.write("Строка {}: {}".format(error["line"], error["errors"]))
+        self.stdout.write("Строк: {rows}, создано: {created}, ошибок: {error_count}, "
+                          "{seconds} с, {rows_per_second} строк/с".format(**report))
@@ -0,0 +1,17 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from goals.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "delete sync tombstones older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Сколько дней хранить записи об удалениях, по умолчанию GOALS_SYNC_TOMBSTONE_DAYS")
+
+    def handle(self, *args, **options):
+        age = datetime.timedelta(days=options["days"]) if options["days"] is not None else None
+        self.stdout.write("Удалено записей: {}".format(prune_tombstones(age)))
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from goals.summary import rebuild_summary
+
+
+class Command(BaseCommand):
+    help = "rebuild board summary"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, default=None, help="Пересобрать сводку только этой доски")
+
+    def handle(self, *args, **options):
+        rows = rebuild_summary(options["board"])
+        self.stdout.write("Строк сводки: {}".format(rows))
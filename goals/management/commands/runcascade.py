@@ -0,0 +1,31 @@
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from goals.cascade import claim_next_task, run_cascade
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "run cascade worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Обработать очередь и завершиться")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Строк в одной транзакции")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Пауза при пустой очереди, секунд")
+
+    def handle(self, *args, **options):
+        while True:
+            task = claim_next_task()
+            if task is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+            try:
+                run_cascade(task, options["chunk_size"])
+                logger.info("cascade %s done: %s objects", task.id, task.processed)
+            except Exception:
+                logger.exception("cascade %s failed", task.id)
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.7 on 2026-10-18 20:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # зато индексы строятся без блокировки записи в рабочей базе
+    atomic = False
+
+    dependencies = [
+        ('goals', '0005_alter_goalcategory_board'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='board',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['title'], name='board_active_title_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='boardparticipant',
+            index=models.Index(fields=['user', 'board', 'role'], name='participant_user_board_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['category', 'status', 'priority', 'due_date'], name='goal_category_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['category', 'priority', 'due_date'], name='goal_category_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'is_deleted', 'title'], name='category_board_deleted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'title'], name='category_board_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', '-id'], name='comment_goal_id_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.1.7 on 2026-10-18 20:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+# Поисковый вектор поддерживается триггером, поэтому он актуален и для save(),
+# и для массовых update()/bulk_create(), которые обходят методы модели
+GOAL_TRIGGER = """
+CREATE FUNCTION goals_goal_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+
+UPDATE goals_goal SET search_vector =
+    setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(description, '')), 'B');
+"""
+
+CATEGORY_TRIGGER = """
+CREATE FUNCTION goals_goalcategory_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('russian', coalesce(NEW.title, ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcategory_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON goals_goalcategory
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcategory_search_vector_update();
+
+UPDATE goals_goalcategory SET search_vector = to_tsvector('russian', coalesce(title, ''));
+"""
+
+
+class Migration(migrations.Migration):
+    # GIN индексы строятся через CREATE INDEX CONCURRENTLY, как и в 0006_goal_indexes
+    atomic = False
+
+    dependencies = [
+        ('goals', '0006_goal_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunSQL(
+            GOAL_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER goals_goal_search_vector_trigger ON goals_goal;
+                DROP FUNCTION goals_goal_search_vector_update();
+            """,
+        ),
+        migrations.RunSQL(
+            CATEGORY_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER goals_goalcategory_search_vector_trigger ON goals_goalcategory;
+                DROP FUNCTION goals_goalcategory_search_vector_update();
+            """,
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goal_search_vector_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='category_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_board(apps, schema_editor):
+    # Проставляем доску целям по их категории, а комментариям — по их цели
+    GoalCategory = apps.get_model("goals", "GoalCategory")
+    Goal = apps.get_model("goals", "Goal")
+    GoalComment = apps.get_model("goals", "GoalComment")
+
+    Goal.objects.update(board_id=Subquery(
+        GoalCategory.objects.filter(id=OuterRef("category_id")).values("board_id")[:1]
+    ))
+    GoalComment.objects.update(board_id=Subquery(
+        Goal.objects.filter(id=OuterRef("goal_id")).values("board_id")[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0007_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goal_comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunPython(fill_board, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goal_comments', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.1.7 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0009_goal_board_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CascadeTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'В очереди'), (2, 'Выполняется'), (3, 'Завершено'), (4, 'Ошибка')], default=1, verbose_name='Статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего объектов')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано объектов')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+                ('board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cascade_tasks', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cascade_tasks', to='goals.goalcategory', verbose_name='Категория')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cascade_tasks', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Каскадное удаление',
+                'verbose_name_plural': 'Каскадные удаления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='cascadetask',
+            index=models.Index(condition=models.Q(('status__in', [1, 2])), fields=['id'], name='cascade_task_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 4.1.7 on 2026-10-18 20:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Сводка обновляется триггерами уровня оператора: строки, затронутые одним INSERT/UPDATE/DELETE
+# (в том числе массовым update() каскада), агрегируются в разницу по ключу сводки и применяются
+# одним upsert. Изменения, не затрагивающие ключ и просрочку (например, заголовок), сводку не трогают.
+# Просроченная цель — с датой выполнения в прошлом, не выполненная и не в архиве.
+SUMMARY_TRIGGER = """
+CREATE FUNCTION goals_board_summary_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO goals_boardsummary AS s (board_id, category_id, status, priority, count, overdue_count)
+        SELECT board_id, category_id, status, priority, count(*),
+               count(*) FILTER (WHERE due_date < CURRENT_DATE AND status NOT IN (3, 4))
+        FROM new_rows
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4
+        ON CONFLICT (board_id, category_id, status, priority) DO UPDATE
+            SET count = s.count + EXCLUDED.count, overdue_count = s.overdue_count + EXCLUDED.overdue_count;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO goals_boardsummary AS s (board_id, category_id, status, priority, count, overdue_count)
+        SELECT board_id, category_id, status, priority, sum(delta), sum(overdue)
+        FROM (
+            SELECT board_id, category_id, status, priority, 1 AS delta,
+                   ((due_date < CURRENT_DATE AND status NOT IN (3, 4)) IS TRUE)::int AS overdue
+            FROM new_rows
+            UNION ALL
+            SELECT board_id, category_id, status, priority, -1,
+                   -((due_date < CURRENT_DATE AND status NOT IN (3, 4)) IS TRUE)::int
+            FROM old_rows
+        ) AS changes
+        GROUP BY 1, 2, 3, 4
+        HAVING sum(delta) <> 0 OR sum(overdue) <> 0
+        ORDER BY 1, 2, 3, 4
+        ON CONFLICT (board_id, category_id, status, priority) DO UPDATE
+            SET count = s.count + EXCLUDED.count, overdue_count = s.overdue_count + EXCLUDED.overdue_count;
+    ELSE
+        UPDATE goals_boardsummary AS s
+        SET count = s.count - changes.count, overdue_count = s.overdue_count - changes.overdue
+        FROM (
+            SELECT board_id, category_id, status, priority, count(*) AS count,
+                   count(*) FILTER (WHERE due_date < CURRENT_DATE AND status NOT IN (3, 4)) AS overdue
+            FROM old_rows
+            GROUP BY 1, 2, 3, 4
+        ) AS changes
+        WHERE s.board_id = changes.board_id AND s.category_id = changes.category_id
+          AND s.status = changes.status AND s.priority = changes.priority;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_summary_insert
+    AFTER INSERT ON goals_goal REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_board_summary_update();
+
+CREATE TRIGGER goals_goal_summary_update
+    AFTER UPDATE ON goals_goal REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_board_summary_update();
+
+CREATE TRIGGER goals_goal_summary_delete
+    AFTER DELETE ON goals_goal REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_board_summary_update();
+
+INSERT INTO goals_boardsummary (board_id, category_id, status, priority, count, overdue_count)
+SELECT board_id, category_id, status, priority, count(*),
+       count(*) FILTER (WHERE due_date < CURRENT_DATE AND status NOT IN (3, 4))
+FROM goals_goal
+GROUP BY 1, 2, 3, 4;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_cascade_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('count', models.IntegerField(default=0, verbose_name='Целей')),
+                ('overdue_count', models.IntegerField(default=0, verbose_name='Просроченных целей')),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Сводка по доске',
+                'verbose_name_plural': 'Сводки по доскам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='boardsummary',
+            constraint=models.UniqueConstraint(fields=('board', 'category', 'status', 'priority'), name='board_summary_key'),
+        ),
+        migrations.RunSQL(
+            SUMMARY_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER goals_goal_summary_insert ON goals_goal;
+                DROP TRIGGER goals_goal_summary_update ON goals_goal;
+                DROP TRIGGER goals_goal_summary_delete ON goals_goal;
+                DROP FUNCTION goals_board_summary_update();
+            """,
+        ),
+    ]
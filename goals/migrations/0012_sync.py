@@ -0,0 +1,169 @@
+# Generated by Django 4.1.7 on 2026-10-18 20:43
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Номер текущей транзакции (xid8) проставляется в строку при любой вставке и изменении,
+# в том числе массовыми update()/bulk_create(). Синхронизация отдает строки с номером
+# не меньше xmin снимка предыдущего ответа (см. goals/sync.py)
+CHANGE_XID_TRIGGER = """
+CREATE FUNCTION goals_change_xid_update() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+""" + "".join(
+    """
+    CREATE TRIGGER {table}_change_xid_trigger
+        BEFORE INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION goals_change_xid_update();
+    """.format(table=table)
+    for table in ("goals_board", "goals_boardparticipant", "goals_goalcategory", "goals_goal", "goals_goalcomment")
+)
+
+# Объект пропадает из доски, когда его удаляют или переносят на другую доску.
+# Для участника сохраняется и сам пользователь: так он узнает, что потерял доступ к доске
+TOMBSTONE_TRIGGER = """
+CREATE FUNCTION goals_sync_tombstone_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_synctombstone (kind, object_id, board_id, user_id, change_xid, created)
+    VALUES (TG_ARGV[0], OLD.id, OLD.board_id,
+            CASE WHEN TG_ARGV[0] = 'participant' THEN OLD.user_id END,
+            pg_current_xact_id()::text::bigint, now());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_boardparticipant_tombstone_trigger
+    AFTER DELETE ON goals_boardparticipant
+    FOR EACH ROW EXECUTE FUNCTION goals_sync_tombstone_insert('participant');
+
+CREATE TRIGGER goals_goal_tombstone_trigger
+    AFTER DELETE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_sync_tombstone_insert('goal');
+
+CREATE TRIGGER goals_goal_moved_tombstone_trigger
+    AFTER UPDATE ON goals_goal
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_sync_tombstone_insert('goal');
+
+CREATE TRIGGER goals_goalcomment_tombstone_trigger
+    AFTER DELETE ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_sync_tombstone_insert('comment');
+
+CREATE TRIGGER goals_goalcomment_moved_tombstone_trigger
+    AFTER UPDATE ON goals_goalcomment
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_sync_tombstone_insert('comment');
+"""
+
+
+class Migration(migrations.Migration):
+    # Индексы по change_xid строятся через CREATE INDEX CONCURRENTLY, как и в 0006_goal_indexes
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0011_board_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('goal', 'Цель'), ('comment', 'Комментарий'), ('participant', 'Участник')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('change_xid', models.BigIntegerField(verbose_name='Транзакция изменения')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Удаленный объект',
+                'verbose_name_plural': 'Удаленные объекты',
+            },
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='change_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='boardparticipant',
+            name='change_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='change_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='change_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='change_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.RunSQL(
+            CHANGE_XID_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER goals_board_change_xid_trigger ON goals_board;
+                DROP TRIGGER goals_boardparticipant_change_xid_trigger ON goals_boardparticipant;
+                DROP TRIGGER goals_goalcategory_change_xid_trigger ON goals_goalcategory;
+                DROP TRIGGER goals_goal_change_xid_trigger ON goals_goal;
+                DROP TRIGGER goals_goalcomment_change_xid_trigger ON goals_goalcomment;
+                DROP FUNCTION goals_change_xid_update();
+            """,
+        ),
+        migrations.RunSQL(
+            TOMBSTONE_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER goals_boardparticipant_tombstone_trigger ON goals_boardparticipant;
+                DROP TRIGGER goals_goal_tombstone_trigger ON goals_goal;
+                DROP TRIGGER goals_goal_moved_tombstone_trigger ON goals_goal;
+                DROP TRIGGER goals_goalcomment_tombstone_trigger ON goals_goalcomment;
+                DROP TRIGGER goals_goalcomment_moved_tombstone_trigger ON goals_goalcomment;
+                DROP FUNCTION goals_sync_tombstone_insert();
+            """,
+        ),
+        AddIndexConcurrently(
+            model_name='board',
+            index=models.Index(fields=['change_xid'], name='board_change_xid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='boardparticipant',
+            index=models.Index(fields=['change_xid'], name='participant_change_xid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['change_xid'], name='goal_change_xid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(fields=['change_xid'], name='category_change_xid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcomment',
+            index=models.Index(fields=['change_xid'], name='comment_change_xid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='synctombstone',
+            index=models.Index(fields=['change_xid'], name='tombstone_change_xid_idx'),
+        ),
+    ]
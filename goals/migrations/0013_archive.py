@@ -0,0 +1,85 @@
+# Generated by Django 4.1.7 on 2026-10-18 21:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0012_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('text', models.TextField(verbose_name='Текст')),
+            ],
+            options={
+                'verbose_name': 'Комментарий в архиве',
+                'verbose_name_plural': 'Комментарии в архиве',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedGoal',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('archived', models.DateTimeField(verbose_name='Дата переноса в архив')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок цели')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Описание')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Дата выполнения')),
+            ],
+            options={
+                'verbose_name': 'Цель в архиве',
+                'verbose_name_plural': 'Цели в архиве',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedgoal',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='archivedgoal',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_goals', to='goals.goalcategory', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='archivedgoal',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_goals', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='goal',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='goals.archivedgoal', verbose_name='Цель'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedgoal',
+            index=models.Index(fields=['board', '-archived'], name='archived_goal_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['goal', '-id'], name='archived_comment_goal_idx'),
+        ),
+    ]
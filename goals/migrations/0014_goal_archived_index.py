@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции — поэтому отдельно от таблиц архива
+    atomic = False
+
+    dependencies = [
+        ('goals', '0013_archive'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4)), fields=['updated'], name='goal_archived_updated_idx'),
+        ),
+    ]
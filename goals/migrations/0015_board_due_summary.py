@@ -0,0 +1,130 @@
+# Generated by Django 4.1.7 on 2026-10-18 21:50
+from importlib import import_module
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Просрочка зависит от текущей даты и меняется без изменения целей, поэтому в сводке ее больше не храним:
+# триггер ведет число незавершенных целей по датам выполнения, а просрочка считается при чтении дашборда.
+# Остальное — как в 0011_board_summary: разница по ключу за оператор применяется одним upsert.
+SUMMARY_FUNCTION = """
+CREATE OR REPLACE FUNCTION goals_board_summary_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO goals_boardsummary AS s (board_id, category_id, status, priority, count)
+        SELECT board_id, category_id, status, priority, count(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4
+        ON CONFLICT (board_id, category_id, status, priority) DO UPDATE SET count = s.count + EXCLUDED.count;
+
+        INSERT INTO goals_boardduesummary AS s (board_id, due_date, category_id, status, priority, count)
+        SELECT board_id, due_date, category_id, status, priority, count(*)
+        FROM new_rows
+        WHERE due_date IS NOT NULL AND status NOT IN (3, 4)
+        GROUP BY 1, 2, 3, 4, 5
+        ORDER BY 1, 2, 3, 4, 5
+        ON CONFLICT (board_id, due_date, category_id, status, priority) DO UPDATE SET count = s.count + EXCLUDED.count;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO goals_boardsummary AS s (board_id, category_id, status, priority, count)
+        SELECT board_id, category_id, status, priority, sum(delta)
+        FROM (
+            SELECT board_id, category_id, status, priority, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT board_id, category_id, status, priority, -1 FROM old_rows
+        ) AS changes
+        GROUP BY 1, 2, 3, 4
+        HAVING sum(delta) <> 0
+        ORDER BY 1, 2, 3, 4
+        ON CONFLICT (board_id, category_id, status, priority) DO UPDATE SET count = s.count + EXCLUDED.count;
+
+        INSERT INTO goals_boardduesummary AS s (board_id, due_date, category_id, status, priority, count)
+        SELECT board_id, due_date, category_id, status, priority, sum(delta)
+        FROM (
+            SELECT board_id, due_date, category_id, status, priority, 1 AS delta
+            FROM new_rows WHERE due_date IS NOT NULL AND status NOT IN (3, 4)
+            UNION ALL
+            SELECT board_id, due_date, category_id, status, priority, -1
+            FROM old_rows WHERE due_date IS NOT NULL AND status NOT IN (3, 4)
+        ) AS changes
+        GROUP BY 1, 2, 3, 4, 5
+        HAVING sum(delta) <> 0
+        ORDER BY 1, 2, 3, 4, 5
+        ON CONFLICT (board_id, due_date, category_id, status, priority) DO UPDATE SET count = s.count + EXCLUDED.count;
+    ELSE
+        UPDATE goals_boardsummary AS s
+        SET count = s.count - changes.count
+        FROM (
+            SELECT board_id, category_id, status, priority, count(*) AS count
+            FROM old_rows
+            GROUP BY 1, 2, 3, 4
+        ) AS changes
+        WHERE s.board_id = changes.board_id AND s.category_id = changes.category_id
+          AND s.status = changes.status AND s.priority = changes.priority;
+
+        UPDATE goals_boardduesummary AS s
+        SET count = s.count - changes.count
+        FROM (
+            SELECT board_id, due_date, category_id, status, priority, count(*) AS count
+            FROM old_rows
+            WHERE due_date IS NOT NULL AND status NOT IN (3, 4)
+            GROUP BY 1, 2, 3, 4, 5
+        ) AS changes
+        WHERE s.board_id = changes.board_id AND s.due_date = changes.due_date AND s.category_id = changes.category_id
+          AND s.status = changes.status AND s.priority = changes.priority;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+INSERT INTO goals_boardduesummary (board_id, due_date, category_id, status, priority, count)
+SELECT board_id, due_date, category_id, status, priority, count(*)
+FROM goals_goal
+WHERE due_date IS NOT NULL AND status NOT IN (3, 4)
+GROUP BY 1, 2, 3, 4, 5;
+"""
+
+# Откат: прежние функция и триггеры из 0011 вместе с заполнением сводки (и `overdue_count`)
+OLD_SUMMARY_TRIGGER = """
+DROP TRIGGER goals_goal_summary_insert ON goals_goal;
+DROP TRIGGER goals_goal_summary_update ON goals_goal;
+DROP TRIGGER goals_goal_summary_delete ON goals_goal;
+DROP FUNCTION goals_board_summary_update();
+DELETE FROM goals_boardsummary;
+""" + import_module("goals.migrations.0011_board_summary").SUMMARY_TRIGGER
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_goal_archived_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardDueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('due_date', models.DateField(verbose_name='Дата выполнения')),
+                ('count', models.IntegerField(default=0, verbose_name='Целей')),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='due_summary', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_summary', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Сроки целей доски',
+                'verbose_name_plural': 'Сроки целей досок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='boardduesummary',
+            constraint=models.UniqueConstraint(fields=('board', 'due_date', 'category', 'status', 'priority'), name='board_due_summary_key'),
+        ),
+        migrations.RunSQL(SUMMARY_FUNCTION, reverse_sql=OLD_SUMMARY_TRIGGER),
+        migrations.RemoveField(
+            model_name='boardsummary',
+            name='overdue_count',
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Поисковый вектор зависит только от текста, поэтому триггеры из 0007_search_vector срабатывают
+# лишь при изменении title/description: массовая смена статуса (каскад, пакетные операции)
+# не пересчитывает to_tsvector для каждой строки
+TRIGGERS = """
+DROP TRIGGER goals_goal_search_vector_trigger ON goals_goal;
+CREATE TRIGGER goals_goal_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+
+DROP TRIGGER goals_goalcategory_search_vector_trigger ON goals_goalcategory;
+CREATE TRIGGER goals_goalcategory_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title ON goals_goalcategory
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcategory_search_vector_update();
+"""
+
+OLD_TRIGGERS = """
+DROP TRIGGER goals_goal_search_vector_trigger ON goals_goal;
+CREATE TRIGGER goals_goal_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+
+DROP TRIGGER goals_goalcategory_search_vector_trigger ON goals_goalcategory;
+CREATE TRIGGER goals_goalcategory_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON goals_goalcategory
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcategory_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0015_board_due_summary'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TRIGGERS, reverse_sql=OLD_TRIGGERS),
+    ]
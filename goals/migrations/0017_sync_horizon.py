@@ -0,0 +1,25 @@
+# Generated by Django 4.1.7 on 2026-10-18 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncHorizon',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_xid', models.BigIntegerField(verbose_name='Транзакция границы')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Граница синхронизации',
+                'verbose_name_plural': 'Граница синхронизации',
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 from core.models import User
@@ -19,16 +22,36 @@ class DatesModelMixin(models.Model):
         abstract = True
 
 
-class GoalCategory(DatesModelMixin):
+class SyncModelMixin(models.Model):
+    """
+    Номер транзакции последнего изменения объекта для дельта-синхронизации (goals/sync.py).
+    Заполняется триггером в БД (см. миграцию 0012_sync), в том числе при массовых update()/bulk_create().
+    """
+    change_xid = models.BigIntegerField(verbose_name="Транзакция изменения", default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class GoalCategory(SyncModelMixin, DatesModelMixin):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=["board", "is_deleted", "title"], name="category_board_deleted_idx"),
+            models.Index(fields=["board", "title"], name="category_board_active_idx",
+                         condition=Q(is_deleted=False)),
+            GinIndex(fields=["search_vector"], name="category_search_vector_idx"),
+            models.Index(fields=["change_xid"], name="category_change_xid_idx"),
+        ]
 
     """ Модель создания Категории для заметок """
     board = models.ForeignKey("Board", verbose_name="Доска ", on_delete=models.PROTECT, related_name="categories")
     title = models.CharField(verbose_name="Название", max_length=255)
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
+    # Заполняется триггером в БД (см. миграцию 0007_search_vector)
+    search_vector = SearchVectorField(verbose_name="Поисковый вектор", null=True, editable=False)
 
     # def save(self, *args, **kwargs):
     #     if not self.pk:  # if not self.id: # Когда объект только создается, у него еще нет id
@@ -40,7 +63,7 @@ class GoalCategory(DatesModelMixin):
         return '{}'.format(self.title)
 
 
-class Goal(DatesModelMixin):
+class Goal(SyncModelMixin, DatesModelMixin):
     """ Модель создания заметки.
     Статус:
         :param: 'to_do' - К выполнению
@@ -70,9 +93,29 @@ class Goal(DatesModelMixin):
                                                 default=Priority.medium)
     user = models.ForeignKey(User, verbose_name="Автор", related_name="goals", on_delete=models.PROTECT)
     category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.PROTECT)
+    # Копия `category.board` для фильтрации видимости без соединения с категорией
+    board = models.ForeignKey("Board", verbose_name="Доска", related_name="goals", on_delete=models.PROTECT,
+                              editable=False, db_index=False)
     title = models.CharField(verbose_name="Заголовок цели", max_length=255)
     description = models.TextField(verbose_name="Описание", null=True, blank=True, default=None)
     due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True, default=None)
+    # Заполняется триггером в БД (см. миграцию 0007_search_vector)
+    search_vector = SearchVectorField(verbose_name="Поисковый вектор", null=True, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get("board_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.board_id = self.category.board_id
+        super().save(*args, **kwargs)
+        # Цель перенесли в категорию другой доски — комментарии переезжают вместе с ней
+        loaded_board_id = getattr(self, "_loaded_board_id", None)
+        if loaded_board_id is not None and loaded_board_id != self.board_id:
+            self.goal_comments.update(board_id=self.board_id, updated=timezone.now())
+        self._loaded_board_id = self.board_id
 
     def __str__(self):
         return '{}'.format(self.title)
@@ -80,13 +123,30 @@ class Goal(DatesModelMixin):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["category", "status", "priority", "due_date"], name="goal_category_status_idx"),
+            models.Index(fields=["category", "priority", "due_date"], name="goal_category_active_idx",
+                         condition=~Q(status=4)),  # 4 — Status.archived
+            models.Index(fields=["board", "priority", "due_date"], name="goal_board_priority_idx"),
+            GinIndex(fields=["search_vector"], name="goal_search_vector_idx"),
+            models.Index(fields=["change_xid"], name="goal_change_xid_idx"),
+            # Кандидаты на перенос в ArchivedGoal (goals/archive.py)
+            models.Index(fields=["updated"], name="goal_archived_updated_idx", condition=Q(status=4)),
+        ]
 
 
-class GoalComment(DatesModelMixin):
+class GoalComment(SyncModelMixin, DatesModelMixin):
     """ Модель создания объекта `comment` для модели заметок `goal` """
     goal = models.ForeignKey(Goal, verbose_name="Цель", related_name="goal_comments", on_delete=models.PROTECT)
     user = models.ForeignKey(User, verbose_name="Автор ", related_name="goal_comments", on_delete=models.PROTECT)
     text = models.TextField(verbose_name="Текст")
+    # Копия `goal.board` для фильтрации видимости без соединения с целью и категорией
+    board = models.ForeignKey("Board", verbose_name="Доска", related_name="goal_comments",
+                              on_delete=models.PROTECT, editable=False, db_index=False)
+
+    def save(self, *args, **kwargs):
+        self.board_id = self.goal.board_id
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return '{}: {}'.format(self.user, self.goal)
@@ -94,9 +154,14 @@ class GoalComment(DatesModelMixin):
     class Meta:
         verbose_name = "Комментарий к цели"
         verbose_name_plural = "Комментарии к целям"
+        indexes = [
+            models.Index(fields=["goal", "-id"], name="comment_goal_id_idx"),
+            models.Index(fields=["board", "-id"], name="comment_board_id_idx"),
+            models.Index(fields=["change_xid"], name="comment_change_xid_idx"),
+        ]
 
 
-class Board(DatesModelMixin):
+class Board(SyncModelMixin, DatesModelMixin):
     """ Модель для работы с объекта `board` """
     title = models.CharField(verbose_name="Название", max_length=255)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
@@ -107,9 +172,13 @@ class Board(DatesModelMixin):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["title"], name="board_active_title_idx", condition=Q(is_deleted=False)),
+            models.Index(fields=["change_xid"], name="board_change_xid_idx"),
+        ]
 
 
-class BoardParticipant(DatesModelMixin):
+class BoardParticipant(SyncModelMixin, DatesModelMixin):
     """ Модель позволяющая выбирать и назначать права пользователям """
     class Role(models.IntegerChoices):
         owner = 1, "Владелец"
@@ -129,4 +198,195 @@ class BoardParticipant(DatesModelMixin):
     class Meta:
         unique_together = ("board", "user")
         verbose_name = "Участник"
-        verbose_name_plural = "Участники"
\ No newline at end of file
+        verbose_name_plural = "Участники"
+        indexes = [
+            models.Index(fields=["user", "board", "role"], name="participant_user_board_idx"),
+            models.Index(fields=["change_xid"], name="participant_change_xid_idx"),
+        ]
+
+
+class SyncTombstone(models.Model):
+    """
+    Запись об исчезнувшем для участников доски объекте: удаленном комментарии, удаленном участнике
+    или цели/комментарии, перенесенных на другую доску. Создается триггерами в БД (см. миграцию 0012_sync).
+    Для удаленного участника `user` — сам пользователь, потерявший доступ к доске.
+    """
+    class Kind(models.TextChoices):
+        goal = "goal", "Цель"
+        comment = "comment", "Комментарий"
+        participant = "participant", "Участник"
+
+    kind = models.CharField(verbose_name="Тип объекта", max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="ID объекта")
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, related_name="tombstones",
+                              db_index=False)
+    user = models.ForeignKey(User, verbose_name="Пользователь", on_delete=models.CASCADE, null=True, blank=True,
+                             related_name="tombstones", db_index=False)
+    change_xid = models.BigIntegerField(verbose_name="Транзакция изменения")
+    created = models.DateTimeField(verbose_name="Дата создания")
+
+    def __str__(self):
+        return '{} {}'.format(self.get_kind_display(), self.object_id)
+
+    class Meta:
+        verbose_name = "Удаленный объект"
+        verbose_name_plural = "Удаленные объекты"
+        indexes = [
+            models.Index(fields=["change_xid"], name="tombstone_change_xid_idx"),
+        ]
+
+
+class SyncHorizon(models.Model):
+    """
+    Граница хранения SyncTombstone (одна строка): записи с `change_xid` меньше границы вычищены
+    командой `prunetombstones`, поэтому курсор меньше границы требует полной синхронизации.
+    """
+    change_xid = models.BigIntegerField(verbose_name="Транзакция границы")
+    updated = models.DateTimeField(verbose_name="Дата обновления", auto_now=True)
+
+    class Meta:
+        verbose_name = "Граница синхронизации"
+        verbose_name_plural = "Граница синхронизации"
+
+
+class CascadeTask(DatesModelMixin):
+    """
+    Фоновое каскадное удаление доски или категории.
+    Доска/категория помечается удаленной сразу, а архивация целей и удаление категорий
+    выполняются порциями (см. goals/cascade.py и команду `runcascade`).
+    """
+    class Status(models.IntegerChoices):
+        pending = 1, "В очереди"
+        running = 2, "Выполняется"
+        done = 3, "Завершено"
+        failed = 4, "Ошибка"
+
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, null=True, blank=True,
+                              related_name="cascade_tasks")
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.PROTECT, null=True,
+                                 blank=True, related_name="cascade_tasks")
+    user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT, related_name="cascade_tasks")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Status.choices, default=Status.pending)
+    total = models.PositiveIntegerField(verbose_name="Всего объектов", default=0)
+    processed = models.PositiveIntegerField(verbose_name="Обработано объектов", default=0)
+    error = models.TextField(verbose_name="Ошибка", blank=True, default="")
+
+    def __str__(self):
+        return '{}: {}'.format(self.board or self.category, self.get_status_display())
+
+    class Meta:
+        verbose_name = "Каскадное удаление"
+        verbose_name_plural = "Каскадные удаления"
+        indexes = [
+            models.Index(fields=["id"], name="cascade_task_pending_idx", condition=Q(status__in=[1, 2])),
+        ]
+
+
+class BoardSummary(models.Model):
+    """
+    Сводка по доске для дашборда: число целей в разрезе (доска, категория, статус, приоритет).
+    Поддерживается триггерами на goals_goal (см. миграции 0011_board_summary и 0015_board_due_summary),
+    поэтому учитывает и save(), и массовые update()/bulk_create() каскадов и пакетных операций.
+    Пересобирается с нуля командой `rebuildsummary`.
+    """
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, related_name="summary",
+                              db_index=False)
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.CASCADE,
+                                 related_name="summary")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    count = models.IntegerField(verbose_name="Целей", default=0)
+
+    def __str__(self):
+        return '{}: {}'.format(self.board, self.category)
+
+    class Meta:
+        verbose_name = "Сводка по доске"
+        verbose_name_plural = "Сводки по доскам"
+        constraints = [
+            # Ключ сводки; он же — индекс для чтения дашборда по доске
+            models.UniqueConstraint(fields=["board", "category", "status", "priority"], name="board_summary_key"),
+        ]
+
+
+class BoardDueSummary(models.Model):
+    """
+    Число незавершенных целей с датой выполнения в разрезе (доска, категория, статус, приоритет, дата).
+    Просрочка зависит от текущей даты, поэтому не хранится: дашборд считает ее при чтении
+    как сумму строк с датой раньше сегодняшней. Поддерживается теми же триггерами, что и `BoardSummary`.
+    """
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, related_name="due_summary",
+                              db_index=False)
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.CASCADE,
+                                 related_name="due_summary")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    due_date = models.DateField(verbose_name="Дата выполнения")
+    count = models.IntegerField(verbose_name="Целей", default=0)
+
+    def __str__(self):
+        return '{}: {} {}'.format(self.board, self.category, self.due_date)
+
+    class Meta:
+        verbose_name = "Сроки целей доски"
+        verbose_name_plural = "Сроки целей досок"
+        constraints = [
+            # Ключ; он же — индекс для подсчета просрочки по доске
+            models.UniqueConstraint(fields=["board", "due_date", "category", "status", "priority"],
+                                    name="board_due_summary_key"),
+        ]
+
+
+class ArchivedGoal(models.Model):
+    """
+    Цель, перенесенная из goals_goal после долгого пребывания в архиве (см. goals/archive.py).
+    Хранит те же значения и тот же id, что и исходная цель, и время переноса `archived`.
+    Только для чтения: изменить цель можно после восстановления обратно в Goal.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created = models.DateTimeField(verbose_name="Дата создания")
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+    archived = models.DateTimeField(verbose_name="Дата переноса в архив")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    user = models.ForeignKey(User, verbose_name="Автор", related_name="archived_goals", on_delete=models.PROTECT)
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", related_name="archived_goals",
+                                 on_delete=models.PROTECT)
+    board = models.ForeignKey(Board, verbose_name="Доска", related_name="archived_goals", on_delete=models.PROTECT,
+                              db_index=False)
+    title = models.CharField(verbose_name="Заголовок цели", max_length=255)
+    description = models.TextField(verbose_name="Описание", null=True, blank=True)
+    due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True)
+
+    def __str__(self):
+        return '{}'.format(self.title)
+
+    class Meta:
+        verbose_name = "Цель в архиве"
+        verbose_name_plural = "Цели в архиве"
+        indexes = [
+            models.Index(fields=["board", "-archived"], name="archived_goal_board_idx"),
+        ]
+
+
+class ArchivedComment(models.Model):
+    """ Комментарий цели из ArchivedGoal, перенесенный вместе с ней """
+    id = models.BigIntegerField(primary_key=True)
+    created = models.DateTimeField(verbose_name="Дата создания")
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+    goal = models.ForeignKey(ArchivedGoal, verbose_name="Цель", related_name="comments", on_delete=models.CASCADE,
+                             db_index=False)
+    user = models.ForeignKey(User, verbose_name="Автор", related_name="archived_comments", on_delete=models.PROTECT)
+    board = models.ForeignKey(Board, verbose_name="Доска", related_name="archived_comments",
+                              on_delete=models.PROTECT, db_index=False)
+    text = models.TextField(verbose_name="Текст")
+
+    def __str__(self):
+        return '{}: {}'.format(self.user, self.goal)
+
+    class Meta:
+        verbose_name = "Комментарий в архиве"
+        verbose_name_plural = "Комментарии в архиве"
+        indexes = [
+            models.Index(fields=["goal", "-id"], name="archived_comment_goal_idx"),
+        ]
@@ -0,0 +1,189 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (keyset / cursor).
+    Позиция страницы — значения полей сортировки последней строки, поэтому запрос
+    не делает ни `COUNT(*)`, ни `OFFSET`, и время ответа не зависит от глубины страницы.
+    Сортировка берется из queryset (после `OrderingFilter`) и дополняется `id` для однозначности.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 1000
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def get_ordering(queryset: QuerySet) -> list[str]:
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            descending = bool(ordering) and ordering[-1].startswith("-")
+            ordering.append("-id" if descending else "id")
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [getattr(last, self.get_attname(last, field.lstrip("-"))) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    @staticmethod
+    def get_attname(obj, name: str) -> str:
+        if not hasattr(obj, "_meta"):
+            # Строки `values_list(named=True)` (LeanListMixin): колонки названы по полям, `pk` — это `id`
+            return "id" if name == "pk" else name
+        try:
+            return obj._meta.get_field(name).attname
+        except FieldDoesNotExist:
+            # `pk` и аннотации (например, `search_rank`) читаются с объекта как есть
+            return name
+
+    def encode_cursor(self, position: list) -> str:
+        payload = json.dumps({"o": self.ordering, "p": [self.encode_value(value) for value in position]},
+                             cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def encode_value(value):
+        """
+        Даты и время — с типом и полной точностью: DjangoJSONEncoder обрезает время до миллисекунд,
+        и строки, отличающиеся на микросекунды, оказывались «до» курсора — страница повторялась бесконечно.
+        """
+        if isinstance(value, datetime.datetime):
+            return {"dt": value.isoformat()}
+        if isinstance(value, datetime.date):
+            return {"d": value.isoformat()}
+        return value
+
+    @staticmethod
+    def decode_value(value):
+        if isinstance(value, dict):
+            if set(value) == {"dt"}:
+                return datetime.datetime.fromisoformat(value["dt"])
+            if set(value) == {"d"}:
+                return datetime.date.fromisoformat(value["d"])
+            raise ValueError(value)
+        return value
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            ordering, position = payload["o"], [self.decode_value(value) for value in payload["p"]]
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Курсор выдан для другой сортировки — продолжать по нему нельзя
+        if ordering != self.ordering or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_keyset_filter(self, position: list) -> Q:
+        """
+        Условие «строго после позиции» для составного ключа сортировки.
+        PostgreSQL ставит NULL последними при ASC и первыми при DESC, это учитывается для nullable полей.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            descending = field.startswith("-")
+            if value is None:
+                after = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            elif descending:
+                after = Q(**{f"{name}__lt": value})
+                same = Q(**{name: value})
+            else:
+                after = Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+
+class KeysetOrOffsetPagination(BasePagination):
+    """
+    Режим выбирается по параметрам запроса:
+        - `?cursor=` / `?page_size=` — постраничный вывод по ключу;
+        - `?limit=` / `?offset=` — прежний LimitOffsetPagination для старых клиентов;
+        - без параметров список отдается целиком, как и раньше.
+    """
+    keyset_class = KeysetPagination
+    offset_class = LimitOffsetPagination
+
+    def __init__(self):
+        self.keyset = self.keyset_class()
+        self.offset = self.offset_class()
+        self.active = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.offset.limit_query_param in params or self.offset.offset_query_param in params:
+            self.active = self.offset
+        elif self.keyset.cursor_query_param in params or self.keyset.page_size_query_param in params:
+            self.active = self.keyset
+        else:
+            return None
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.keyset.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.offset.get_schema_operation_parameters(view)
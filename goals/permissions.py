@@ -1,8 +1,63 @@
+from typing import Optional
+
+from django.db.models import Exists, OuterRef
 from rest_framework import permissions
 
 from goals.models import BoardParticipant
 
 
+class BoardRoles:
+    """
+    Роли пользователя на досках `{board_id: role}`.
+    Загружаются одним запросом при первом обращении и дальше обслуживают
+    все проверки прав и валидацию сериализаторов в рамках запроса.
+    """
+    editor_roles = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @property
+    def roles(self) -> dict[int, int]:
+        if self._roles is None:
+            self._roles = dict(BoardParticipant.objects.filter(user=self.user).values_list("board_id", "role"))
+        return self._roles
+
+    @property
+    def board_ids(self) -> list[int]:
+        return list(self.roles)
+
+    def role(self, board_id: int) -> Optional[int]:
+        return self.roles.get(board_id)
+
+    def is_participant(self, board_id: int) -> bool:
+        return board_id in self.roles
+
+    def is_owner(self, board_id: int) -> bool:
+        return self.role(board_id) == BoardParticipant.Role.owner
+
+    def can_edit(self, board_id: int) -> bool:
+        return self.role(board_id) in self.editor_roles
+
+
+def is_participant(user, board_field: str = "board_id") -> Exists:
+    """
+    Условие видимости объекта: пользователь участвует в доске `board_field`.
+    Один `EXISTS` по уникальному индексу (board, user) вместо соединения через категории и цели.
+    """
+    return Exists(BoardParticipant.objects.filter(board_id=OuterRef(board_field), user=user))
+
+
+def get_board_roles(request) -> BoardRoles:
+    """ Роли пользователя, закешированные на объекте запроса """
+    board_roles = getattr(request, "_board_roles", None)
+    if board_roles is None or board_roles.user != request.user:
+        board_roles = BoardRoles(request.user)
+        request._board_roles = board_roles
+    return board_roles
+
+
 class BoardPermissions(permissions.BasePermission):
     """
     В коде выше мы:
@@ -19,9 +74,8 @@ class BoardPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj, role=BoardParticipant.Role.owner).exists()
+            return get_board_roles(request).is_participant(obj.id)
+        return get_board_roles(request).is_owner(obj.id)
 
 
 class GoalCategoryPermissions(permissions.BasePermission):
@@ -40,11 +94,8 @@ class GoalCategoryPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).is_participant(obj.board_id)
+        return get_board_roles(request).can_edit(obj.board_id)
 
 
 class GoalPermissions(permissions.BasePermission):
@@ -63,11 +114,8 @@ class GoalPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.category.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.category.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).is_participant(obj.board_id)
+        return get_board_roles(request).can_edit(obj.board_id)
 
 
 class CommentPermissions(permissions.BasePermission):
@@ -0,0 +1,33 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа, которые orjson пишет не так, как repr(float) в json: 0.00001 вместо 1e-05, 1e16 вместо 1e+16.
+# Совпадение внутри строки лишь отправляет ответ на обычный рендерер
+ORJSON_FLOAT_FORMAT = re.compile(rb"[0-9]e[-+0-9]|0\.0000")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен. Вывод тот же, что у DRF с настройками по умолчанию
+    (компактный, без экранирования не-ASCII): даты и прочие нестандартные типы по-прежнему
+    кодирует JSONEncoder DRF, U+2028/U+2029 экранируются так же.
+    Очень малые и очень большие float orjson записывает иначе — такой ответ пересобирается обычным рендерером.
+    С отступами (`; indent=`, BrowsableAPI), иными настройками JSON или без orjson работает обычный рендерер.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        if ORJSON_FLOAT_FORMAT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
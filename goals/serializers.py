@@ -1,9 +1,55 @@
 from django.db import transaction
-from rest_framework import serializers
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+from rest_framework import permissions, serializers
 
 from core.models import User
 from core.serializers import UserSerializer
-from goals.models import GoalCategory, GoalComment, Goal, Board, BoardParticipant
+from goals.cache import bump_user_versions
+from goals.events import publish
+from goals.models import (
+    ArchivedComment,
+    ArchivedGoal,
+    Board,
+    BoardParticipant,
+    BoardSummary,
+    CascadeTask,
+    Goal,
+    GoalCategory,
+    GoalComment,
+)
+from goals.permissions import get_board_roles
+
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def get_fieldset(request) -> tuple:
+    """ Поля из `?fields=a,b` (None — все поля) и `?omit=c,d` """
+    def names(param):
+        value = request.query_params.get(param)
+        return {name.strip() for name in value.split(",") if name.strip()} if value is not None else None
+
+    return names(FIELDS_PARAM), names(OMIT_PARAM) or set()
+
+
+class SparseFieldsetMixin:
+    """
+    Выборочные поля ответа: `?fields=id,title` оставляет только перечисленные поля, `?omit=description,user`
+    убирает перечисленные. Работает только для чтения (GET): запись и ответ на нее всегда полные.
+    Списки на LeanListMixin выбирают из БД только колонки оставшихся полей.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+        only, omit = get_fieldset(request)
+        for name in list(self.fields):
+            if name in omit or only is not None and name not in only:
+                self.fields.pop(name)
 
 
 class GoalCreateSerializer(serializers.ModelSerializer):
@@ -13,39 +59,91 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ("search_vector", "change_xid")
         read_only_fields = ["id", "created", "updated", "user"]
 
     def validate_category(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_edit(value.board_id):
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
 
-class GoalSerializer(serializers.ModelSerializer):
+class GoalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """ Модель объекта `ЦЕЛЬ`. """
     user = UserSerializer(read_only=True)
+    comments_count = serializers.SerializerMethodField()
+    # Есть только в ответах полнотекстового поиска (`?search=`, `?highlight=1`)
+    search_rank = serializers.FloatField(read_only=True)
+    search_headline = serializers.CharField(read_only=True)
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ("search_vector", "change_xid")
         read_only_fields = ("id", "created", "updated", "user")
 
     def validate_category(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if self.instance.category.board_id != value.board_id:
+        if self.instance.board_id != value.board_id:
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
+    def get_comments_count(self, obj: Goal) -> int:
+        # Списки подставляют аннотацию `comments_count`, отдельный запрос — только для одиночных объектов
+        if hasattr(obj, "comments_count"):
+            return obj.comments_count
+        return obj.goal_comments.count()
+
+
+class PreloadedCategoryField(serializers.PrimaryKeyRelatedField):
+    """ Категория из заранее загруженного словаря `context["categories"]`, без запроса на каждый объект """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        category = self.context["categories"].get(pk)
+        if category is None:
+            self.fail("does_not_exist", pk_value=data)
+        return category
+
+
+class GoalBatchCreateSerializer(GoalCreateSerializer):
+    """ Создание цели в пакетной операции """
+    category = PreloadedCategoryField(queryset=GoalCategory.objects.all())
+
+
+class GoalBatchUpdateSerializer(GoalSerializer):
+    """ Редактирование цели в пакетной операции """
+    category = PreloadedCategoryField(queryset=GoalCategory.objects.all(), required=False)
+
+
+class GoalBatchOperationSerializer(serializers.Serializer):
+    """
+    Одна операция пакета:
+        - `create` — создать цель из `data`;
+        - `update` — частично изменить цель `id` данными из `data`;
+        - `status` — перевести цель `id` в статус `status` (например, в архив).
+    """
+    action = serializers.ChoiceField(choices=["create", "update", "status"])
+    id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs["action"] != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": "Обязательное поле для этой операции"})
+        if attrs["action"] == "status" and "status" not in attrs:
+            raise serializers.ValidationError({"status": "Обязательное поле для этой операции"})
+        return attrs
+
 
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
     """ Модель проверки объекта `Категория` является пользователь владельцем или редактором """
@@ -53,29 +151,27 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalCategory
-        fields = '__all__'
+        exclude = ("search_vector", "change_xid")
         read_only_fields = ["id", "created", "updated", "user"]
 
     def validate_board(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленном объекте")
-        allow = BoardParticipant.objects.filter(
-            board=value,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-            user=self.context["request"].user,
-        ).exists()
-        if not allow:
+        if not get_board_roles(self.context["request"]).can_edit(value.id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором")
         return value
 
 
-class GoalCategorySerializer(serializers.ModelSerializer):
+class GoalCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """ Модель вывода объекта """
     user = UserSerializer(read_only=True)
+    # Есть только в ответах полнотекстового поиска (`?search=`, `?highlight=1`)
+    search_rank = serializers.FloatField(read_only=True)
+    search_headline = serializers.CharField(read_only=True)
 
     class Meta:
         model = GoalCategory
-        fields = '__all__'
+        exclude = ("search_vector", "change_xid")
         read_only_fields = ("id", "created", "updated", "user", "board")
 
 
@@ -85,26 +181,22 @@ class CommentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ("change_xid",)
         read_only_fields = ("id", "created", "updated", "user")
 
     def validate_goal(self, value):
-        if not BoardParticipant.objects.filter(
-                board_id=value.category.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_edit(value.board_id):
             raise serializers.ValidationError("Вы не являетесь автором этого комментария")
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """ Модель вывода объектов `Комментарий` """
     user = UserSerializer(read_only=True)
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ("change_xid",)
         read_only_fields = ("id", "created", "updated", "user", "goal")
 
 
@@ -114,7 +206,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ("change_xid",)
         read_only_fields = ("id", "created", "updated")
 
     def create(self, validated_data):
@@ -124,53 +216,174 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         return board
 
 
+class UsernameField(serializers.SlugRelatedField):
+    """
+    Пользователь по `username`. На входе остается строкой:
+    все имена участников доски разрешаются одним запросом в BoardSerializer.validate_participants.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data:
+            self.fail("invalid")
+        return data
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     """ Модель участников. """
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.editable_choices)
-    user = serializers.SlugRelatedField(slug_field="username", queryset=User.objects.all())
+    user = UsernameField(slug_field="username", queryset=User.objects.all())
 
     class Meta:
         model = BoardParticipant
-        fields = '__all__'
+        exclude = ("change_xid",)
         read_only_fields = ("id", "created", "updated", "board")
 
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """ Модель редактирования """
     participants = BoardParticipantSerializer(many=True)
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
+    def validate_participants(self, value):
+        usernames = {part["user"] for part in value}
+        users = User.objects.in_bulk(usernames, field_name="username")
+        missing = sorted(usernames - users.keys())
+        if missing:
+            raise serializers.ValidationError(
+                ["Пользователь {} не найден".format(username) for username in missing]
+            )
+        for part in value:
+            part["user"] = users[part["user"]]
+        return value
+
     def update(self, instance, validated_data):
+        """
+        Замена участников как разница множеств: одно чтение текущих участников,
+        одно удаление, один `bulk_update` ролей и один `bulk_create` — независимо от их числа.
+        """
         owner = validated_data.pop("user")
         new_participants = validated_data.pop("participants")
-        new_by_id = {part["user"].id: part for part in new_participants}
+        new_by_id = {part["user"].id: part for part in new_participants if part["user"].id != owner.id}
+        now = timezone.now()
 
-        old_participants = instance.participants.exclude(user=owner)
         with transaction.atomic():
-            for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if old_participant.role != new_by_id[old_participant.user_id]["role"]:
-                        old_participant.role = new_by_id[old_participant.user_id]["role"]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(board=instance, user=new_part["user"], role=new_part["role"])
+            old_by_id = {part.user_id: part for part in instance.participants.exclude(user=owner)}
+
+            removed = old_by_id.keys() - new_by_id.keys()
+            if removed:
+                instance.participants.filter(user_id__in=removed).delete()
+
+            changed = []
+            for user_id in old_by_id.keys() & new_by_id.keys():
+                participant = old_by_id[user_id]
+                if participant.role != new_by_id[user_id]["role"]:
+                    participant.role = new_by_id[user_id]["role"]
+                    participant.updated = now
+                    changed.append(participant)
+            BoardParticipant.objects.bulk_update(changed, fields=["role", "updated"])
+
+            added = [
+                BoardParticipant(board=instance, user=part["user"], role=part["role"], created=now, updated=now)
+                for user_id, part in new_by_id.items() if user_id not in old_by_id
+            ]
+            BoardParticipant.objects.bulk_create(added)
+
+            # bulk_update/bulk_create не вызывают сигналы — сбрасываем кеш списков этих пользователей вручную
+            bump_user_versions(*[part.user_id for part in changed + added])
+            if changed or added:
+                publish("participant", "saved", instance.id, [part.id for part in changed + added],
+                        user_ids=[part.user_id for part in changed + added])
 
             instance.title = validated_data["title"]
             instance.save()
 
         return instance
 
+    def to_representation(self, instance):
+        # После изменения участников кеш prefetch сброшен — загружаем их заново вместе с пользователями
+        prefetch_related_objects(
+            [instance], Prefetch("participants", queryset=BoardParticipant.objects.select_related("user")),
+        )
+        return super().to_representation(instance)
+
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ("change_xid",)
         read_only_fields = ("id", "created", "updated")
 
 
-class BoardListSerializer(serializers.ModelSerializer):
+class BoardListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """ Модель выводит все объекты """
     class Meta:
         model = Board
+        exclude = ("change_xid",)
+
+
+class CascadeTaskSerializer(serializers.ModelSerializer):
+    """ Модель вывода хода каскадного удаления """
+    class Meta:
+        model = CascadeTask
+        fields = '__all__'
+        read_only_fields = ("id", "created", "updated", "board", "category", "user", "status", "total",
+                            "processed", "error")
+
+
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    """ Модель вывода комментария из архива """
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedComment
+        fields = '__all__'
+
+
+class ArchivedGoalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """ Модель вывода цели из архива """
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedGoal
         fields = '__all__'
+
+
+class ArchivedGoalDetailSerializer(ArchivedGoalSerializer):
+    """ Модель цели из архива вместе с ее комментариями """
+    comments = ArchivedCommentSerializer(many=True, read_only=True)
+
+
+class BoardSummarySerializer(serializers.ModelSerializer):
+    """ Модель строки сводки по доске """
+    category_title = serializers.CharField(source="category.title", read_only=True)
+    overdue_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = BoardSummary
+        exclude = ("id", "board")
+
+
+class BoardDashboardSerializer(serializers.Serializer):
+    """ Модель дашборда доски: итоги по статусам и приоритетам и строки сводки по категориям """
+    board = serializers.IntegerField()
+    total = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    by_priority = serializers.DictField(child=serializers.IntegerField())
+    rows = BoardSummarySerializer(many=True)
+
+
+class SyncSerializer(serializers.Serializer):
+    """
+    Модель ответа дельта-синхронизации: новый курсор, измененные объекты,
+    удаленные объекты (`deleted`), доски, к которым пользователь потерял доступ (`lost_boards`),
+    и продолжение (`next`), пока страницы не закончились (`has_more`).
+    """
+    cursor = serializers.IntegerField()
+    boards = BoardListSerializer(many=True)
+    participants = BoardParticipantSerializer(many=True)
+    categories = GoalCategorySerializer(many=True)
+    goals = GoalSerializer(many=True)
+    comments = CommentSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.DictField())
+    lost_boards = serializers.ListField(child=serializers.IntegerField())
+    next = serializers.CharField(allow_null=True)
+    has_more = serializers.BooleanField()
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from goals.cache import bump_board_versions, bump_user_versions
+from goals.events import event_kind, publish
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+
+
+@receiver([post_save, post_delete], sender=Board)
+def board_changed(sender, instance: Board, **kwargs):
+    """ Изменилась доска — устаревают закешированные списки всех ее участников """
+    bump_board_versions(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=GoalCategory)
+def category_changed(sender, instance: GoalCategory, **kwargs):
+    """ Изменилась категория — устаревают списки по ее доске """
+    bump_board_versions(instance.board_id)
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, **kwargs):
+    """ Изменился состав доски — у пользователя другой набор видимых досок """
+    bump_user_versions(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Board)
+@receiver([post_save, post_delete], sender=GoalCategory)
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=GoalComment)
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def publish_change(sender, instance, **kwargs):
+    """ Событие для потока изменений досок (goals/stream.py) """
+    kind = event_kind(sender)
+    action = "deleted" if kwargs["signal"] is post_delete else "saved"
+    board_id = instance.pk if sender is Board else instance.board_id
+    user_ids = [instance.user_id] if sender is BoardParticipant else []
+    publish(kind, action, board_id, [instance.pk], user_ids=user_ids)
+    # Цель перенесли на другую доску — ее участники тоже должны узнать об этом
+    old_board_id = getattr(instance, "_loaded_board_id", None) if sender is Goal else None
+    if old_board_id is not None and old_board_id != board_id:
+        publish(kind, "deleted", old_board_id, [instance.pk])
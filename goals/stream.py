@@ -0,0 +1,111 @@
+import asyncio
+import json
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.db import close_old_connections
+from django.http.cookie import parse_cookie
+
+from goals.events import board_channel, get_backend, hub, user_channel
+from goals.models import BoardParticipant
+
+
+def load_user(scope):
+    """ Пользователь по сессионной cookie, как у SessionAuthentication в остальном API """
+    try:
+        headers = dict(scope["headers"])
+        cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin1"))
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+        return auth.get_user(SimpleNamespace(session=session))
+    finally:
+        close_old_connections()
+
+
+def load_channels(user) -> list:
+    try:
+        board_ids = BoardParticipant.objects.filter(user=user).values_list("board_id", flat=True)
+        return [user_channel(user.pk)] + [board_channel(board_id) for board_id in board_ids]
+    finally:
+        close_old_connections()
+
+
+class EventStreamApp:
+    """
+    Поток изменений досок пользователя в формате Server-Sent Events.
+
+    Обслуживается напрямую ASGI-приложением (см. todolist/asgi.py), без представлений Django:
+    в Django 4.1 ответ-поток итерируется синхронно и занимал бы поток на все время соединения.
+    К БД поток обращается только при подключении и при изменении состава досок пользователя;
+    в простое он ждет событие хаба и раз в `heartbeat` секунд отправляет комментарий-пинг.
+
+    События: `<kind>` (goal, category, comment, participant, board) с `{"action", "board", "ids"}`
+    и `resync`, если клиент отстал и часть событий потеряна. Данные объектов клиент берет из `goals/sync`.
+    """
+
+    def __init__(self, heartbeat: float = None, max_queue: int = 100):
+        self.heartbeat = heartbeat or settings.GOALS_EVENTS_HEARTBEAT
+        self.max_queue = max_queue
+
+    async def __call__(self, scope, receive, send):
+        user = await sync_to_async(load_user)(scope)
+        if not user.is_authenticated:
+            await send({"type": "http.response.start", "status": 403,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body",
+                        "body": json.dumps({"detail": "Учетные данные не были предоставлены."}).encode()})
+            return
+
+        await get_backend().listen(hub)
+        subscription = hub.subscribe(await sync_to_async(load_channels)(user), self.max_queue)
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ]})
+            await self.write(send, b"retry: 3000\n\n")
+            while not disconnected.done():
+                event = await self.next_event(subscription, disconnected)
+                if event is None:
+                    await self.write(send, b": ping\n\n")
+                    continue
+                if event["kind"] == "participant" and user.pk in event["users"]:
+                    # Пользователя добавили на доску или удалили с нее — обновляем подписку
+                    hub.resubscribe(subscription, await sync_to_async(load_channels)(user))
+                await self.write(send, self.format(event))
+        finally:
+            hub.unsubscribe(subscription)
+            disconnected.cancel()
+
+    async def next_event(self, subscription, disconnected):
+        if subscription.overflowed:
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.overflowed = False
+            return {"kind": "resync"}
+        getter = asyncio.ensure_future(subscription.queue.get())
+        done, _ = await asyncio.wait({getter, disconnected}, timeout=self.heartbeat,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            return getter.result()
+        getter.cancel()
+        return None
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    def format(event: dict) -> bytes:
+        data = {key: event[key] for key in ("action", "board", "ids") if key in event}
+        return "event: {}\ndata: {}\n\n".format(event["kind"], json.dumps(data)).encode()
+
+    @staticmethod
+    async def write(send, body: bytes):
+        await send({"type": "http.response.body", "body": body, "more_body": True})
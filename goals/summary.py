@@ -0,0 +1,82 @@
+from typing import Optional
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from goals.models import Board, BoardDueSummary, BoardSummary, Goal
+
+# Та же агрегация, что и в триггерах миграции 0015_board_due_summary
+REBUILD_SQL = """
+INSERT INTO goals_boardsummary (board_id, category_id, status, priority, count)
+SELECT board_id, category_id, status, priority, count(*)
+FROM goals_goal
+WHERE board_id = %s
+GROUP BY 1, 2, 3, 4
+"""
+REBUILD_DUE_SQL = """
+INSERT INTO goals_boardduesummary (board_id, due_date, category_id, status, priority, count)
+SELECT board_id, due_date, category_id, status, priority, count(*)
+FROM goals_goal
+WHERE board_id = %s AND due_date IS NOT NULL AND status NOT IN (%s, %s)
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def rebuild_board_summary(board_id: int) -> int:
+    """
+    Пересобирает сводку одной доски и возвращает число ее строк.
+    Блокируются только цели этой доски: их изменение и удаление — блокировкой строк целей,
+    добавление и перенос целей на доску — блокировкой строки доски (проверка внешнего ключа ее ждет).
+    Иначе триггеры применили бы разницу к удаляемым строкам сводки.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not Board.objects.select_for_update().filter(id=board_id).exists():
+            return 0
+        cursor.execute("SELECT 1 FROM goals_goal WHERE board_id = %s FOR SHARE", [board_id])
+        BoardSummary.objects.filter(board_id=board_id).delete()
+        BoardDueSummary.objects.filter(board_id=board_id).delete()
+        cursor.execute(REBUILD_SQL, [board_id])
+        rows = cursor.rowcount
+        cursor.execute(REBUILD_DUE_SQL, [board_id, Goal.Status.done, Goal.Status.archived])
+        return rows
+
+
+def rebuild_summary(board_id: Optional[int] = None) -> int:
+    """
+    Пересобирает сводку по целям с нуля (для всех досок или одной) и возвращает число строк сводки.
+    Каждая доска пересобирается в своей транзакции, так что изменения целей других досок не ждут.
+    """
+    if board_id is not None:
+        return rebuild_board_summary(board_id)
+    return sum(rebuild_board_summary(pk) for pk in Board.objects.values_list("id", flat=True).iterator())
+
+
+def board_dashboard(board_id: int) -> dict:
+    """
+    Дашборд доски из сводки по индексу (board, category, status, priority)
+    и просрочка — по индексу (board, due_date) на текущую дату.
+    """
+    rows = list(
+        BoardSummary.objects.filter(board_id=board_id, count__gt=0, category__is_deleted=False)
+        .select_related("category").order_by("category__title", "category_id", "status", "priority")
+    )
+    overdue = dict(
+        ((row["category_id"], row["status"], row["priority"]), row["overdue"])
+        for row in BoardDueSummary.objects.filter(board_id=board_id, due_date__lt=timezone.localdate())
+        .values("category_id", "status", "priority").annotate(overdue=Sum("count"))
+    )
+    by_status = {status: 0 for status in Goal.Status.values}
+    by_priority = {priority: 0 for priority in Goal.Priority.values}
+    for row in rows:
+        row.overdue_count = overdue.get((row.category_id, row.status, row.priority), 0)
+        by_status[row.status] += row.count
+        by_priority[row.priority] += row.count
+    return {
+        "board": board_id,
+        "total": sum(row.count for row in rows),
+        "overdue": sum(row.overdue_count for row in rows),
+        "by_status": by_status,
+        "by_priority": by_priority,
+        "rows": rows,
+    }
@@ -0,0 +1,150 @@
+import base64
+import datetime
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment, SyncHorizon, SyncTombstone
+from goals.permissions import is_participant
+
+
+def snapshot_xmin() -> int:
+    """ Номер самой старой незавершенной транзакции: все транзакции с меньшими номерами уже видны """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+class CursorExpired(Exception):
+    """ Курсор старше границы хранения записей об удалениях: нужна полная синхронизация """
+
+
+def encode_page(page: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(page).encode()).decode()
+
+
+def decode_page(encoded: str) -> dict:
+    """ Позиция продолжения из `next`; ValueError, если строка повреждена """
+    try:
+        page = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        page = {key: page[key] for key in ("since", "cursor", "section", "after")}
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValueError(encoded)
+    if (page["section"] not in DeltaSync.sections or not isinstance(page["cursor"], int)
+            or not isinstance(page["after"], int) or not isinstance(page["since"], (int, type(None)))):
+        raise ValueError(encoded)
+    return page
+
+
+def prune_tombstones(age: Optional[datetime.timedelta] = None) -> int:
+    """
+    Удаляет записи об удалениях старше `age` (по умолчанию GOALS_SYNC_TOMBSTONE_DAYS) и сдвигает SyncHorizon.
+    Удаляется все до наибольшего `change_xid` среди старых записей, чтобы за границей не осталось пропусков.
+    """
+    if age is None:
+        age = datetime.timedelta(days=settings.GOALS_SYNC_TOMBSTONE_DAYS)
+    with transaction.atomic():
+        newest = SyncTombstone.objects.filter(created__lt=timezone.now() - age).aggregate(xid=Max("change_xid"))["xid"]
+        if newest is None:
+            return 0
+        deleted, _ = SyncTombstone.objects.filter(change_xid__lte=newest).delete()
+        SyncHorizon.objects.update_or_create(id=1, defaults={"change_xid": newest + 1})
+    return deleted
+
+
+class DeltaSync:
+    """
+    Изменения с момента курсора по доскам пользователя.
+
+    Курсор — xmin снимка БД, взятый до чтения данных. В каждую строку триггер записывает номер
+    изменившей ее транзакции (`change_xid`), поэтому строки с `change_xid >= курсор` —
+    это все, что могло измениться после предыдущего ответа, включая транзакции, которые тогда
+    еще не завершились. Выборка идет по индексам `change_xid` и стоит O(изменений).
+    Изменения из незавершенных на момент ответа транзакций могут прийти повторно,
+    поэтому клиент применяет их как upsert.
+
+    Ответ разбит на страницы не больше `page_size` объектов: разделы идут по порядку `sections`,
+    внутри раздела — по `id`. Пока `has_more`, клиент запрашивает `next` и сохраняет `cursor`
+    только после последней страницы; курсор взят до первой страницы, поэтому изменения,
+    сделанные во время обхода, придут в следующей синхронизации.
+
+    Порядок применения на клиенте: сначала `lost_boards` и `deleted`, затем измененные объекты.
+    Без курсора (или для доски, куда пользователя только что добавили) отдаются все объекты.
+    Курсор старше SyncHorizon — CursorExpired: записи об удалениях за этот период уже вычищены.
+    """
+    sections = ("boards", "participants", "categories", "goals", "comments", "deleted")
+
+    def __init__(self, user, since: Optional[int] = None, goals: Optional[QuerySet] = None,
+                 page: Optional[dict] = None, page_size: Optional[int] = None):
+        self.user = user
+        self.page = page
+        self.since = page["since"] if page else since
+        self.goals = goals if goals is not None else Goal.objects.select_related("user")
+        self.page_size = page_size or settings.GOALS_SYNC_PAGE_SIZE
+
+    def changed(self, queryset: QuerySet, joined: list, board_field: str = "board_id") -> QuerySet:
+        if self.since is None:
+            return queryset
+        return queryset.filter(Q(change_xid__gte=self.since) | Q(**{f"{board_field}__in": joined}))
+
+    def check_horizon(self) -> None:
+        horizon = SyncHorizon.objects.values_list("change_xid", flat=True).first()
+        if self.since is not None and horizon is not None and self.since < horizon:
+            raise CursorExpired(self.since)
+
+    def run(self) -> dict:
+        self.check_horizon()
+        # Курсор берется до чтения: все, что изменится во время чтения, попадет в следующий ответ
+        cursor = self.page["cursor"] if self.page else snapshot_xmin()
+        memberships = dict(BoardParticipant.objects.filter(user=self.user).values_list("board_id", "change_xid"))
+        # Доски, в которые пользователя добавили после курсора: их старые объекты клиенту еще не известны
+        joined = [board_id for board_id, change_xid in memberships.items()
+                  if self.since is not None and change_xid >= self.since]
+        visible = is_participant(self.user)
+
+        querysets = {
+            "boards": self.changed(Board.objects.filter(id__in=memberships), joined, "id"),
+            "participants": self.changed(BoardParticipant.objects.filter(visible).select_related("user"), joined),
+            "categories": self.changed(GoalCategory.objects.filter(visible).select_related("user"), joined),
+            "goals": self.changed(self.goals.filter(visible), joined),
+            "comments": self.changed(GoalComment.objects.filter(visible).select_related("user"), joined),
+            "deleted": SyncTombstone.objects.filter(
+                visible | Q(user=self.user, kind=SyncTombstone.Kind.participant), change_xid__gte=self.since,
+            ) if self.since is not None else SyncTombstone.objects.none(),
+        }
+        result = {section: [] for section in self.sections}
+        result.update({"cursor": cursor, "lost_boards": [], "next": None, "has_more": False})
+
+        remaining = self.page_size
+        start = self.sections.index(self.page["section"]) if self.page else 0
+        after = self.page["after"] if self.page else 0
+        for section in self.sections[start:]:
+            if remaining == 0:
+                result["next"] = encode_page({"since": self.since, "cursor": cursor, "section": section, "after": 0})
+                break
+            rows = list(querysets[section].filter(id__gt=after).order_by("id")[:remaining + 1])
+            if len(rows) > remaining:
+                rows = rows[:remaining]
+                result["next"] = encode_page(
+                    {"since": self.since, "cursor": cursor, "section": section, "after": rows[-1].id}
+                )
+            result[section] = rows
+            remaining -= len(rows)
+            after = 0
+            if result["next"]:
+                break
+        result["has_more"] = result["next"] is not None
+
+        tombstones, result["deleted"] = result["deleted"], []
+        for tombstone in tombstones:
+            if tombstone.user_id == self.user.pk and tombstone.board_id not in memberships:
+                result["lost_boards"].append(tombstone.board_id)
+            else:
+                result["deleted"].append(
+                    {"kind": tombstone.kind, "id": tombstone.object_id, "board": tombstone.board_id}
+                )
+        return result
@@ -10,6 +10,11 @@ urlpatterns = [
 
     path("goal/create", views.GoalCreateView.as_view(), name='goal_create'),
     path("goal/list", views.GoalListView.as_view(), name='goal_list'),
+    path("goal/batch", views.GoalBatchView.as_view(), name='goal_batch'),
+    path("goal/import", views.GoalImportView.as_view(), name='goal_import'),
+    path("goal/archive/list", views.ArchivedGoalListView.as_view(), name='archive_list'),
+    path("goal/archive/<pk>", views.ArchivedGoalView.as_view(), name='archive_pk'),
+    path("goal/archive/<pk>/restore", views.ArchivedGoalRestoreView.as_view(), name='archive_restore'),
     path("goal/<pk>", views.GoalView.as_view(), name='goal_pk'),
 
     path("goal_comment/create", views.CommentCreateView.as_view(), name='comment_create'),
@@ -19,4 +24,10 @@ urlpatterns = [
     path("board/create", views.BoardCreateView.as_view(), name='board_create'),
     path("board/list", views.BoardListView.as_view(), name='board_list'),
     path("board/<pk>", views.BoardView.as_view(), name='board_pk'),
+    path("board/<pk>/dashboard", views.BoardDashboardView.as_view(), name='board_dashboard'),
+    path("board/<pk>/export", views.BoardExportView.as_view(), name='board_export'),
+
+    path("sync", views.SyncView.as_view(), name='sync'),
+    path("cache/stats", views.CacheStatsView.as_view(), name='cache_stats'),
+    path("cascade/<pk>", views.CascadeTaskView.as_view(), name='cascade_pk'),
 ]
\ No newline at end of file
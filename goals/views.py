@@ -1,18 +1,41 @@
-from django.db import transaction
-from django.db.models import QuerySet
-from rest_framework import permissions
+from django.conf import settings
+from django.db.models import QuerySet, Count, Prefetch, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import permissions, status
 from rest_framework.generics import (
     CreateAPIView,
+    GenericAPIView,
     ListAPIView,
+    RetrieveAPIView,
     RetrieveUpdateDestroyAPIView,
 )
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 
-from goals.filters import GoalDateFilter
-from goals.models import GoalCategory, Goal, GoalComment, Board
-from goals.permissions import GoalCategoryPermissions, GoalPermissions, CommentPermissions, BoardPermissions
+from goals.archive import restore_goal
+from goals.batch import GoalBatch
+from goals.cache import CachedListMixin, get_stats
+from goals.cascade import run_cascade, start_cascade
+from goals.conditional import ConditionalGetMixin
+from goals.export import BoardExport, ExportStreamingHttpResponse
+from goals.filters import GoalDateFilter, FullTextSearchFilter
+from goals.importer import import_file
+from goals.lean import LeanListMixin
+from goals.models import ArchivedComment, ArchivedGoal, GoalCategory, Goal, GoalComment, Board, BoardParticipant, CascadeTask
+from goals.pagination import KeysetOrOffsetPagination
+from goals.permissions import (
+    GoalCategoryPermissions,
+    GoalPermissions,
+    CommentPermissions,
+    BoardPermissions,
+    get_board_roles,
+    is_participant,
+)
+from goals.renderers import FastJSONRenderer
 from goals.serializers import (
     GoalCreateSerializer,
     GoalCategorySerializer,
@@ -20,7 +43,41 @@ from goals.serializers import (
     CommentCreateSerializer,
     CommentSerializer,
     GoalCategoryCreateSerializer, BoardSerializer, BoardCreateSerializer, BoardListSerializer,
+    GoalBatchOperationSerializer, CascadeTaskSerializer, BoardDashboardSerializer, SyncSerializer,
+    ArchivedGoalSerializer, ArchivedGoalDetailSerializer,
 )
+from goals.summary import board_dashboard
+from goals.sync import CursorExpired, DeltaSync, decode_page
+
+
+def goal_queryset() -> QuerySet[Goal]:
+    """
+    Цели вместе с автором и числом комментариев.
+    Связанные объекты подгружаются одним запросом, независимо от размера страницы.
+    """
+    comments_count = GoalComment.objects.filter(goal=OuterRef("pk")).order_by().values("goal").annotate(
+        count=Count("id"),
+    ).values("count")
+    return Goal.objects.select_related("user").annotate(comments_count=Coalesce(Subquery(comments_count), 0))
+
+
+class CascadeDestroyMixin:
+    """
+    Удаление с каскадом. `perform_destroy` помечает объект удаленным и возвращает CascadeTask.
+    С `?async=1` или `?async=true` (или GOALS_CASCADE_ASYNC) каскад выполняет воркер `runcascade`, а ответ 202
+    содержит задачу, ход которой виден в `cascade/<pk>`. Иначе каскад выполняется здесь же порциями,
+    а задача создается уже взятой, чтобы ее не забрал и воркер.
+    """
+
+    def is_async(self) -> bool:
+        return self.request.query_params.get("async", "").lower() in ("1", "true") or settings.GOALS_CASCADE_ASYNC
+
+    def destroy(self, request, *args, **kwargs):
+        task = self.perform_destroy(self.get_object())
+        if self.is_async():
+            return Response(CascadeTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+        run_cascade(task)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -30,37 +87,39 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(CachedListMixin, ConditionalGetMixin, LeanListMixin, ListAPIView):
     """ Модель представления, которая позволяет просматривать все объекты Category """
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategorySerializer
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter, ]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = KeysetOrOffsetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter, ]
     ordering_fields = ["title", "created"]
     filterset_fields = ["board", "user"]
     ordering = ["title"]
     search_fields = ["title"]
+    cache_namespace = "categories"
 
     def get_queryset(self):
-        return GoalCategory.objects.filter(board__participants__user=self.request.user, is_deleted=False)
+        return GoalCategory.objects.filter(
+            is_participant(self.request.user), is_deleted=False, board__is_deleted=False,
+        ).select_related("user")
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(CascadeDestroyMixin, ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Модель представления, которая позволяет редактировать и удалять объекты из Category """
     model = GoalCategory
     serializer_class = GoalCategorySerializer
     permission_classes = [permissions.IsAuthenticated, GoalCategoryPermissions]
 
     def get_queryset(self) -> QuerySet[GoalCategory]:
-        return GoalCategory.objects.filter(board__participants__user=self.request.user).exclude(is_deleted=True)
+        return GoalCategory.objects.filter(
+            board_id__in=get_board_roles(self.request).board_ids, board__is_deleted=False,
+        ).exclude(is_deleted=True).select_related("user")
 
     def perform_destroy(self, instance):
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            Goal.objects.filter(category=instance).update(status=Goal.Status.archived)
-        return instance
+        return start_cascade(self.request.user, category=instance, claimed=not self.is_async())
 
 
 class GoalCreateView(CreateAPIView):
@@ -70,14 +129,47 @@ class GoalCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalBatchView(GenericAPIView):
+    """
+    Модель представления для пакетной работы с объектами Goal.
+    Принимает список операций `create`/`update`/`status` и возвращает результат по каждой из них.
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchOperationSerializer
+
+    def post(self, request, *args, **kwargs):
+        return Response({"results": GoalBatch(request).run(request.data)})
+
+
+class GoalImportView(GenericAPIView):
+    """
+    Модель представления массового импорта целей из файла `file` (multipart).
+    Формат — `type` (csv или ndjson), по умолчанию определяется по расширению файла.
+    В ответе — число созданных целей, ошибки по номерам строк и скорость загрузки.
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Обязательное поле"})
+        file_type = request.data.get("type") or ("csv" if upload.name.endswith(".csv") else "ndjson")
+        if file_type not in ("csv", "ndjson"):
+            raise ValidationError({"type": "Допустимые значения: csv, ndjson"})
+        return Response(import_file(request.user, upload.file, file_type))
+
+
+class GoalView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Модель представления, которая позволяет редактировать и удалять объекты Goal. """
     model = Goal
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated, GoalPermissions]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        return goal_queryset().filter(board_id__in=get_board_roles(self.request).board_ids)
 
     def perform_destroy(self, instance):
         instance.status = Goal.Status.archived
@@ -85,7 +177,7 @@ class GoalView(RetrieveUpdateDestroyAPIView):
         return instance
 
 
-class GoalListView(ListAPIView):
+class GoalListView(ConditionalGetMixin, LeanListMixin, ListAPIView):
     """
     Модель представления, которая позволяет выводить все объекты Goal,
     сортировать, фильтровать и искать по полям `title`, `description`
@@ -93,15 +185,74 @@ class GoalListView(ListAPIView):
     model = Goal
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, ]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = KeysetOrOffsetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter, ]
     filterset_class = GoalDateFilter
     search_fields = ["title", "description"]
     ordering_fields = ["due_date", "priority"]
-    ordering = ["priority", "due_date"]
+    ordering = ["priority", "due_date", "id"]
+
+    def get_queryset(self):
+        return goal_queryset().filter(is_participant(self.request.user))
+
+    def get_etag_querysets(self) -> list:
+        # Новый комментарий меняет `comments_count` в списке, не меняя саму цель
+        comments = GoalComment.objects.filter(is_participant(self.request.user))
+        return super().get_etag_querysets() + [comments]
+
+
+class ArchivedGoalListView(ListAPIView):
+    """
+    Модель представления целей, перенесенных в архив командой `archivegoals`.
+    Только чтение; фильтрация по `board` и `category`, новые переносы — первыми.
+    """
+    model = ArchivedGoal
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ArchivedGoalSerializer
+    pagination_class = KeysetOrOffsetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["board", "category"]
+    ordering_fields = ["archived", "updated"]
+    # Цели одного переноса получают одинаковое `archived` — порядок и курсор внутри него задает `id`
+    ordering = ["-archived", "-id"]
+
+    def get_queryset(self):
+        return ArchivedGoal.objects.filter(is_participant(self.request.user)).select_related("user")
+
+
+class ArchivedGoalView(RetrieveAPIView):
+    """ Модель представления цели из архива вместе с комментариями """
+    model = ArchivedGoal
+    permission_classes = [permissions.IsAuthenticated, GoalPermissions]
+    serializer_class = ArchivedGoalDetailSerializer
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        return ArchivedGoal.objects.filter(
+            board_id__in=get_board_roles(self.request).board_ids,
+        ).select_related("user").prefetch_related(
+            Prefetch("comments", queryset=ArchivedComment.objects.select_related("user").order_by("-id")),
+        )
+
+
+class ArchivedGoalRestoreView(GenericAPIView):
+    """
+    Модель восстановления цели из архива: цель и ее комментарии возвращаются в основные таблицы
+    с прежними id и статусом «К выполнению». Доступно владельцу и редактору доски.
+    """
+    model = ArchivedGoal
+    permission_classes = [permissions.IsAuthenticated, GoalPermissions]
+    serializer_class = GoalSerializer
+
+    def get_queryset(self):
+        return ArchivedGoal.objects.filter(board_id__in=get_board_roles(self.request).board_ids)
+
+    def post(self, request, *args, **kwargs):
+        archived = self.get_object()
+        if GoalCategory.objects.filter(id=archived.category_id, is_deleted=True).exists():
+            raise ValidationError({"category": "Категория цели удалена"})
+        restore_goal(archived)
+        return Response(self.get_serializer(goal_queryset().get(id=archived.id)).data)
 
 
 class CommentCreateView(CreateAPIView):
@@ -111,52 +262,105 @@ class CommentCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class CommentView(RetrieveUpdateDestroyAPIView):
+class CommentView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Модель представления, которая позволяет редактировать и удалять объекты Comment. """
     model = GoalComment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, CommentPermissions]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.filter(
+            board_id__in=get_board_roles(self.request).board_ids,
+        ).select_related("user")
 
 
-class CommentListView(ListAPIView):
+class CommentListView(ConditionalGetMixin, LeanListMixin, ListAPIView):
     """
     Модель представления, которая позволяет выводить все объекты Comment.
     Так же сортирует и делает фильтрацию по полю `goal`.
     """
     model = GoalComment
     serializer_class = CommentSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetOrOffsetPagination
     filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields = ["goal"]
     ordering = "-id"
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.filter(is_participant(self.request.user)).select_related("user")
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(CascadeDestroyMixin, ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Модель объекта `Доска` """
     model = Board
     permission_classes = [permissions.IsAuthenticated, BoardPermissions]
     serializer_class = BoardSerializer
 
     def get_queryset(self):
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(
+            id__in=get_board_roles(self.request).board_ids, is_deleted=False,
+        ).prefetch_related(
+            Prefetch("participants", queryset=BoardParticipant.objects.select_related("user")),
+        )
 
     def perform_destroy(self, instance: Board):
         # При удалении доски помечаем ее как is_deleted,
-        # «удаляем» категории, обновляем статус целей
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
+        # «удаляем» категории и обновляем статус целей каскадом
+        return start_cascade(self.request.user, board=instance, claimed=not self.is_async())
+
+
+class BoardDashboardView(RetrieveAPIView):
+    """
+    Модель дашборда доски: число целей по категориям, статусам и приоритетам и число просроченных.
+    Читается из сводок BoardSummary и BoardDueSummary, без агрегации по таблице целей.
+    """
+    model = Board
+    permission_classes = [permissions.IsAuthenticated, BoardPermissions]
+    serializer_class = BoardDashboardSerializer
+
+    def get_queryset(self):
+        return Board.objects.filter(id__in=get_board_roles(self.request).board_ids, is_deleted=False)
+
+    def retrieve(self, request, *args, **kwargs):
+        board = self.get_object()
+        return Response(self.get_serializer(board_dashboard(board.id)).data)
 
-        return instance
+
+class BoardExportView(GenericAPIView):
+    """
+    Модель выгрузки целей и комментариев доски потоком.
+    `?type=csv` (по умолчанию) или `?type=ndjson`, `?comments=0` — без комментариев.
+    Поддерживает те же фильтры целей, что и `goal/list` (GoalDateFilter).
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoalDateFilter
+    content_types = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson; charset=utf-8"}
+
+    def get_queryset(self):
+        return Goal.objects.filter(board_id=self.kwargs["pk"])
+
+    def get(self, request, *args, **kwargs):
+        export_type = request.query_params.get("type", "csv")
+        if export_type not in self.content_types:
+            raise ValidationError({"type": "Допустимые значения: csv, ndjson"})
+        board = Board.objects.filter(
+            id=kwargs["pk"], id__in=get_board_roles(request).board_ids, is_deleted=False,
+        ).first()
+        if board is None:
+            raise NotFound()
+
+        export = BoardExport(board.id, self.filter_queryset(self.get_queryset()),
+                             comments=request.query_params.get("comments") != "0")
+        response = ExportStreamingHttpResponse(getattr(export, export_type)(),
+                                               content_type=self.content_types[export_type])
+        response["Content-Disposition"] = 'attachment; filename="board-{}.{}"'.format(board.id, export_type)
+        # Отключает буферизацию ответа в nginx: строки уходят клиенту по мере чтения из БД
+        response["X-Accel-Buffering"] = "no"
+        return response
 
 
 class BoardCreateView(CreateAPIView):
@@ -166,14 +370,64 @@ class BoardCreateView(CreateAPIView):
     serializer_class = BoardCreateSerializer
 
 
-class BoardListView(ListAPIView):
+class BoardListView(CachedListMixin, ConditionalGetMixin, LeanListMixin, ListAPIView):
     """ Модель отображения всех объектов `Доска`. """
     model = Board
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetOrOffsetPagination
     serializer_class = BoardListSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     filter_backends = [filters.OrderingFilter, ]
     ordering = ["title"]
+    cache_namespace = "boards"
 
     def get_queryset(self):
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(is_participant(self.request.user, "pk"), is_deleted=False)
+
+
+class SyncView(GenericAPIView):
+    """
+    Модель представления дельта-синхронизации досок, участников, категорий, целей и комментариев.
+    `?since=` — курсор из предыдущего ответа; без него отдаются все объекты пользователя.
+    `?next=` — продолжение из ответа с `has_more`. Курсор старше срока хранения удалений — 410,
+    клиент синхронизируется заново без `since`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SyncSerializer
+
+    def get(self, request, *args, **kwargs):
+        since, page = request.query_params.get("since"), request.query_params.get("next")
+        if page is not None:
+            try:
+                page = decode_page(page)
+            except ValueError:
+                raise ValidationError({"next": "Неверный курсор"})
+        elif since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                raise ValidationError({"since": "Неверный курсор"})
+        try:
+            result = DeltaSync(request.user, since, goals=goal_queryset(), page=page).run()
+        except CursorExpired:
+            return Response({"detail": "Курсор устарел, нужна полная синхронизация", "full_resync": True},
+                            status=status.HTTP_410_GONE)
+        return Response(self.get_serializer(result).data)
+
+
+class CascadeTaskView(RetrieveAPIView):
+    """ Модель представления хода каскадного удаления доски или категории """
+    model = CascadeTask
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CascadeTaskSerializer
+
+    def get_queryset(self):
+        return CascadeTask.objects.filter(user=self.request.user)
+
+
+class CacheStatsView(GenericAPIView):
+    """ Модель представления счетчиков кеша списков: попадания, промахи и занятый объем """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats())
@@ -2,13 +2,15 @@ from datetime import datetime
 from typing import Dict
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.response import Response
 
-from goals.models import Board
+from goals.models import Board, BoardParticipant
 from goals.serializers import BoardCreateSerializer, BoardSerializer
-from tests.factories import BoardParticipantFactory, BoardFactory
+from tests.factories import BoardParticipantFactory, BoardFactory, UserFactory
 
 
 @pytest.mark.django_db
@@ -181,4 +183,53 @@ class TestBoardView:
 
         assert (
                 response.status_code == status.HTTP_403_FORBIDDEN
-        ), "Отказ в доступе не предоставлен"
\ No newline at end of file
+        ), "Отказ в доступе не предоставлен"
+
+    def test_board_update_participants(self, auth_client, user) -> None:
+        """
+        Тест, чтобы проверить замену участников доски: удаление, смену роли и добавление,
+        причем число запросов не зависит от количества участников.
+        """
+        def update(board, participants) -> CaptureQueriesContext:
+            url: str = reverse("goals:board_pk", kwargs={"pk": board.id})
+            data = {"title": "Updated", "participants": participants}
+            with CaptureQueriesContext(connection) as context:
+                response: Response = auth_client.put(url, data=data, format="json")
+            assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            return context
+
+        def share(size: int):
+            board = BoardFactory()
+            BoardParticipantFactory(board=board, user=user)
+            kept, changed, removed = (BoardParticipantFactory(board=board, role=BoardParticipant.Role.reader)
+                                      for _ in range(3))
+            added = UserFactory.create_batch(size=size)
+            participants = [
+                {"user": kept.user.username, "role": BoardParticipant.Role.reader},
+                {"user": changed.user.username, "role": BoardParticipant.Role.writer},
+            ] + [{"user": new.username, "role": BoardParticipant.Role.writer} for new in added]
+            return board, participants, removed
+
+        board, participants, removed = share(size=2)
+        few = update(board, participants)
+        roles = dict(board.participants.values_list("user__username", "role"))
+        assert removed.user.username not in roles, "Участник не удален"
+        assert roles == {user.username: BoardParticipant.Role.owner,
+                         **{part["user"]: part["role"] for part in participants}}
+
+        board, participants, _ = share(size=30)
+        many = update(board, participants)
+        assert board.participants.count() == 33
+        assert len(many) == len(few), "Количество запросов растет вместе с числом участников"
+
+    def test_board_update_unknown_user(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что несуществующий пользователь не добавляется в доску """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        url: str = reverse("goals:board_pk", kwargs={"pk": board.id})
+        data = {"title": "Updated", "participants": [{"user": "nobody", "role": BoardParticipant.Role.writer}]}
+
+        response: Response = auth_client.put(url, data=data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"participants": ["Пользователь nobody не найден"]}
@@ -0,0 +1,134 @@
+import datetime
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals import summary
+from goals.models import BoardDueSummary, BoardSummary, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+def summary_state(board) -> set:
+    return set(BoardSummary.objects.filter(board=board, count__gt=0).values_list(
+        "category_id", "status", "priority", "count",
+    )) | set(BoardDueSummary.objects.filter(board=board, count__gt=0).values_list(
+        "category_id", "status", "priority", "due_date", "count",
+    ))
+
+
+@pytest.mark.django_db
+class TestBoardDashboard:
+    """ Тесты сводки и дашборда доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return board
+
+    def test_dashboard(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить итоги дашборда и то, что цели не агрегируются при чтении """
+        category = CategoryFactory(board=board)
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        GoalFactory.create_batch(size=2, category=category, priority=Goal.Priority.high, due_date=yesterday)
+        GoalFactory(category=category, status=Goal.Status.done, due_date=yesterday)
+        GoalFactory(category=CategoryFactory())
+
+        url = reverse("goals:board_dashboard", kwargs={"pk": board.id})
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(url)
+
+        data = response.json()
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert data["total"] == 3 and data["overdue"] == 2, "Неверные итоги"
+        assert data["by_status"][str(Goal.Status.to_do)] == 2, "Неверный итог по статусу"
+        assert data["by_priority"][str(Goal.Priority.high)] == 2, "Неверный итог по приоритету"
+        assert data["rows"][0]["category_title"] == category.title, "Нет названия категории"
+        assert not [query for query in context.captured_queries if "goals_goal\"" in query["sql"]], \
+            "Дашборд агрегирует таблицу целей"
+
+    def test_dashboard_not_participant(self, auth_client) -> None:
+        """ Тест, чтобы проверить, что дашборд чужой доски недоступен """
+        response = auth_client.get(reverse("goals:board_dashboard", kwargs={"pk": BoardFactory().id}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND, "Получен дашборд чужой доски"
+
+    def test_incremental_matches_rebuild(self, auth_client, board) -> None:
+        """
+        Тест, чтобы проверить, что сводка, обновленная при изменении, пакетной операции и каскаде,
+        совпадает с пересобранной с нуля.
+        """
+        first, second = CategoryFactory.create_batch(size=2, board=board)
+        goal = GoalFactory(category=first)
+        GoalFactory.create_batch(size=3, category=second)
+
+        goal.category = second
+        goal.priority = Goal.Priority.critical
+        goal.save()
+        auth_client.post(reverse("goals:goal_batch"), format="json", data=[
+            {"action": "create", "data": {"category": first.id, "title": "Новая"}},
+            {"action": "status", "id": goal.id, "status": Goal.Status.in_progress},
+        ])
+        auth_client.delete(reverse("goals:category_pk", kwargs={"pk": second.id}))
+
+        incremental = summary_state(board)
+        assert (second.id, Goal.Status.archived, Goal.Priority.medium, 3) in incremental, "Каскад не учтен"
+
+        call_command("rebuildsummary")
+        assert summary_state(board) == incremental, "Сводка расходится с пересобранной"
+
+    def test_overdue_by_date(self, auth_client, board, monkeypatch) -> None:
+        """
+        Тест, чтобы проверить, что цель, ставшая просроченной со сменой дня,
+        считается просроченной без пересборки, а после выполнения счетчики не уходят в минус.
+        """
+        today = datetime.date.today()
+        goal = GoalFactory(category=CategoryFactory(board=board), due_date=today)
+        url = reverse("goals:board_dashboard", kwargs={"pk": board.id})
+        assert auth_client.get(url).json()["overdue"] == 0, "Цель на сегодня считается просроченной"
+
+        monkeypatch.setattr(summary.timezone, "localdate", lambda: today + datetime.timedelta(days=2))
+        data = auth_client.get(url).json()
+        assert data["overdue"] == 1 and data["rows"][0]["overdue_count"] == 1, "Просрочка не учтена со сменой дня"
+
+        goal.status = Goal.Status.done
+        goal.save()
+        assert auth_client.get(url).json()["overdue"] == 0, "Выполненная цель считается просроченной"
+        assert not BoardDueSummary.objects.filter(count__lt=0).exists(), "Счетчик ушел в минус"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRebuildSummary:
+    """ Тесты пересборки сводки """
+
+    def test_rebuild_locks_board(self) -> None:
+        """ Тест, чтобы проверить, что пересборка доски не ждет незавершенных изменений целей другой доски """
+        board, other = BoardFactory(), BoardFactory()
+        GoalFactory.create_batch(size=2, category=CategoryFactory(board=board))
+        other_goal = GoalFactory(category=CategoryFactory(board=other))
+        updated, release = threading.Event(), threading.Event()
+
+        def update_other():
+            with transaction.atomic():
+                Goal.objects.filter(id=other_goal.id).update(status=Goal.Status.in_progress)
+                updated.set()
+                release.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=update_other)
+        thread.start()
+        updated.wait(10)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SET lock_timeout = '2s'")
+            rows = summary.rebuild_summary(board.id)
+        finally:
+            release.set()
+            thread.join()
+
+        assert rows == 1, "Сводка доски не пересобрана"
+        assert BoardSummary.objects.get(board=other, status=Goal.Status.in_progress).count == 1
@@ -0,0 +1,103 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from goals import cascade, views
+from goals.cascade import claim_next_task
+from goals.models import Board, CascadeTask, Goal, GoalCategory
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardDelete:
+    """ Тесты каскадного удаления досок и категорий """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        for category in CategoryFactory.create_batch(size=2, board=board):
+            GoalFactory.create_batch(size=3, category=category)
+        return board
+
+    def test_board_delete_sync(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить, что без `?async=1` каскад выполняется в запросе """
+        response: Response = auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert Board.objects.get(id=board.id).is_deleted
+        assert not GoalCategory.objects.filter(board=board, is_deleted=False).exists()
+        assert not Goal.objects.filter(board=board).exclude(status=Goal.Status.archived).exists()
+
+    def test_sync_task_not_claimed(self, auth_client, board, monkeypatch) -> None:
+        """ Тест, чтобы проверить, что каскад, выполняемый в запросе, не может забрать и воркер `runcascade` """
+        claimed = []
+
+        def run_cascade(task):
+            claimed.append(claim_next_task())
+            return cascade.run_cascade(task)
+
+        monkeypatch.setattr(views, "run_cascade", run_cascade)
+        response: Response = auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert claimed == [None], "Воркер забрал задачу, которую выполняет запрос"
+        task = CascadeTask.objects.get(board=board)
+        assert task.status == CascadeTask.Status.done and task.processed == task.total == 8
+
+    @pytest.mark.parametrize("flag", ["0", "false", "False", ""])
+    def test_board_delete_async_off(self, auth_client, board, flag) -> None:
+        """ Тест, чтобы проверить, что `?async=0` и `?async=false` не включают фоновый каскад """
+        url = reverse("goals:board_pk", kwargs={"pk": board.id})
+
+        response: Response = auth_client.delete(f"{url}?async={flag}")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT, "Каскад ушел воркеру"
+        assert not CascadeTask.objects.filter(status=CascadeTask.Status.pending).exists()
+        assert not Goal.objects.filter(board=board).exclude(status=Goal.Status.archived).exists()
+
+    def test_board_delete_async(self, auth_client, board) -> None:
+        """
+        Тест, чтобы проверить, что с `?async=1` доска сразу скрывается,
+        а категории и цели обрабатывает воркер порциями с видимым прогрессом.
+        """
+        url = reverse("goals:board_pk", kwargs={"pk": board.id})
+
+        response: Response = auth_client.delete(f"{url}?async=1")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["status"] == CascadeTask.Status.pending
+        assert auth_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert auth_client.get(reverse("goals:category_list")).json() == [], "Видны категории удаленной доски"
+        assert Goal.objects.filter(board=board, status=Goal.Status.archived).count() == 0
+
+        call_command("runcascade", "--once", "--chunk-size", "4")
+
+        task = auth_client.get(reverse("goals:cascade_pk", kwargs={"pk": response.json()["id"]})).json()
+        assert (task["status"], task["processed"], task["total"]) == (CascadeTask.Status.done, 8, 8)
+        assert Goal.objects.filter(board=board, status=Goal.Status.archived).count() == 6
+
+    def test_category_delete_async(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить фоновую архивацию целей удаленной категории """
+        category = board.categories.first()
+        url = reverse("goals:category_pk", kwargs={"pk": category.id})
+
+        response: Response = auth_client.delete(f"{url}?async=1")
+        call_command("runcascade", "--once")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert CascadeTask.objects.get(id=response.json()["id"]).status == CascadeTask.Status.done
+        assert set(Goal.objects.filter(category=category).values_list("status", flat=True)) == {
+            Goal.Status.archived}
+        assert Goal.objects.filter(board=board).exclude(status=Goal.Status.archived).count() == 3
+
+    def test_cascade_task_other_user(self, client, board, another_user) -> None:
+        """ Тест, чтобы проверить, что ход чужого каскада недоступен """
+        task = CascadeTask.objects.create(board=board, user=board.participants.get().user)
+        client.force_login(another_user)
+
+        response: Response = client.get(reverse("goals:cascade_pk", kwargs={"pk": task.id}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,114 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import status
+
+from goals.export import BoardExport
+from goals.models import Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+def content(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestBoardExport:
+    """ Тесты потоковой выгрузки доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return board
+
+    def test_export_csv(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить выгрузку целей и комментариев доски в CSV с фильтром GoalDateFilter """
+        category = CategoryFactory(board=board)
+        high = GoalFactory.create_batch(size=2, category=category, priority=Goal.Priority.high)
+        GoalFactory(category=category, priority=Goal.Priority.low)
+        GoalFactory()
+        comment = GoalCommentFactory(goal=high[0], text="Первый, с запятой")
+
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}),
+                                   {"priority": Goal.Priority.high})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert isinstance(response, StreamingHttpResponse), "Ответ не потоковый"
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert {int(row["id"]) for row in rows if row["record"] == "goal"} == {goal.id for goal in high}, \
+            "Неверный список целей"
+        comments = [row for row in rows if row["record"] == "comment"]
+        assert [(int(row["id"]), row["text"]) for row in comments] == [(comment.id, comment.text)], \
+            "Неверный список комментариев"
+
+    def test_export_ndjson(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить выгрузку в NDJSON без комментариев """
+        goal = GoalFactory(category=CategoryFactory(board=board))
+        GoalCommentFactory(goal=goal)
+
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}),
+                                   {"type": "ndjson", "comments": "0"})
+
+        lines = [json.loads(line) for line in content(response).splitlines()]
+        assert lines[0] == {"record": "export", "board": board.id}, "Нет заголовка выгрузки"
+        assert [(line["record"], line["id"], line["title"]) for line in lines[1:]] == [
+            ("goal", goal.id, goal.title),
+        ], "Неверное содержимое выгрузки"
+
+    def test_export_not_participant(self, auth_client) -> None:
+        """ Тест, чтобы проверить, что чужую доску выгрузить нельзя """
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": BoardFactory().id}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND, "Выгружена чужая доска"
+
+
+async def asgi_get(application, path: str, cookie: str) -> tuple[int, bytes]:
+    """ GET через ASGI-приложение целиком: статус и тело до последней части """
+    communicator = ApplicationCommunicator(application, {
+        "type": "http", "method": "GET", "path": path, "query_string": b"",
+        "headers": [(b"cookie", cookie.encode())],
+    })
+    await communicator.send_input({"type": "http.request"})
+    start = await communicator.receive_output(5)
+    body = b""
+    while True:
+        message = await communicator.receive_output(5)
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await communicator.wait(5)
+    return start["status"], body
+
+
+# Запрос обрабатывается в потоках ASGI-обработчика с их соединениями к БД — данные должны быть зафиксированы
+@pytest.mark.django_db(transaction=True)
+class TestBoardExportASGI:
+    """ Тесты выгрузки доски через ASGI-приложение (uvicorn todolist.asgi:application) """
+
+    def test_export_asgi(self, client, user, monkeypatch) -> None:
+        """ Тест, чтобы проверить, что выгрузка под ASGI отдается целиком, а не обрывается после заголовка """
+        from todolist.asgi import application
+
+        monkeypatch.setattr(BoardExport, "chunk_size", 2)
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goals = GoalFactory.create_batch(size=5, category=CategoryFactory(board=board))
+        GoalCommentFactory(goal=goals[0])
+        client.force_login(user)
+        cookie = "{}={}".format(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+        status_code, body = asyncio.run(asgi_get(application, reverse("goals:board_export", kwargs={"pk": board.id}),
+                                                 cookie))
+
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        assert status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert sorted(int(row["id"]) for row in rows if row["record"] == "goal") == sorted(goal.id for goal in goals), \
+            "Выгрузка оборвана"
+        assert [row["record"] for row in rows].count("comment") == 1, "Нет комментариев"
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeTelegram:
+    """
+    Локальный HTTP-сервер вместо api.telegram.org: запоминает вызовы методов и отвечает как Telegram.
+    В `errors[<метод>]` можно положить ответы-ошибки, которые метод выдаст первыми, например 429 с `retry_after`,
+    а `delay` задерживает все ответы. Соединения keep-alive; в `ports` — порт клиента каждого вызова.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.ports = []
+        self.delay = 0
+        self.updates = []  # ответ getUpdates
+        self.errors: dict[str, list[dict]] = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def methods(self, name: str) -> list[dict]:
+        return [params for method, params in self.calls if method == name]
+
+    def respond(self, method: str, params: dict, port: int) -> tuple[int, dict]:
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((method, params))
+            self.ports.append(port)
+            if self.errors.get(method):
+                error = self.errors[method].pop(0)
+                return error["error_code"], {"ok": False, **error}
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "Бот", "username": "test_bot"}}
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": self.updates}
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params["chat_id"])
+            return 200, {"ok": True, "result": {
+                "message_id": len(self.calls), "date": 0, "text": params.get("text"),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": 1, "is_bot": True, "first_name": "Бот", "username": "test_bot"},
+            }}
+        return 200, {"ok": True, "result": True}
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.answer(dict(parse_qsl(urlsplit(self.path).query)))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                params = dict(parse_qsl(urlsplit(self.path).query))
+                if body:
+                    if self.headers.get("Content-Type", "").startswith("application/json"):
+                        params.update(json.loads(body))
+                    else:
+                        params.update(parse_qsl(body.decode()))
+                self.answer(params)
+
+            def answer(self, params: dict):
+                method = urlsplit(self.path).path.rsplit("/", 1)[-1]
+                code, payload = fake.respond(method, params, self.client_address[1])
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,68 @@
+import pytest
+
+from bot import handlers
+from tests.factories import BoardFactory, BoardParticipantFactory, GoalFactory, TuserFactory
+
+
+@pytest.mark.django_db
+class TestBotLists:
+    """ Тесты постраничного вывода списков целей и досок в боте """
+
+    @pytest.fixture()
+    def tg_user(self, user):
+        return TuserFactory(user=user, chat_id=100, user_ud=100)
+
+    @staticmethod
+    def message(tg_user, text: str = "/goals") -> handlers.IncomingMessage:
+        return handlers.IncomingMessage(chat_id=tg_user.chat_id, chat_type="private", user_id=tg_user.user_ud,
+                                        username="ivan", first_name="Иван", text=text)
+
+    def test_goals_one_message_per_page(self, tg_user, user, settings, django_assert_num_queries) -> None:
+        """ Тест, чтобы проверить, что страница целей — одно сообщение, собранное одним запросом """
+        settings.BOT_PAGE_SIZE = 10
+        for number in range(25):
+            GoalFactory(user=user, title=f"Цель {number}")
+        replies = []
+
+        with django_assert_num_queries(1):
+            handlers.show_goals(self.message(tg_user), tg_user, replies)
+
+        assert len(replies) == 1, "Цели отправлены отдельными сообщениями"
+        assert "Цель 0," in replies[0].text and "Цель 9," in replies[0].text and "Цель 10," not in replies[0].text
+        assert replies[0].buttons == (("Вперед ▶", "goals:10"),)
+
+    def test_last_page(self, tg_user, user, settings) -> None:
+        """ Тест, чтобы проверить, что на последней странице есть только кнопка «Назад» """
+        settings.BOT_PAGE_SIZE = 10
+        for number in range(25):
+            GoalFactory(user=user, title=f"Цель {number}")
+        replies = []
+
+        handlers.show_goals(self.message(tg_user), tg_user, replies, offset=20)
+
+        assert "Цель 24," in replies[0].text and "Цель 19," not in replies[0].text
+        assert replies[0].buttons == (("◀ Назад", "goals:10"),)
+
+    def test_message_limit(self, tg_user, user) -> None:
+        """ Тест, чтобы проверить, что страница с длинными описаниями помещается в сообщение Telegram """
+        for _ in range(10):
+            GoalFactory(user=user, description="очень длинное описание " * 200)
+        replies = []
+
+        handlers.show_goals(self.message(tg_user), tg_user, replies)
+
+        assert len(replies[0].text) <= handlers.MESSAGE_LIMIT, "Сообщение длиннее допустимого"
+        assert replies[0].text.count("Название:") == 10, "Цели потеряны при сокращении"
+
+    def test_boards(self, tg_user, user, settings, django_assert_num_queries) -> None:
+        """ Тест, чтобы проверить список досок одним сообщением без запроса на каждую доску """
+        settings.BOT_PAGE_SIZE = 2
+        for title in ("Б", "А", "В"):
+            BoardParticipantFactory(board=BoardFactory(title=title), user=user)
+        replies = []
+
+        with django_assert_num_queries(1):
+            handlers.show_boards(self.message(tg_user, "/board"), tg_user, replies)
+
+        assert replies[0].text.endswith("Название карточек: А\n\nНазвание карточек: Б")
+        assert replies[0].buttons == (("Вперед ▶", "board:2"),)
@@ -0,0 +1,190 @@
+import asyncio
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from telegram import Bot
+
+from bot.outbox import MESSAGE_LIMIT, OutgoingMessage, Outbox, TokenBucket
+from bot.runner import BotRunner
+from bot.tg.client import TgClient
+from tests.bot_test.fake_telegram import FakeTelegram
+from tests.bot_test.test_bot_runner import make_update
+from tests.factories import GoalFactory, TuserFactory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RetryLater(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Too Many Requests")
+        self.retry_after = retry_after
+
+
+class TestTokenBucket:
+    """ Тесты ограничения частоты """
+
+    def test_reserve(self) -> None:
+        """ Тест, чтобы проверить, что после `burst` сообщений следующее ждет 1 / rate секунд """
+        clock = Clock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        assert [bucket.reserve(), bucket.reserve()] == [0, 0]
+        assert bucket.reserve() == 0.5, "Превышен лимит без ожидания"
+        clock.now = 10
+        assert bucket.full, "Токены не восстановились"
+
+
+class TestOutbox:
+    """ Тесты очереди исходящих сообщений """
+
+    def test_coalesce(self) -> None:
+        """ Тест, чтобы проверить, что подряд идущие сообщения чату уходят одним, а с кнопками — отдельно """
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+            return len(sent)
+
+        async def scenario():
+            outbox = Outbox(send, chat_rate=100)
+            futures = [outbox.put(OutgoingMessage(1, "раз")), outbox.put(OutgoingMessage(1, "два")),
+                       outbox.put(OutgoingMessage(1, "страница", buttons=(("Вперед ▶", "goals:10"),))),
+                       outbox.put(OutgoingMessage(1, "x" * (MESSAGE_LIMIT - 2))),
+                       outbox.put(OutgoingMessage(1, "три"))]
+            results = await asyncio.gather(*futures)
+            await outbox.close()
+            return results, outbox.stats()
+
+        results, stats = asyncio.run(scenario())
+
+        assert [message.text[:8] for message in sent] == ["раз\n\nдва", "страница", "x" * 8, "три"]
+        assert results == [1, 1, 2, 3, 4], "Результат отправки не передан склеенным сообщениям"
+        assert stats["sent"] == 5 and stats["depth"] == 0 and stats["latency_avg"] is not None
+
+    def test_chat_rate(self) -> None:
+        """ Тест, чтобы проверить, что сообщения чату идут не чаще лимита, а другой чат их не ждет """
+        times = {}
+
+        async def send(message):
+            times.setdefault(message.chat_id, []).append(time.monotonic())
+
+        async def scenario():
+            outbox = Outbox(send, chat_rate=10)
+            start = time.monotonic()
+            for number in range(3):
+                outbox.put(OutgoingMessage(1, f"{number}", buttons=(("1", "1"),)))
+            outbox.put(OutgoingMessage(2, "другой чат"))
+            await outbox.close()
+            return start
+
+        start = asyncio.run(scenario())
+
+        assert times[1][2] - times[1][0] >= 0.19, "Превышен лимит чата"
+        assert times[2][0] - start < 0.05, "Другой чат ждал чужого лимита"
+
+    def test_retry_after(self) -> None:
+        """ Тест, чтобы проверить, что при 429 сообщение повторяется через `retry_after` без нарушения порядка """
+        sent, errors = [], [RetryLater(0.1)]
+
+        async def send(message):
+            if errors:
+                raise errors.pop()
+            sent.append(message.text)
+
+        async def scenario():
+            outbox = Outbox(send, chat_rate=100)
+            start = time.monotonic()
+            outbox.put(OutgoingMessage(1, "первое", buttons=(("1", "1"),)))
+            outbox.put(OutgoingMessage(1, "второе"))
+            await outbox.close()
+            return time.monotonic() - start, outbox.stats()
+
+        elapsed, stats = asyncio.run(scenario())
+
+        assert sent == ["первое", "второе"], "Нарушен порядок после повтора"
+        assert elapsed >= 0.1, "Не выдержана пауза retry_after"
+        assert stats["retries"] == 1
+
+    def test_permanent_error(self) -> None:
+        """ Тест, чтобы проверить, что ошибка без `retry_after` не повторяется и передается ожидающему """
+        async def send(message):
+            raise ValueError("chat not found")
+
+        async def scenario():
+            outbox = Outbox(send)
+            with pytest.raises(ValueError):
+                await outbox.put(OutgoingMessage(1, "текст"))
+            return outbox.stats()
+
+        assert asyncio.run(scenario())["failed"] == 1
+
+
+class TestOutboxTelegram:
+    """ Тесты отправки через очередь на локальный сервер вместо Telegram """
+
+    def test_tg_client_retry_after(self, settings) -> None:
+        """ Тест, чтобы проверить, что TgClient повторяет сообщение после 429 и возвращает ответ Telegram """
+        settings.BOT_CHAT_RATE_LIMIT = 100
+        with FakeTelegram() as telegram:
+            telegram.errors["sendMessage"] = [{"error_code": 429, "description": "Too Many Requests",
+                                               "parameters": {"retry_after": 1}}]
+            client = TgClient("token", api_url=telegram.url)
+
+            response = client.send_message(100, "Привет")
+
+            assert response.ok, "Сообщение не отправлено"
+            assert [params["text"] for params in telegram.methods("sendMessage")] == ["Привет", "Привет"]
+            assert client.outbox.stats()["retries"] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_runner(self, user, settings) -> None:
+        """ Тест, чтобы проверить, что ответ бота доходит до Telegram через очередь, в том числе после 429 """
+        settings.BOT_CHAT_RATE_LIMIT = 100
+        tg_user = TuserFactory(user=user, chat_id=100, user_ud=100)
+        GoalFactory(user=user, title="Пробежать марафон")
+
+        with FakeTelegram() as telegram:
+            telegram.errors["sendMessage"] = [{"error_code": 429, "description": "Too Many Requests",
+                                               "parameters": {"retry_after": 1}}]
+            bot = Bot("token", base_url=f"{telegram.url}/bot")
+            runner = BotRunner(bot, concurrency=2, db_threads=2)
+
+            async def scenario():
+                async with bot:
+                    await runner.process(make_update(1, tg_user.chat_id, "/goals"))
+                    await runner.outbox.close()
+
+            asyncio.run(scenario())
+            runner.executor.shutdown()
+
+            sent = telegram.methods("sendMessage")
+            assert len(sent) == 2, "Сообщение не повторено после 429"
+            assert "Пробежать марафон" in sent[-1]["text"]
+
+
+@pytest.mark.django_db
+class TestOutboxStats:
+    """ Тесты просмотра состояния очереди исходящих """
+
+    def test_admin_only(self, auth_client) -> None:
+        """ Тест, чтобы проверить, что состояние очереди видит только администратор """
+        response = auth_client.get(reverse("bot:outbox_stats"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_stats(self, client, user_factory) -> None:
+        """ Тест, чтобы проверить, что администратор видит глубину очереди и задержку """
+        client.force_login(user_factory(is_staff=True))
+
+        response = client.get(reverse("bot:outbox_stats"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "outboxes" in response.json()
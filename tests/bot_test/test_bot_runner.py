@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from telegram import Update
+
+from bot.runner import BotRunner, ChatDispatcher
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, TuserFactory
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": text,
+            "chat": {"id": chat_id, "type": "private", "first_name": "Иван"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+        },
+    }, None)
+
+
+def make_callback(update_id: int, chat_id: int, data: str, message_id: int = 7) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id), "chat_instance": "1", "data": data,
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+            "message": {"message_id": message_id, "date": 0, "text": "Цели",
+                        "chat": {"id": chat_id, "type": "private", "first_name": "Иван"}},
+        },
+    }, None)
+
+
+class FakeBot:
+    """ Вместо telegram.Bot: запоминает отправленные сообщения """
+
+    def __init__(self):
+        self.sent = []
+        self.edited = []
+        self.answered = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+    async def edit_message_text(self, text, chat_id, message_id, reply_markup=None):
+        self.edited.append((chat_id, message_id, text, reply_markup))
+
+    async def answer_callback_query(self, callback_query_id):
+        self.answered.append(callback_query_id)
+
+
+class TestChatDispatcher:
+    """ Тесты распределения обновлений по чатам """
+
+    def test_order_within_chat_and_concurrency(self) -> None:
+        """
+        Тест, чтобы проверить, что обновления одного чата обрабатываются по порядку,
+        а разных чатов — параллельно, но не больше заданного числа.
+        """
+        processed, running, peak = [], [], []
+
+        async def process(update):
+            chat_id, number = update
+            running.append(chat_id)
+            peak.append(len(running))
+            await asyncio.sleep(0.01 * (3 - number))
+            running.remove(chat_id)
+            processed.append(update)
+
+        async def scenario():
+            dispatcher = ChatDispatcher(process, concurrency=2, max_pending=100)
+            for number in range(3):
+                for chat_id in ("a", "b", "c"):
+                    dispatcher.submit(chat_id, (chat_id, number))
+            await dispatcher.join()
+            assert not dispatcher.queues, "Очереди чатов не освобождены"
+
+        asyncio.run(scenario())
+
+        for chat_id in ("a", "b", "c"):
+            assert [number for chat, number in processed if chat == chat_id] == [0, 1, 2], "Нарушен порядок в чате"
+        assert max(peak) == 2, "Чаты не обрабатывались параллельно или превышен предел"
+
+    def test_backpressure(self) -> None:
+        """ Тест, чтобы проверить, что при `max_pending` необработанных обновлений прием приостанавливается """
+        async def scenario():
+            release = asyncio.Event()
+
+            async def process(update):
+                await release.wait()
+
+            dispatcher = ChatDispatcher(process, concurrency=4, max_pending=2)
+            dispatcher.submit(1, "first")
+            dispatcher.submit(2, "second")
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(dispatcher.wait_capacity(), 0.05)
+            release.set()
+            await asyncio.wait_for(dispatcher.wait_capacity(), 1)
+            await dispatcher.join()
+
+        asyncio.run(scenario())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBotRunner:
+    """ Тесты обработки обновлений асинхронным ботом """
+
+    def test_process_goals(self, user) -> None:
+        """ Тест, чтобы проверить, что обработчик выполняется в пуле потоков и ответ уходит в чат """
+        tg_user = TuserFactory(user=user, chat_id=100, user_ud=100)
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        GoalFactory(category=CategoryFactory(board=board), user=user, title="Пробежать марафон")
+        bot = FakeBot()
+        runner = BotRunner(bot, concurrency=2, db_threads=2)
+
+        async def scenario():
+            await runner.process(make_update(1, tg_user.chat_id, "/goals"))
+
+        asyncio.run(scenario())
+        runner.executor.shutdown()
+
+        assert len(bot.sent) == 1, "Ответ не отправлен"
+        assert bot.sent[0][0] == tg_user.chat_id
+        assert "Пробежать марафон" in bot.sent[0][1]
+
+    def test_process_next_page(self, user, settings) -> None:
+        """ Тест, чтобы проверить, что нажатие «Вперед» заменяет текст того же сообщения следующей страницей """
+        settings.BOT_PAGE_SIZE = 2
+        tg_user = TuserFactory(user=user, chat_id=100, user_ud=100)
+        for number in range(3):
+            GoalFactory(user=user, title=f"Цель {number}")
+        bot = FakeBot()
+        runner = BotRunner(bot, concurrency=2, db_threads=2)
+
+        async def scenario():
+            await runner.process(make_callback(1, tg_user.chat_id, "goals:2"))
+
+        asyncio.run(scenario())
+        runner.executor.shutdown()
+
+        assert bot.answered == ["1"], "Нажатие кнопки не подтверждено"
+        assert not bot.sent, "Вместо замены отправлено новое сообщение"
+        chat_id, message_id, text, markup = bot.edited[0]
+        assert (chat_id, message_id) == (tg_user.chat_id, 7)
+        assert "Цель 2" in text and "Цель 1" not in text, "Показана не та страница"
+        assert [button.callback_data for button in markup.inline_keyboard[0]] == ["goals:0"]
@@ -0,0 +1,142 @@
+import datetime
+
+import pytest
+
+from bot import handlers, state
+from bot.models import ChatState
+from bot.state import DatabaseStateStore, MemoryStateStore, State
+from goals.models import Goal
+from tests.factories import CategoryFactory, TuserFactory
+
+
+class Clock:
+    """ Управляемые часы для проверки срока жизни состояний """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestMemoryStateStore:
+    """ Тесты хранения состояний диалогов в памяти """
+
+    def test_ttl(self) -> None:
+        """ Тест, чтобы проверить, что состояние живет `ttl` секунд, а брошенные диалоги вычищаются при записи """
+        clock = Clock()
+        store = MemoryStateStore(ttl=10, clock=clock)
+        store.set(1, State(handlers.CREATE_TITLE, {"category": 5}))
+        store.set(2, State(handlers.CREATE_TITLE))
+
+        clock.now = 9
+        assert store.get(1) == State(handlers.CREATE_TITLE, {"category": 5}), "Состояние потеряно до срока"
+        clock.now = 11
+        assert store.get(1) is None, "Истекшее состояние не удалено"
+        store.set(3, State(handlers.CREATE_TITLE))
+        assert set(store.states) == {3}, "Брошенный диалог остался в памяти"
+
+    def test_copy(self) -> None:
+        """ Тест, чтобы проверить, что изменение полученных данных не меняет сохраненное состояние """
+        store = MemoryStateStore(ttl=10)
+        store.set(1, State(handlers.CREATE_TITLE, {"category": 5}))
+        store.get(1).data["category"] = 6
+
+        assert store.get(1).data == {"category": 5}
+
+
+@pytest.mark.django_db
+class TestDatabaseStateStore:
+    """ Тесты хранения состояний диалогов в БД """
+
+    def test_get_set_clear(self) -> None:
+        """ Тест, чтобы проверить запись, перезапись и удаление состояния чата """
+        store = DatabaseStateStore(ttl=60)
+        store.set(1, State(handlers.CREATE_TITLE, {"category": 5}))
+        store.set(1, State(handlers.CREATE_DESCRIPTION, {"category": 5, "title": "Цель"}))
+
+        assert store.get(1) == State(handlers.CREATE_DESCRIPTION, {"category": 5, "title": "Цель"})
+        assert ChatState.objects.count() == 1, "Состояние чата записано дважды"
+        store.clear(1)
+        assert store.get(1) is None, "Состояние не удалено"
+
+    def test_expired(self) -> None:
+        """ Тест, чтобы проверить, что истекшее состояние не возвращается и удаляется """
+        store = DatabaseStateStore(ttl=60)
+        store.set(1, State(handlers.CREATE_TITLE))
+        store.set(2, State(handlers.CREATE_TITLE))
+        ChatState.objects.update(expires=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+
+        assert store.get(1) is None, "Возвращено истекшее состояние"
+        assert DatabaseStateStore.purge() == 1
+        assert not ChatState.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCreateGoalDialog:
+    """ Тесты диалога создания цели с состоянием по чатам """
+
+    @pytest.fixture(autouse=True)
+    def store(self, monkeypatch):
+        store = MemoryStateStore(ttl=60)
+        monkeypatch.setattr(state, "_store", store)
+        return store
+
+    @staticmethod
+    def send(chat_id: int, text: str) -> list[str]:
+        msg = handlers.IncomingMessage(chat_id=chat_id, chat_type="private", user_id=chat_id,
+                                       username="ivan", first_name="Иван", text=text)
+        return [reply.text for reply in handlers.handle(msg)]
+
+    def test_interleaved_chats(self, user_factory) -> None:
+        """ Тест, чтобы проверить, что одновременные диалоги в двух чатах не мешают друг другу """
+        users = {chat_id: user_factory() for chat_id in (1, 2)}
+        categories = {}
+        for chat_id, user in users.items():
+            TuserFactory(user=user, chat_id=chat_id, user_ud=chat_id)
+            categories[chat_id] = CategoryFactory(user=user)
+
+        for chat_id in (1, 2):
+            self.send(chat_id, "/create")
+        for chat_id in (1, 2):
+            self.send(chat_id, str(categories[chat_id].id))
+        for chat_id in (1, 2):
+            self.send(chat_id, f"Цель {chat_id}")
+        for chat_id in (1, 2):
+            self.send(chat_id, f"Описание {chat_id}")
+        for chat_id in (1, 2):
+            assert self.send(chat_id, "2030-01-01") == [f"Цель: Цель {chat_id} создана в БД"]
+
+        for chat_id, user in users.items():
+            goal = Goal.objects.get(user=user)
+            assert goal.title == f"Цель {chat_id}", "Данные диалогов перепутаны"
+            assert goal.category == categories[chat_id]
+            assert goal.due_date == datetime.date(2030, 1, 1)
+
+    def test_invalid_input(self, user, store) -> None:
+        """ Тест, чтобы проверить, что чужая категория и неверная дата запрашиваются повторно """
+        TuserFactory(user=user, chat_id=1, user_ud=1)
+        category = CategoryFactory(user=user)
+        foreign = CategoryFactory()
+
+        self.send(1, "/create")
+        assert "Выберите номер категории" in self.send(1, str(foreign.id))[0]
+        assert store.get(1).name == handlers.CREATE_CATEGORY, "Принята чужая категория"
+        self.send(1, str(category.id))
+        self.send(1, "Цель")
+        self.send(1, "Описание")
+        self.send(1, "завтра")
+
+        assert store.get(1).name == handlers.CREATE_DUE_DATE, "Принята неверная дата"
+        assert not Goal.objects.exists()
+
+    def test_cancel(self, user, store) -> None:
+        """ Тест, чтобы проверить, что /cancel завершает диалог """
+        TuserFactory(user=user, chat_id=1, user_ud=1)
+        CategoryFactory(user=user)
+
+        self.send(1, "/create")
+
+        assert self.send(1, "/cancel") == ["Операция отменена"]
+        assert store.get(1) is None, "Состояние не удалено"
+        assert self.send(1, "Текст") == ["Неизвестная команда"]
@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from bot import handlers, webhook
+from bot.tg.client import TgClient
+from bot.webhook import WebhookQueue
+from tests.bot_test.fake_telegram import FakeTelegram
+from tests.factories import GoalFactory, TuserFactory
+
+
+def message_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "text": text,
+        "chat": {"id": chat_id, "type": "private", "first_name": "Иван"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+    }}
+
+
+def callback_update(update_id: int, chat_id: int, data: str) -> dict:
+    return {"update_id": update_id, "callback_query": {
+        "id": "cb1", "chat_instance": "1", "data": data,
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+        "message": {"message_id": 7, "date": 0, "text": "Цели",
+                    "chat": {"id": chat_id, "type": "private", "first_name": "Иван"}},
+    }}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWebhook:
+    """ Тесты приема обновлений через webhook с локальным сервером вместо Telegram """
+
+    @pytest.fixture()
+    def telegram(self, settings):
+        settings.BOT_WEBHOOK_SECRET = "secret"
+        settings.BOT_CHAT_RATE_LIMIT = 100
+        with FakeTelegram() as telegram:
+            yield telegram
+
+    @pytest.fixture()
+    def updates(self, telegram, monkeypatch):
+        updates = WebhookQueue(workers=2, max_pending=10, client=TgClient("token", api_url=telegram.url))
+        monkeypatch.setattr(webhook, "_queue", updates)
+        return updates
+
+    @staticmethod
+    def post(client, data: dict, secret: str = "secret"):
+        return client.post(reverse("bot:webhook"), data=data, format="json",
+                           HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_secret(self, client, telegram, updates) -> None:
+        """ Тест, чтобы проверить, что обновление без верного секрета отклоняется и не обрабатывается """
+        response = self.post(client, message_update(1, 100, "/start"), secret="wrong")
+        updates.join()
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Принято обновление без секрета"
+        assert not telegram.calls
+
+    def test_secret_not_ascii(self, client, telegram, updates) -> None:
+        """ Тест, чтобы проверить, что секрет с не-ASCII символами отклоняется, а не роняет запрос """
+        response = self.post(client, message_update(1, 100, "/start"), secret="секрет")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Принято обновление без секрета"
+
+    @pytest.mark.parametrize("data", [
+        {"update_id": 1, "message": {"message_id": 1, "text": "/goals"}},
+        {"update_id": 1, "message": "/goals"},
+        {"update_id": 1, "callback_query": {"id": "cb1"}},
+        [],
+    ])
+    def test_malformed(self, client, telegram, updates, data) -> None:
+        """ Тест, чтобы проверить, что на неразбираемое обновление Telegram получает 400, а не 500 """
+        response = self.post(client, data)
+        updates.join()
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "Неразбираемое обновление не отклонено"
+        assert not telegram.calls
+
+    def test_goals(self, client, user, telegram, updates) -> None:
+        """ Тест, чтобы проверить, что обновление обрабатывается теми же обработчиками и ответ уходит в Telegram """
+        tg_user = TuserFactory(user=user, chat_id=100, user_ud=100)
+        GoalFactory(user=user, title="Пробежать марафон")
+
+        response = self.post(client, message_update(1, tg_user.chat_id, "/goals"))
+        updates.join()
+
+        assert response.status_code == status.HTTP_200_OK
+        sent = telegram.methods("sendMessage")
+        assert len(sent) == 1 and "Пробежать марафон" in sent[0]["text"], "Ответ не отправлен"
+
+    def test_callback(self, client, user, telegram, updates, settings) -> None:
+        """ Тест, чтобы проверить, что нажатие кнопки подтверждается и страница заменяет текст сообщения """
+        settings.BOT_PAGE_SIZE = 1
+        tg_user = TuserFactory(user=user, chat_id=100, user_ud=100)
+        GoalFactory(user=user, title="Первая")
+        GoalFactory(user=user, title="Вторая")
+
+        self.post(client, callback_update(2, tg_user.chat_id, "goals:1"))
+        updates.join()
+
+        assert telegram.methods("answerCallbackQuery")[0]["callback_query_id"] == "cb1"
+        edited = telegram.methods("editMessageText")[0]
+        assert edited["message_id"] == "7" and "Вторая" in edited["text"]
+        assert "goals:0" in edited["reply_markup"], "Нет кнопки «Назад»"
+
+    def test_queue_full(self, client, telegram, monkeypatch) -> None:
+        """ Тест, чтобы проверить, что при переполненной очереди Telegram получает 503, а не ждет обработки """
+        started, release = threading.Event(), threading.Event()
+
+        def handle(message):
+            started.set()
+            release.wait(5)
+            return []
+
+        monkeypatch.setattr(handlers, "handle", handle)
+        updates = WebhookQueue(workers=1, max_pending=1, client=TgClient("token", api_url=telegram.url))
+        monkeypatch.setattr(webhook, "_queue", updates)
+
+        first = self.post(client, message_update(1, 100, "/goals"))
+        started.wait(5)
+        second = self.post(client, message_update(2, 100, "/goals"))
+        third = self.post(client, message_update(3, 100, "/goals"))
+        release.set()
+        updates.join()
+
+        assert [first.status_code, second.status_code] == [status.HTTP_200_OK, status.HTTP_200_OK]
+        assert third.status_code == status.HTTP_503_SERVICE_UNAVAILABLE, "Переполнение очереди не отклонено"
+
+    def test_command(self, telegram, settings) -> None:
+        """ Тест, чтобы проверить регистрацию webhook с секретом и его снятие командой `setwebhook` """
+        settings.BOT_API_URL = telegram.url
+        settings.BOT_TOKEN = "token"
+
+        call_command("setwebhook", "https://example.com/bot/webhook")
+        call_command("setwebhook", delete=True)
+
+        registered = telegram.methods("setWebhook")[0]
+        assert registered["url"] == "https://example.com/bot/webhook"
+        assert registered["secret_token"] == "secret", "Секрет не передан Telegram"
+        assert len(telegram.methods("deleteWebhook")) == 1, "Webhook не снят"
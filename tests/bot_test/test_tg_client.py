@@ -0,0 +1,75 @@
+import time
+
+import pytest
+import requests
+
+from bot.tg import client as tg_client
+from bot.tg.client import TgClient, TgError, get_session
+from tests.bot_test.fake_telegram import FakeTelegram
+
+UPDATE = {"update_id": 1, "message": {
+    "message_id": 1, "date": 0, "text": "/goals",
+    "chat": {"id": 100, "type": "private"},
+    "from": {"id": 100, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+}}
+
+
+class TestTgClient:
+    """ Тесты HTTP-клиента Telegram на локальном сервере вместо api.telegram.org """
+
+    @pytest.fixture()
+    def telegram(self):
+        with FakeTelegram() as telegram:
+            yield telegram
+
+    @pytest.fixture(autouse=True)
+    def session(self, monkeypatch, settings):
+        """ Сессия создается заново с настройками теста """
+        settings.BOT_CHAT_RATE_LIMIT = 100
+        monkeypatch.setattr(tg_client, "_session", None)
+        yield
+        get_session().close()
+
+    def test_keep_alive(self, telegram) -> None:
+        """ Тест, чтобы проверить, что запросы идут по одному соединению, а клиенты делят сессию """
+        first, second = TgClient("token", api_url=telegram.url), TgClient("token", api_url=telegram.url)
+
+        first.get_updates(timeout=0)
+        second.get_updates(timeout=0)
+
+        assert first.session is second.session, "У каждого клиента своя сессия"
+        assert len(set(telegram.ports)) == 1, "Соединение не переиспользуется"
+
+    def test_get_updates_retry(self, telegram) -> None:
+        """ Тест, чтобы проверить, что getUpdates повторяется после ошибки сервера и разбирается схемой """
+        telegram.errors["getUpdates"] = [{"error_code": 502, "description": "Bad Gateway"}]
+        telegram.updates = [UPDATE]
+
+        response = TgClient("token", api_url=telegram.url).get_updates(timeout=0)
+
+        assert len(telegram.methods("getUpdates")) == 2, "Запрос не повторен"
+        assert response.result[0].message.text == "/goals"
+
+    def test_read_timeout(self, telegram, settings) -> None:
+        """ Тест, чтобы проверить, что зависший ответ обрывается по таймауту чтения, а не ждет бесконечно """
+        settings.BOT_READ_TIMEOUT = 0.2
+        settings.BOT_HTTP_RETRIES = 0
+        telegram.delay = 1
+        start = time.monotonic()
+
+        # После исчерпания повторов requests оборачивает таймаут в ConnectionError
+        with pytest.raises(requests.RequestException, match="Read timed out"):
+            TgClient("token", api_url=telegram.url).get_updates(timeout=0)
+        assert time.monotonic() - start < 1, "Ответ ждали дольше таймаута"
+
+    def test_send_many(self, telegram) -> None:
+        """ Тест, чтобы проверить рассылку: ответы по порядку, отказ Telegram — ошибкой на своем месте """
+        telegram.errors["sendMessage"] = [{"error_code": 400, "description": "Bad Request: chat not found"}]
+        client = TgClient("token-many", api_url=telegram.url)
+
+        results = client.send_many([(1, "первому"), (2, "второму"), (3, "третьему")])
+
+        assert sum(isinstance(result, TgError) for result in results) == 1, "Отказ не передан"
+        assert len(telegram.methods("sendMessage")) == 3, "Отказ повторен"
+        assert all(result.result.chat.id == chat_id for chat_id, result in enumerate(results, 1)
+                   if not isinstance(result, TgError))
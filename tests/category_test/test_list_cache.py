@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.cache_backends import SizeBoundedLocMemCache
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory
+
+
+def goals_queries(context: CaptureQueriesContext) -> list:
+    return [query["sql"] for query in context.captured_queries if "goals_" in query["sql"]]
+
+
+@pytest.mark.django_db
+class TestListCache:
+    """ Тесты кеша списков досок и категорий """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        CategoryFactory.create_batch(size=3, board=board)
+        return board
+
+    def test_cache_hit_without_queries(self, auth_client, board) -> None:
+        """ Тест, чтобы проверить, что повторный запрос списка отдается из кеша без запросов к таблицам целей """
+        for url in (reverse("goals:category_list"), reverse("goals:board_list")):
+            first = auth_client.get(url)
+            with CaptureQueriesContext(connection) as context:
+                second = auth_client.get(url)
+
+            assert second.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            assert second.json() == first.json(), "Ответ из кеша отличается от исходного"
+            assert second["ETag"] == first["ETag"], "Ответ из кеша с другим ETag"
+            assert not goals_queries(context), "Ответ не взят из кеша"
+
+    def test_invalidation(self, auth_client, user, board) -> None:
+        """
+        Тест, чтобы проверить, что новая категория, переименование доски
+        и приглашение на доску сбрасывают кеш списков.
+        """
+        category_url = reverse("goals:category_list")
+        board_url = reverse("goals:board_list")
+        auth_client.get(category_url)
+        auth_client.get(board_url)
+
+        CategoryFactory(board=board)
+        assert len(auth_client.get(category_url).json()) == 4, "Новая категория не попала в список"
+
+        board.title = "Новое название"
+        board.save()
+        assert auth_client.get(board_url).json()[0]["title"] == "Новое название", "Доска не переименована"
+
+        BoardParticipantFactory(board=BoardFactory(), user=user)
+        assert len(auth_client.get(board_url).json()) == 2, "Новая доска не попала в список"
+
+    def test_stats(self, client, auth_client, board, user_factory) -> None:
+        """ Тест, чтобы проверить счетчики попаданий и промахов и доступ к ним только для персонала """
+        url = reverse("goals:category_list")
+        auth_client.get(url)
+        auth_client.get(url)
+
+        response = auth_client.get(reverse("goals:cache_stats"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Счетчики доступны не персоналу"
+
+        client.force_login(user_factory(is_staff=True))
+        stats = client.get(reverse("goals:cache_stats")).json()
+        assert stats["hits"] == 1 and stats["misses"] == 1, "Неверные счетчики кеша"
+        assert 0 < stats["size"] <= stats["max_size"], "Неверный объем кеша"
+
+
+class TestSizeBoundedCache:
+    """ Тесты вытеснения по объему в SizeBoundedLocMemCache """
+
+    def test_eviction(self) -> None:
+        """ Тест, чтобы проверить, что при превышении объема вытесняются давно не читанные записи """
+        cache = SizeBoundedLocMemCache("eviction-test", {"OPTIONS": {"MAX_SIZE": 3000}})
+        cache.clear()
+        value = "x" * 900
+
+        cache.set("a", value)
+        cache.set("b", value)
+        cache.set("c", value)
+        cache.get("a")
+        cache.set("d", value)
+
+        assert cache.get("b") is None, "Давно не читанная запись не вытеснена"
+        assert all(cache.get(key) for key in ("a", "c", "d")), "Вытеснены свежие записи"
+        assert cache.size <= 3000, "Превышен объем кеша"
+
+        cache.set("big", "x" * 5000)
+        assert cache.get("big") is None, "Запись больше предела попала в кеш"
@@ -1,10 +1,19 @@
 import datetime
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 
 pytest_plugins = 'tests.factories'
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """ Кеш живет в памяти процесса — очищаем его, чтобы тесты не зависели друг от друга """
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 @pytest.fixture()
 def client() -> APIClient:
     """ Rest Framework test client instance. """
@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.archive import archive_goals
+from goals.models import ArchivedComment, ArchivedGoal, BoardParticipant, BoardSummary, Goal, GoalComment, SyncTombstone
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalArchive:
+    """ Тесты переноса давно архивных целей в таблицы архива, просмотра и восстановления """
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    @staticmethod
+    def archived_goal(category, days: int = 40) -> Goal:
+        goal = GoalFactory(category=category, status=Goal.Status.archived)
+        Goal.objects.filter(id=goal.id).update(updated=timezone.now() - datetime.timedelta(days=days))
+        return goal
+
+    def test_archive_old_goals(self, category) -> None:
+        """
+        Тест, чтобы проверить, что переносятся только цели в архиве старше срока, вместе с комментариями,
+        порциями, а сводка доски и записи синхронизации обновляются триггерами.
+        """
+        old = [self.archived_goal(category) for _ in range(3)]
+        comment = GoalCommentFactory(goal=old[0])
+        recent = self.archived_goal(category, days=1)
+        active = GoalFactory(category=category)
+
+        report = archive_goals(datetime.timedelta(days=30), batch_size=2)
+
+        assert report == {"goals": 3, "comments": 1, "batches": 2}
+        assert set(Goal.objects.values_list("id", flat=True)) == {recent.id, active.id}, "Перенесены не те цели"
+        assert set(ArchivedGoal.objects.values_list("id", flat=True)) == {goal.id for goal in old}
+        assert ArchivedComment.objects.get(id=comment.id).goal_id == old[0].id, "Комментарий не перенесен"
+        assert not GoalComment.objects.filter(id=comment.id).exists()
+        assert BoardSummary.objects.get(category=category, status=Goal.Status.archived).count == 1, \
+            "Сводка не обновлена"
+        assert SyncTombstone.objects.filter(kind="goal", object_id=old[0].id).exists(), "Нет записи для синхронизации"
+
+    def test_archive_command(self, category) -> None:
+        """ Тест, чтобы проверить команду `archivegoals` со сроком из параметра """
+        goal = self.archived_goal(category, days=5)
+
+        call_command("archivegoals", days=3)
+
+        assert ArchivedGoal.objects.filter(id=goal.id).exists(), "Цель не перенесена"
+
+    def test_archive_list_and_detail(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что участник видит цели из архива своих досок и их комментарии """
+        goal = self.archived_goal(category)
+        GoalCommentFactory(goal=goal, text="Старый комментарий")
+        self.archived_goal(CategoryFactory())
+        archive_goals()
+
+        response = auth_client.get(reverse("goals:archive_list"))
+        detail = auth_client.get(reverse("goals:archive_pk", kwargs={"pk": goal.id}))
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert [item["id"] for item in response.json()] == [goal.id], "Видны цели чужих досок"
+        assert [item["text"] for item in detail.json()["comments"]] == ["Старый комментарий"]
+
+    def test_archive_list_pages(self, auth_client, category) -> None:
+        """
+        Тест, чтобы проверить, что цели одного переноса (с одинаковым `archived`)
+        листаются по курсору без пропусков и повторов
+        """
+        goals = [self.archived_goal(category) for _ in range(5)]
+        archive_goals()
+        assert ArchivedGoal.objects.values("archived").distinct().count() == 1
+
+        ids, response = [], auth_client.get(reverse("goals:archive_list"), {"page_size": 2})
+        while True:
+            assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            ids += [item["id"] for item in response.json()["results"]]
+            if not response.json()["next"]:
+                break
+            response = auth_client.get(response.json()["next"])
+
+        assert ids == sorted((goal.id for goal in goals), reverse=True), "Цели пропущены или повторены"
+
+    def test_restore(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что цель возвращается с прежним id, комментариями и статусом «К выполнению» """
+        goal = self.archived_goal(category)
+        comment = GoalCommentFactory(goal=goal)
+        archive_goals()
+
+        response = auth_client.post(reverse("goals:archive_restore", kwargs={"pk": goal.id}))
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.json()["status"] == Goal.Status.to_do
+        assert response.json()["comments_count"] == 1, "Комментарии не восстановлены"
+        assert Goal.objects.get(id=goal.id).search_vector is not None, "Поисковый вектор не заполнен"
+        assert GoalComment.objects.filter(id=comment.id).exists()
+        assert not ArchivedGoal.objects.filter(id=goal.id).exists()
+
+    def test_restore_reader(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что читатель доски не может восстановить цель """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        goal = self.archived_goal(CategoryFactory(board=board))
+        archive_goals()
+
+        response = auth_client.post(reverse("goals:archive_restore", kwargs={"pk": goal.id}))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Читатель восстановил цель"
+        assert ArchivedGoal.objects.filter(id=goal.id).exists()
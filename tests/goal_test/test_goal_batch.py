@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalBatchView:
+    """ Тесты пакетной работы с Goal """
+    url: str = reverse("goals:goal_batch")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+        return CategoryFactory(board=board)
+
+    def test_batch_mixed_operations(self, auth_client, user, category) -> None:
+        """
+        Тест, чтобы проверить, что создание, изменение и архивация выполняются одним запросом,
+        а ошибочная операция не мешает остальным.
+        """
+        goal, archived = GoalFactory.create_batch(size=2, category=category)
+        foreign_goal = GoalFactory()
+        operations = [
+            {"action": "create", "data": {"category": category.id, "title": "Первая"}},
+            {"action": "create", "data": {"category": category.id}},
+            {"action": "update", "id": goal.id, "data": {"title": "Новое название", "priority": 4}},
+            {"action": "status", "id": archived.id, "status": Goal.Status.archived},
+            {"action": "status", "id": foreign_goal.id, "status": Goal.Status.archived},
+        ]
+
+        response = auth_client.post(self.url, data=operations, format="json")
+
+        results = response.json()["results"]
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert [result["status"] for result in results] == ["created", "error", "updated", "updated", "error"]
+        assert "title" in results[1]["errors"]
+
+        created = Goal.objects.get(id=results[0]["id"])
+        assert (created.user, created.board_id, created.title) == (user, category.board_id, "Первая")
+        assert created.created and created.updated
+        goal.refresh_from_db()
+        assert (goal.title, goal.priority) == ("Новое название", Goal.Priority.critical)
+        assert goal.updated > goal.created
+        assert Goal.objects.get(id=archived.id).status == Goal.Status.archived
+        assert Goal.objects.get(id=foreign_goal.id).status != Goal.Status.archived, "Изменена чужая цель"
+
+    def test_batch_reader_and_deleted_category(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что читатель и удаленная категория отклоняются построчно """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        category = CategoryFactory(board=board)
+        deleted = CategoryFactory(board=board, is_deleted=True)
+        operations = [
+            {"action": "create", "data": {"category": category.id, "title": "Цель"}},
+            {"action": "create", "data": {"category": deleted.id, "title": "Цель"}},
+        ]
+
+        response = auth_client.post(self.url, data=operations, format="json")
+
+        assert [result["errors"] for result in response.json()["results"]] == [
+            {"category": ["Вы не создавали эту категорию"]},
+            {"category": ["Не разрешено в удаленной категории"]},
+        ]
+        assert not Goal.objects.exists()
+
+    def test_batch_constant_queries(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что число запросов не зависит от размера пакета """
+        def post(size: int) -> int:
+            operations = [{"action": "create", "data": {"category": category.id, "title": f"Цель {i}"}}
+                          for i in range(size)]
+            with CaptureQueriesContext(connection) as context:
+                auth_client.post(self.url, data=operations, format="json")
+            return len(context)
+
+        assert post(2) == post(50)
+        assert Goal.objects.count() == 52
+
+    def test_batch_deny(self, client) -> None:
+        """ Проверка того, что неаутентифицированные пользователи не имеют доступа """
+        response = client.post(self.url, data=[], format="json")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Отказ в доступе не предоставлен"
@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ Тесты условных запросов (ETag / Last-Modified) """
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_goal_list_not_modified(self, auth_client, category) -> None:
+        """
+        Тест, чтобы проверить, что повторный запрос с тем же ETag получает 304,
+        а новый комментарий или архивация категории меняют ETag.
+        """
+        goal = GoalFactory(category=category)
+        url = reverse("goals:goal_list")
+
+        response = auth_client.get(url)
+        etag = response["ETag"]
+        assert response.status_code == status.HTTP_200_OK
+        assert response.has_header("Last-Modified")
+
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+        GoalCommentFactory(goal=goal)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK, "Новый комментарий не изменил ETag"
+        etag = response["ETag"]
+
+        auth_client.delete(reverse("goals:category_pk", kwargs={"pk": category.id}))
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK, "Архивация целей не изменила ETag"
+
+    def test_etag_depends_on_query(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что ETag различается для разных фильтров """
+        GoalFactory(category=category)
+        url = reverse("goals:goal_list")
+
+        etag = auth_client.get(url)["ETag"]
+        response = auth_client.get(url, {"priority": 4}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_etag_depends_on_membership(self, auth_client, user, category) -> None:
+        """
+        Тест, чтобы проверить, что смена досок пользователя меняет ETag списка,
+        даже если число видимых целей и самая поздняя из них остались прежними.
+        """
+        GoalFactory(category=category)
+        old_board, new_board = BoardFactory(), BoardFactory()
+        BoardParticipantFactory(board=old_board, user=user)
+        old_goal = GoalFactory(category=CategoryFactory(board=old_board))
+        new_goal = GoalFactory(category=CategoryFactory(board=new_board))
+        long_ago = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        Goal.objects.filter(id__in=[old_goal.id, new_goal.id]).update(updated=long_ago)
+        url = reverse("goals:goal_list")
+        etag = auth_client.get(url)["ETag"]
+
+        BoardParticipant.objects.filter(board=old_board, user=user).delete()
+        BoardParticipantFactory(board=new_board, user=user)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK, "Смена досок не изменила ETag"
+        assert response["ETag"] != etag
+
+    def test_goal_detail_not_modified(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить условный GET для одной цели и его сброс после изменения """
+        goal = GoalFactory(category=category)
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        etag = auth_client.get(url)["ETag"]
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        auth_client.patch(url, data={"title": "Updated"})
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import User
+from goals.models import Goal, GoalComment
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+def list_query(context: CaptureQueriesContext) -> str:
+    """ Запрос выборки строк списка целей (остальные — валидаторы ETag и роли) """
+    queries = [query["sql"] for query in context.captured_queries if 'FROM "goals_goal"' in query["sql"]]
+    return queries[-1]
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """ Тесты выборочных полей `?fields=` / `?omit=` """
+
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_goal_list_fields(self, auth_client, category) -> None:
+        """
+        Тест, чтобы проверить, что `?fields=` оставляет только перечисленные поля,
+        а из БД не читаются автор и число комментариев.
+        """
+        goal = GoalFactory(category=category)
+        GoalCommentFactory(goal=goal)
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(self.url, {"fields": "id,title,status,priority,due_date"})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert list(response.json()[0]) == ["id", "status", "priority", "title", "due_date"], \
+            "Лишние поля в ответе"
+        sql = list_query(context)
+        assert User._meta.db_table not in sql, "Лишний join с пользователями"
+        assert GoalComment._meta.db_table not in sql, "Лишний подзапрос числа комментариев"
+        assert '"description"' not in sql, "Лишняя колонка описания"
+
+    def test_goal_list_omit(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что `?omit=` убирает перечисленные поля """
+        GoalFactory(category=category)
+
+        response = auth_client.get(self.url, {"omit": "description,user"})
+
+        assert "description" not in response.json()[0], "Описание не убрано"
+        assert "user" not in response.json()[0], "Автор не убран"
+        assert "comments_count" in response.json()[0], "Убрано лишнее поле"
+
+    def test_goal_list_fields_keyset(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что курсор строится и без полей сортировки в ответе """
+        goals = GoalFactory.create_batch(size=3, category=category, priority=Goal.Priority.medium)
+
+        first = auth_client.get(self.url, {"fields": "id", "page_size": 2}).json()
+        second = auth_client.get(first["next"]).json()
+
+        assert first["results"] + second["results"] == [{"id": goal.id} for goal in goals]
+
+    def test_goal_update_full_response(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что ответ на изменение цели не урезается """
+        goal = GoalFactory(category=category)
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id}) + "?fields=id"
+
+        response = auth_client.patch(url, data={"title": "Новое название"})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.json()["title"] == "Новое название", "Ответ урезан"
+
+    def test_board_retrieve_fields(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что выборочные поля работают и для отдельного объекта """
+        url = reverse("goals:board_pk", kwargs={"pk": category.board_id})
+
+        response = auth_client.get(url, {"fields": "id,title"})
+
+        assert response.json() == {"id": category.board_id, "title": category.board.title}
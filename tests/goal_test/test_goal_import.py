@@ -0,0 +1,63 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory
+
+
+@pytest.mark.django_db
+class TestGoalImport:
+    """ Тесты массового импорта целей """
+    url: str = reverse("goals:goal_import")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+        return CategoryFactory(board=board)
+
+    def test_import_csv(self, auth_client, user, category) -> None:
+        """
+        Тест, чтобы проверить, что корректные строки загружаются, а ошибки
+        (чужая, удаленная и несуществующая категории, пустой заголовок) возвращаются по номерам строк.
+        """
+        foreign = CategoryFactory()
+        deleted = CategoryFactory(board=category.board, is_deleted=True)
+        lines = ["category,title,priority,due_date"]
+        lines += [f"{category.id},Цель {i},3,2030-01-0{i % 9 + 1}" for i in range(20)]
+        lines += [f"{foreign.id},Чужая,1,", f"{deleted.id},Удаленная,1,", "999999,Нет категории,1,", f"{category.id},,1,"]
+        upload = SimpleUploadedFile("goals.csv", "\n".join(lines).encode())
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.post(self.url, {"file": upload}, format="multipart")
+
+        report = response.json()
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert report["created"] == 20 and report["error_count"] == 4, "Неверный итог импорта"
+        assert [error["line"] for error in report["errors"]] == [22, 23, 24, 25], "Неверные номера строк"
+        assert Goal.objects.filter(category=category, user=user, priority=3).count() == 20, "Цели не созданы"
+        category_queries = [q for q in context.captured_queries if 'FROM "goals_goalcategory"' in q["sql"]]
+        assert len(category_queries) == 4, "Категории загружаются не по одному разу"
+
+    def test_import_command_ndjson(self, user, category, tmp_path) -> None:
+        """ Тест, чтобы проверить импорт NDJSON командой порциями, в том числе из выгрузки доски """
+        path = tmp_path / "goals.ndjson"
+        path.write_text(
+            '{"record": "export", "board": 1}\n'
+            + "".join(f'{{"record": "goal", "category": {category.id}, "title": "Цель {i}"}}\n' for i in range(5))
+            + '{"record": "comment", "id": 1, "text": "Комментарий"}\n'
+            + "не json\n"
+        )
+        out = io.StringIO()
+
+        call_command("importgoals", str(path), user=user.username, batch_size=2, stdout=out, stderr=io.StringIO())
+
+        assert Goal.objects.filter(category=category).count() == 5, "Цели не созданы"
+        assert "создано: 5, ошибок: 1" in out.getvalue(), "Неверный отчет команды"
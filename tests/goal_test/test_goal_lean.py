@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from goals.lean import LeanSerializer
+from goals.models import Goal, GoalCategory, GoalComment
+from goals.renderers import FastJSONRenderer
+from goals.serializers import CommentSerializer, GoalCategorySerializer, GoalSerializer
+from goals.views import goal_queryset
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestLeanSerializer:
+    """ Тесты быстрого пути чтения списков: ответ должен совпадать с ModelSerializer побайтно """
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, title="Спорт")
+
+    @staticmethod
+    def render(data) -> bytes:
+        return JSONRenderer().render(data)
+
+    def test_goal_list_bytes(self, auth_client, category) -> None:
+        """
+        Тест, чтобы проверить, что список целей совпадает с выводом GoalSerializer побайтно:
+        вложенный автор, число комментариев, даты, пустой срок, не-ASCII и U+2028 в тексте.
+        """
+        with_comments = GoalFactory(category=category, title="Марафон", description="Строка\u2028вторая",
+                                    due_date=datetime.date(2030, 1, 2), priority=Goal.Priority.high)
+        GoalFactory(category=category, title="Книга", description=None, due_date=None)
+        GoalCommentFactory.create_batch(size=2, goal=with_comments)
+
+        expected = self.render(GoalSerializer(
+            goal_queryset().filter(category=category).order_by("priority", "due_date", "id"), many=True,
+        ).data)
+        response = auth_client.get(reverse("goals:goal_list"))
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.content == expected, "Ответ отличается от ModelSerializer"
+        assert b"\\u2028" in response.content, "U+2028 не экранирован"
+
+    def test_goal_search_bytes(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что поля поиска (`search_rank`, `search_headline`) выводятся как прежде """
+        GoalFactory(category=category, title="Выучить английский", description="Каждый день")
+
+        response = auth_client.get(reverse("goals:goal_list"), {"search": "англ", "highlight": 1})
+        view_queryset = response.renderer_context["view"].filter_queryset(goal_queryset())
+
+        assert response.content == self.render(GoalSerializer(view_queryset, many=True).data), \
+            "Ответ поиска отличается от ModelSerializer"
+        assert "search_rank" in response.json()[0], "Нет ранга совпадения"
+
+    def test_comment_list_bytes(self, auth_client, category, user) -> None:
+        """ Тест, чтобы проверить, что список комментариев совпадает с выводом CommentSerializer """
+        goal = GoalFactory(category=category)
+        GoalCommentFactory.create_batch(size=3, goal=goal, user=user, text="Отлично 👍")
+
+        expected = self.render(CommentSerializer(
+            GoalComment.objects.filter(goal=goal).order_by("-id"), many=True,
+        ).data)
+        response = auth_client.get(reverse("goals:comment_list"), {"goal": goal.id})
+
+        assert response.content == expected, "Ответ отличается от CommentSerializer"
+
+    def test_category_keyset_page(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что страницы по курсору строятся и по строкам values_list """
+        CategoryFactory.create_batch(size=3, board=category.board)
+        categories = GoalCategory.objects.filter(board=category.board).order_by("title", "id")
+
+        first = auth_client.get(reverse("goals:category_list"), {"page_size": 2}).json()
+        second = auth_client.get(first["next"]).json()
+
+        expected = GoalCategorySerializer(categories, many=True).data
+        assert first["results"] + second["results"] == expected, "Страницы не совпадают со списком"
+        assert second["next"] is None, "Лишняя страница"
+
+    def test_fallback_without_annotation(self) -> None:
+        """ Тест, чтобы проверить, что без аннотации `comments_count` быстрый путь не используется """
+        assert LeanSerializer.compile(GoalSerializer(), Goal.objects.all()) is None
+        assert LeanSerializer.compile(GoalSerializer(), goal_queryset()) is not None
+
+    def test_fast_renderer_indent(self) -> None:
+        """ Тест, чтобы проверить, что с отступами и на обычных данных вывод FastJSONRenderer не меняется """
+        data = {"created": datetime.datetime(2023, 5, 1, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+                "title": "Цель", "rank": 0.5, "items": [1, None, True]}
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data, "application/json; indent=4") == \
+               JSONRenderer().render(data, "application/json; indent=4")
+
+    def test_fast_renderer_floats(self) -> None:
+        """ Тест, чтобы проверить, что малый ранг совпадения и большие числа записываются как у JSONRenderer """
+        data = [{"title": "Цель", "search_rank": rank} for rank in (1e-05, 6.0792715e-08, 0.0001, 0.0607927, 1e+16)]
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert b'"search_rank":1e-05' in FastJSONRenderer().render(data), "Ранг записан не как в json"
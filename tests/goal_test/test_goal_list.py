@@ -1,6 +1,8 @@
 from typing import Dict
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.response import Response
@@ -8,7 +10,7 @@ from rest_framework.response import Response
 from core.models import User
 from goals.models import Goal
 from goals.serializers import GoalSerializer
-from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
 
 
 @pytest.mark.django_db
@@ -70,6 +72,41 @@ class TestGoalListView:
         assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
         assert response.json() == unexpected_response, "Получены чужие цели"
 
+    def test_goal_list_constant_queries(self, auth_client, user) -> None:
+        """
+        Тест, чтобы проверить, что число запросов к БД не зависит от количества целей,
+        а число комментариев приходит вместе с целью.
+        """
+        board = BoardFactory()
+        category = CategoryFactory(board=board)
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=category)
+        GoalCommentFactory.create_batch(size=3, goal=goal)
+
+        with CaptureQueriesContext(connection) as single:
+            response = auth_client.get(self.url)
+        assert response.json()[0]["comments_count"] == 3, "Неверное число комментариев"
+
+        GoalFactory.create_batch(size=10, category=category)
+        with CaptureQueriesContext(connection) as many:
+            response = auth_client.get(self.url)
+
+        assert len(response.json()) == 11, "Получены не все цели"
+        assert len(many) == len(single), "Количество запросов растет вместе с числом целей"
+
+    def test_goal_list_board_filter(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить фильтр целей по доске `?board=` """
+        boards = BoardFactory.create_batch(size=2)
+        for board in boards:
+            BoardParticipantFactory(board=board, user=user)
+            GoalFactory.create_batch(size=2, category=CategoryFactory(board=board))
+
+        response = auth_client.get(self.url, {"board": boards[0].id})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert {item["board"] for item in response.json()} == {boards[0].id}
+        assert len(response.json()) == 2
+
     def test_goal_create_deny(self, client) -> None:
         """
         Проверка того, что не аутентифицированные пользователи
@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, GoalCategory
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
+
+
+def walk_pages(client, url: str, params: dict) -> list:
+    """ Проходит все страницы по ссылкам `next` и собирает id объектов """
+    ids, links = [], set()
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        ids += [item["id"] for item in response.json()["results"]]
+        if not response.json()["next"]:
+            return ids
+        assert response.json()["next"] not in links, "Курсор не продвигается"
+        links.add(response.json()["next"])
+        response = client.get(response.json()["next"])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """ Тесты постраничного вывода по ключу """
+
+    def test_goal_pages_match_full_list(self, auth_client, user) -> None:
+        """
+        Тест, чтобы проверить, что обход страниц по курсору дает тот же порядок,
+        что и полный список, в том числе для целей без дедлайна и при фильтрации.
+        """
+        board = BoardFactory()
+        category = CategoryFactory(board=board)
+        BoardParticipantFactory(board=board, user=user)
+        today = datetime.date.today()
+        for day in (3, None, 1, None, 2, 1):
+            due_date = today + datetime.timedelta(days=day) if day else None
+            GoalFactory(category=category, due_date=due_date, priority=Goal.Priority.high)
+            GoalFactory(category=category, due_date=due_date, priority=Goal.Priority.low)
+        url = reverse("goals:goal_list")
+
+        def expected(goals) -> list:
+            # (priority, due_date, id), цели без дедлайна — в конце, как в PostgreSQL
+            ordered = sorted(goals, key=lambda goal: (goal.priority, goal.due_date is None,
+                                                      goal.due_date or today, goal.id))
+            return [goal.id for goal in ordered]
+
+        pages = walk_pages(auth_client, url, {"page_size": 5})
+        assert pages == expected(Goal.objects.all()), "Порядок страниц не совпадает"
+
+        pages = walk_pages(auth_client, url, {"page_size": 2, "priority": Goal.Priority.low})
+        low = Goal.objects.filter(priority=Goal.Priority.low)
+        assert pages == expected(low), "Фильтр не сохраняется между страницами"
+
+    def test_comment_pages(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что комментарии листаются от новых к старым """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+        comments = GoalCommentFactory.create_batch(size=7, goal=goal)
+
+        pages = walk_pages(auth_client, reverse("goals:comment_list"), {"page_size": 3})
+
+        assert pages == sorted((comment.id for comment in comments), reverse=True)
+
+    def test_offset_pagination_opt_in(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что `limit`/`offset` по-прежнему работают для старых клиентов """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        GoalFactory.create_batch(size=4, category=CategoryFactory(board=board))
+
+        response = auth_client.get(reverse("goals:goal_list"), {"limit": 3, "offset": 2})
+
+        assert response.json()["count"] == 4
+        assert len(response.json()["results"]) == 2
+
+    def test_invalid_cursor(self, auth_client) -> None:
+        """ Тест, чтобы проверить, что испорченный курсор отклоняется """
+        response = auth_client.get(reverse("goals:goal_list"), {"cursor": "broken"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_microsecond_cursor(self, auth_client, user) -> None:
+        """
+        Тест, чтобы проверить, что курсор хранит время с микросекундами: строки, созданные
+        с разницей меньше миллисекунды (и одновременно), выводятся ровно по одному разу.
+        """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        created = datetime.datetime(2023, 3, 1, 12, 0, 32, 123000, tzinfo=datetime.timezone.utc)
+        categories = CategoryFactory.create_batch(size=7, board=board)
+        for number, category in enumerate(categories):
+            GoalCategory.objects.filter(id=category.id).update(
+                created=created + datetime.timedelta(microseconds=100 * (number // 2)))
+        url = reverse("goals:category_list")
+        expected = [category.id for category in categories]
+
+        assert walk_pages(auth_client, url, {"page_size": 2, "ordering": "created"}) == expected
+        descending = walk_pages(auth_client, url, {"page_size": 2, "ordering": "-created"})
+        assert sorted(descending) == sorted(expected) and len(descending) == len(expected), \
+            "Строки пропущены или повторены"
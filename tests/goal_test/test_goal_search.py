@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalSearch:
+    """ Тесты полнотекстового поиска целей и категорий """
+
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, title="Спортивные цели")
+
+    def test_search_russian_stemming(self, auth_client, category) -> None:
+        """
+        Тест, чтобы проверить, что поиск учитывает русскую морфологию
+        и ставит совпадения в заголовке выше совпадений в описании.
+        """
+        in_description = GoalFactory(category=category, title="Здоровье", description="Пробежать марафон")
+        in_title = GoalFactory(category=category, title="Марафоны весной", description="Подготовка")
+        GoalFactory(category=category, title="Прочитать книгу", description="Классика")
+
+        response = auth_client.get(self.url, {"search": "марафонов"})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert [item["id"] for item in response.json()] == [in_title.id, in_description.id]
+        assert "search_headline" not in response.json()[0]
+
+    def test_search_prefix_and_highlight(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить поиск по началу слова и подсветку совпадений """
+        goal = GoalFactory(category=category, title="Выучить английский", description=None)
+
+        response = auth_client.get(self.url, {"search": "англ", "highlight": 1})
+
+        assert [item["id"] for item in response.json()] == [goal.id]
+        assert "<b>английский</b>" in response.json()[0]["search_headline"]
+
+    def test_search_with_keyset_pagination(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что результаты поиска листаются по курсору """
+        goals = GoalFactory.create_batch(size=5, category=category, title="Утренняя пробежка")
+
+        ids, response = [], auth_client.get(self.url, {"search": "пробежка", "page_size": 2})
+        while True:
+            ids += [item["id"] for item in response.json()["results"]]
+            if not response.json()["next"]:
+                break
+            response = auth_client.get(response.json()["next"])
+
+        assert sorted(ids) == sorted(goal.id for goal in goals)
+
+    def test_category_search(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить поиск категорий по названию """
+        response = auth_client.get(reverse("goals:category_list"), {"search": "спортивная"})
+
+        assert [item["id"] for item in response.json()] == [category.id]
+
+    def test_vector_updated_on_text_only(self, category) -> None:
+        """ Тест, чтобы проверить, что поисковый вектор пересчитывается при смене текста, но не статуса """
+        goal = GoalFactory(category=category, title="Марафон")
+        Goal.objects.filter(id=goal.id).update(search_vector=None)
+
+        Goal.objects.filter(id=goal.id).update(status=Goal.Status.done)
+        assert Goal.objects.get(id=goal.id).search_vector is None, "Вектор пересчитан при смене статуса"
+
+        Goal.objects.filter(id=goal.id).update(title="Полумарафон")
+        assert "полумарафон" in Goal.objects.get(id=goal.id).search_vector, "Вектор не пересчитан при смене заголовка"
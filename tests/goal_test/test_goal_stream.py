@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.db import connection
+
+from goals import events
+from goals.events import EventHub, PostgresBackend
+from goals.stream import EventStreamApp
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+def stream_scope(cookie: str = "") -> dict:
+    return {
+        "type": "http", "method": "GET", "path": "/goals/stream", "query_string": b"",
+        "headers": [(b"cookie", cookie.encode())],
+    }
+
+
+async def read_until(communicator, marker: bytes, timeout: float = 3) -> bytes:
+    body = b""
+    while marker not in body:
+        body += (await communicator.receive_output(timeout))["body"]
+    return body
+
+
+class TestEventHub:
+    """ Тесты внутрипроцессной шины событий """
+
+    def test_routing_and_overflow(self) -> None:
+        """ Тест, чтобы проверить, что событие получают только подписчики доски, а переполнение отмечается """
+        async def scenario():
+            hub = EventHub()
+            subscription = hub.subscribe(["board:1"], max_queue=1)
+            hub.deliver({"kind": "goal", "channels": ["board:2"]})
+            assert subscription.queue.empty(), "Получено событие чужой доски"
+
+            hub.deliver({"kind": "goal", "channels": ["board:1", "user:1"]})
+            hub.deliver({"kind": "goal", "channels": ["board:1"]})
+            assert subscription.queue.qsize() == 1 and subscription.overflowed, "Переполнение не отмечено"
+
+            hub.unsubscribe(subscription)
+            assert not hub.channels, "Подписка не удалена"
+
+        asyncio.run(scenario())
+
+
+# События уходят после фиксации транзакции, поэтому тесту нужны настоящие транзакции
+@pytest.mark.django_db(transaction=True)
+class TestEventStream:
+    """ Тесты потока изменений досок """
+
+    def test_stream_board_events(self, client, user) -> None:
+        """ Тест, чтобы проверить, что поток отдает изменения досок пользователя и только их """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board)
+        foreign_category = CategoryFactory()
+        client.force_login(user)
+        cookie = "{}={}".format(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+        async def scenario():
+            communicator = ApplicationCommunicator(EventStreamApp(heartbeat=0.2), stream_scope(cookie))
+            await communicator.send_input({"type": "http.request"})
+            start = await communicator.receive_output(3)
+            assert start["status"] == 200, "Поток не открыт"
+
+            await sync_to_async(GoalFactory)(category=foreign_category)
+            goal = await sync_to_async(GoalFactory)(category=category)
+            body = await read_until(communicator, b"event: goal")
+            assert body.count(b"event: goal") == 1, "Получено событие чужой доски"
+            assert f'"ids": [{goal.id}]'.encode() in body, "Событие без id цели"
+
+            assert b": ping" in await read_until(communicator, b": ping"), "Нет пинга в простое"
+
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(3)
+
+        asyncio.run(scenario())
+
+    def test_listener_reconnect(self, client, user, monkeypatch) -> None:
+        """
+        Тест, чтобы проверить, что после обрыва соединения LISTEN бэкенд переподключается,
+        поток получает `resync`, а следующие события снова доходят.
+        """
+        backend = PostgresBackend()
+        backend.reconnect_delay = 0.1
+        monkeypatch.setattr(events, "_backend", backend)
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board)
+        client.force_login(user)
+        cookie = "{}={}".format(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+        def terminate_listener():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_terminate_backend(%s)", [backend.listener.info.backend_pid])
+
+        async def scenario():
+            communicator = ApplicationCommunicator(EventStreamApp(heartbeat=0.2), stream_scope(cookie))
+            await communicator.send_input({"type": "http.request"})
+            assert (await communicator.receive_output(3))["status"] == 200, "Поток не открыт"
+
+            await sync_to_async(terminate_listener)()
+            assert b"event: resync" in await read_until(communicator, b"event: resync"), "Нет resync после обрыва"
+
+            goal = await sync_to_async(GoalFactory)(category=category)
+            body = await read_until(communicator, b"event: goal")
+            assert f'"ids": [{goal.id}]'.encode() in body, "События не доходят после переподключения"
+
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(3)
+            backend.listener.close()
+
+        asyncio.run(scenario())
+
+    def test_stream_only_application(self) -> None:
+        """ Тест, чтобы проверить, что процесс потока отдает только поток, а не представления API """
+        from todolist.asgi import stream_only_application
+
+        async def scenario():
+            communicator = ApplicationCommunicator(stream_only_application, {**stream_scope(), "path": "/goals/goal/list"})
+            await communicator.send_input({"type": "http.request"})
+            assert (await communicator.receive_output(3))["status"] == 404, "Запрос API обработан процессом потока"
+
+            communicator = ApplicationCommunicator(stream_only_application, stream_scope())
+            await communicator.send_input({"type": "http.request"})
+            assert (await communicator.receive_output(3))["status"] == 403, "Поток не обслуживается"
+
+        asyncio.run(scenario())
+
+    def test_stream_unauthorized(self) -> None:
+        """ Тест, чтобы проверить, что поток недоступен без авторизации """
+        async def scenario():
+            communicator = ApplicationCommunicator(EventStreamApp(), stream_scope())
+            await communicator.send_input({"type": "http.request"})
+            assert (await communicator.receive_output(3))["status"] == 403, "Поток открыт без авторизации"
+
+        asyncio.run(scenario())
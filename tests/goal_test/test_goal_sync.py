@@ -0,0 +1,156 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from goals.models import BoardParticipant, Goal, SyncTombstone
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+def ids(data: list) -> set:
+    return {item["id"] for item in data}
+
+
+# Курсор — номер транзакции, поэтому изменения должны фиксироваться по-настоящему, а не в общей транзакции теста
+@pytest.mark.django_db(transaction=True)
+class TestSyncView:
+    """ Тесты дельта-синхронизации """
+    url: str = reverse("goals:sync")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def sync(self, client, since=None) -> dict:
+        response = client.get(self.url, {"since": since} if since is not None else {})
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        return response.json()
+
+    def test_full_then_empty(self, auth_client, category) -> None:
+        """ Тест, чтобы проверить, что без курсора отдается все, а без изменений — ничего """
+        goal = GoalFactory(category=category)
+        comment = GoalCommentFactory(goal=goal)
+        GoalFactory()
+
+        data = self.sync(auth_client)
+        assert ids(data["goals"]) == {goal.id}, "Неверный список целей"
+        assert ids(data["comments"]) == {comment.id}, "Неверный список комментариев"
+        assert ids(data["categories"]) == {category.id}, "Неверный список категорий"
+
+        data = self.sync(auth_client, data["cursor"])
+        assert not any(data[key] for key in ("boards", "participants", "categories", "goals", "comments",
+                                             "deleted", "lost_boards")), "Без изменений получены объекты"
+
+    def test_changes_and_tombstones(self, auth_client, user, category) -> None:
+        """
+        Тест, чтобы проверить, что отдаются измененные объекты, включая массовую архивацию каскадом,
+        и удаленные комментарии.
+        """
+        changed, untouched = GoalFactory.create_batch(size=2, category=category)
+        comment = GoalCommentFactory(goal=untouched, user=user)
+        other_category = CategoryFactory(board=category.board)
+        archived = GoalFactory(category=other_category)
+        cursor = self.sync(auth_client)["cursor"]
+
+        changed.title = "Новое название"
+        changed.save()
+        auth_client.delete(reverse("goals:comment_pk", kwargs={"pk": comment.id}))
+        auth_client.delete(reverse("goals:category_pk", kwargs={"pk": other_category.id}))
+
+        data = self.sync(auth_client, cursor)
+        assert ids(data["goals"]) == {changed.id, archived.id}, "Неверный список измененных целей"
+        assert Goal.Status.archived in {goal["status"] for goal in data["goals"]}, "Архивация не отдана"
+        assert ids(data["categories"]) == {other_category.id}, "Удаленная категория не отдана"
+        assert data["deleted"] == [{"kind": "comment", "id": comment.id, "board": category.board_id}], \
+            "Удаленный комментарий не отдан"
+
+    def test_lost_and_joined_board(self, auth_client, another_user, category) -> None:
+        """
+        Тест, чтобы проверить, что удаленный с доски участник получает ее в `lost_boards`,
+        а добавленный — все объекты доски.
+        """
+        goal = GoalFactory(category=category)
+        participant = BoardParticipantFactory(board=category.board, user=another_user,
+                                              role=BoardParticipant.Role.reader)
+        participant_id = participant.id
+        client = APIClient()
+        client.force_login(another_user)
+        cursor = self.sync(client)["cursor"]
+
+        participant.delete()
+        data = self.sync(client, cursor)
+        assert data["lost_boards"] == [category.board_id], "Потеря доступа не отдана"
+        assert data["deleted"] == [], "Лишние удаленные объекты"
+        assert self.sync(auth_client, cursor)["deleted"] == [
+            {"kind": "participant", "id": participant_id, "board": category.board_id},
+        ], "Удаление участника не отдано остальным участникам"
+
+        cursor = data["cursor"]
+        BoardParticipantFactory(board=category.board, user=another_user, role=BoardParticipant.Role.reader)
+        data = self.sync(client, cursor)
+        assert ids(data["goals"]) == {goal.id}, "Новому участнику не отданы объекты доски"
+        assert ids(data["categories"]) == {category.id}, "Новому участнику не отданы категории"
+
+    def test_invalid_cursor(self, auth_client) -> None:
+        """ Тест, чтобы проверить ответ на неверный курсор """
+        response = auth_client.get(self.url, {"since": "abc"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "Неверный курсор принят"
+
+    def test_pages(self, auth_client, settings, category) -> None:
+        """ Тест, чтобы проверить, что ответ разбит на страницы и обход по `next` отдает каждый объект один раз """
+        settings.GOALS_SYNC_PAGE_SIZE = 2
+        goals = GoalFactory.create_batch(size=3, category=category)
+        comment = GoalCommentFactory(goal=goals[0])
+
+        data, pages, received = self.sync(auth_client), 1, []
+        cursor = data["cursor"]
+        while True:
+            assert sum(len(data[key]) for key in ("boards", "participants", "categories", "goals", "comments",
+                                                  "deleted")) <= 2, "Страница больше лимита"
+            received += [(key, item["id"]) for key in ("boards", "categories", "goals", "comments")
+                         for item in data[key]]
+            assert data["cursor"] == cursor, "Курсор изменился между страницами"
+            if not data["has_more"]:
+                break
+            response = auth_client.get(self.url, {"next": data["next"]})
+            assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            data, pages = response.json(), pages + 1
+
+        assert data["next"] is None, "На последней странице есть продолжение"
+        assert pages == 4, "Неверное число страниц"
+        assert sorted(received) == sorted([("boards", category.board_id), ("categories", category.id),
+                                           ("comments", comment.id)] + [("goals", goal.id) for goal in goals]), \
+            "Объекты потеряны или повторены"
+
+    def test_invalid_page(self, auth_client) -> None:
+        """ Тест, чтобы проверить ответ на поврежденное продолжение """
+        response = auth_client.get(self.url, {"next": "abc"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "Неверное продолжение принято"
+
+    def test_expired_cursor(self, auth_client, user, category) -> None:
+        """
+        Тест, чтобы проверить, что `prunetombstones` удаляет старые записи об удалениях,
+        а курсор старше них получает 410 вместо ответа без удалений.
+        """
+        comments = GoalCommentFactory.create_batch(size=2, goal=GoalFactory(category=category), user=user)
+        old_cursor = self.sync(auth_client)["cursor"]
+        auth_client.delete(reverse("goals:comment_pk", kwargs={"pk": comments[0].id}))
+        SyncTombstone.objects.update(created=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+        cursor = self.sync(auth_client)["cursor"]
+        auth_client.delete(reverse("goals:comment_pk", kwargs={"pk": comments[1].id}))
+
+        call_command("prunetombstones")
+        assert list(SyncTombstone.objects.values_list("object_id", flat=True)) == [comments[1].id], \
+            "Удалены не те записи"
+
+        response = auth_client.get(self.url, {"since": old_cursor})
+        assert response.status_code == status.HTTP_410_GONE, "Устаревший курсор принят"
+        assert response.json()["full_resync"], "Нет признака полной синхронизации"
+        assert self.sync(auth_client, cursor)["deleted"] == [
+            {"kind": "comment", "id": comments[1].id, "board": category.board_id},
+        ], "Свежий курсор не принят"
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+def participant_queries(context: CaptureQueriesContext) -> int:
+    """ Количество запросов, обращающихся к таблице участников досок """
+    return sum(BoardParticipant._meta.db_table in query["sql"] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestGoalUpdateView:
+    """ Тесты редактирования Goal """
+
+    def test_goal_update_writer(self, auth_client, user) -> None:
+        """
+        Тест, чтобы проверить, что редактор доски может изменить цель,
+        а роль пользователя загружается один раз на запрос.
+        """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+        another_category = CategoryFactory(board=board)
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.patch(url, data={"title": "Updated", "category": another_category.id})
+
+        goal.refresh_from_db()
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert goal.category == another_category
+        assert participant_queries(context) == 1, "Роли пользователя загружались несколько раз"
+
+    def test_goal_update_reader(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что читатель доски не может изменить цель """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+
+        response = auth_client.patch(reverse("goals:goal_pk", kwargs={"pk": goal.id}), data={"title": "Updated"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "Отказ в доступе не предоставлен"
+        assert Goal.objects.get(id=goal.id).title == goal.title
+
+    def test_comment_create_single_role_query(self, auth_client, user) -> None:
+        """ Тест, чтобы проверить, что создание комментария проверяет роль одним запросом """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.post(reverse("goals:comment_create"), data={"goal": goal.id, "text": "text"})
+
+        assert response.status_code == status.HTTP_201_CREATED, "Комментарий не создался"
+        assert participant_queries(context) == 1, "Роли пользователя загружались несколько раз"
+
+    def test_goal_board_follows_category(self) -> None:
+        """ Тест, чтобы проверить, что доска цели и ее комментариев меняется вместе с категорией """
+        goal = GoalFactory()
+        comment = GoalCommentFactory(goal=goal)
+        assert goal.board_id == goal.category.board_id
+        assert comment.board_id == goal.board_id
+
+        goal = Goal.objects.get(id=goal.id)
+        goal.category = CategoryFactory()
+        goal.save()
+
+        comment.refresh_from_db()
+        assert goal.board_id == goal.category.board_id
+        assert comment.board_id == goal.board_id, "Комментарий остался на старой доске"
@@ -5,12 +5,68 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Поток изменений досок (`/goals/stream`) обслуживается отдельным ASGI-приложением.
+В docker-compose это отдельный процесс `uvicorn todolist.asgi:stream_only_application`,
+а API работает под WSGI. `application` (поток и Django вместе) — для разработки одним процессом.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from goals.stream import EventStreamApp  # noqa: E402 — модели доступны только после инициализации Django
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """
+    ASGIHandler, который перебирает потоковые ответы с `__aiter__` асинхронно, как Django 4.2:
+    обработчик 4.1 перебирает `streaming_content` в цикле событий, и запросы к БД в генераторе падают.
+    """
+
+    async def send_response(self, response, send):
+        if not (response.streaming and hasattr(response, "__aiter__")):
+            return await super().send_response(response, send)
+
+        headers = [(header.encode("ascii"), value.encode("latin1")) for header, value in response.items()]
+        headers += [(b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+                    for cookie in response.cookies.values()]
+        try:
+            await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+            async for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body"})
+        finally:
+            # Закрывает генератор и его серверный курсор, в том числе если клиент отключился
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+
+STREAM_PATH = "/goals/stream"
+django_application = ASGIHandler()
+stream_application = EventStreamApp()
+
+
+def is_stream(scope) -> bool:
+    return scope["type"] == "http" and scope["path"] == STREAM_PATH and scope["method"] == "GET"
+
+
+async def application(scope, receive, send):
+    if is_stream(scope):
+        return await stream_application(scope, receive, send)
+    return await django_application(scope, receive, send)
+
+
+async def stream_only_application(scope, receive, send):
+    """ Только поток изменений: представления Django в этом процессе не выполняются """
+    if is_stream(scope):
+        return await stream_application(scope, receive, send)
+    if scope["type"] == "http":
+        await send({"type": "http.response.start", "status": 404, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"Not Found"})
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     'rest_framework',
     "django_filters",
     "social_django",
@@ -175,4 +176,69 @@ SOCIAL_AUTH_VK_OAUTH2_SECRET = os.environ.get("SOCIAL_AUTH_VK_OAUTH2_SECRET")
 SOCIAL_AUTH_LOGIN_REDIRECT_URL = "/logged-in/"
 SOCIAL_AUTH_LOGIN_ERROR_URL = "/login-error/"
 
-BOT_TOKEN = os.environ.get("BOT_TOKEN")
\ No newline at end of file
+BOT_TOKEN = os.environ.get("BOT_TOKEN")
+BOT_CONCURRENT_UPDATES = int(os.environ.get("BOT_CONCURRENT_UPDATES", default=32))  # чатов одновременно
+BOT_DB_THREADS = int(os.environ.get("BOT_DB_THREADS", default=8))  # потоков (и соединений с БД) для обработчиков
+BOT_MAX_PENDING_UPDATES = int(os.environ.get("BOT_MAX_PENDING_UPDATES", default=1000))  # затем polling ждет
+BOT_POLL_TIMEOUT = 30  # секунд long polling
+# Очередь исходящих сообщений (bot/outbox.py): лимиты Telegram — около 30 сообщений в секунду и 1 в секунду в чат
+BOT_API_URL = os.environ.get("BOT_API_URL", default="https://api.telegram.org")
+BOT_OUTBOX_WORKERS = int(os.environ.get("BOT_OUTBOX_WORKERS", default=4))
+BOT_RATE_LIMIT = float(os.environ.get("BOT_RATE_LIMIT", default=30))  # сообщений в секунду всего
+BOT_CHAT_RATE_LIMIT = float(os.environ.get("BOT_CHAT_RATE_LIMIT", default=1))  # сообщений в секунду в один чат
+BOT_CHAT_BURST = int(os.environ.get("BOT_CHAT_BURST", default=1))  # сообщений в чат подряд без паузы
+BOT_SEND_RETRIES = int(os.environ.get("BOT_SEND_RETRIES", default=5))  # повторов при 429 и сетевых ошибках
+# HTTP-сессия TgClient (bot/tg/client.py)
+BOT_HTTP_POOL_SIZE = int(os.environ.get("BOT_HTTP_POOL_SIZE", default=8))  # keep-alive соединений с API
+BOT_HTTP_RETRIES = int(os.environ.get("BOT_HTTP_RETRIES", default=3))  # повторов соединения и GET-запросов
+BOT_CONNECT_TIMEOUT = float(os.environ.get("BOT_CONNECT_TIMEOUT", default=5))  # секунд
+BOT_READ_TIMEOUT = float(os.environ.get("BOT_READ_TIMEOUT", default=10))  # секунд, сверх ожидания long polling
+# Прием обновлений через webhook (bot/webhook.py, команда setwebhook) вместо runbot
+BOT_WEBHOOK_SECRET = os.environ.get("BOT_WEBHOOK_SECRET")  # без него webhook отклоняет все запросы
+BOT_WEBHOOK_WORKERS = int(os.environ.get("BOT_WEBHOOK_WORKERS", default=4))  # потоков обработки в процессе Django
+BOT_WEBHOOK_MAX_PENDING = int(os.environ.get("BOT_WEBHOOK_MAX_PENDING", default=1000))  # затем 503
+BOT_PAGE_SIZE = int(os.environ.get("BOT_PAGE_SIZE", default=10))  # строк на страницу в списках /goals и /board
+# Состояния диалогов по чатам (bot/state.py); для нескольких процессов бота — bot.state.DatabaseStateStore
+BOT_STATE_BACKEND = os.environ.get("BOT_STATE_BACKEND", default="bot.state.MemoryStateStore")
+BOT_STATE_TTL = int(os.environ.get("BOT_STATE_TTL", default=3600))  # секунд без ответа до сброса диалога
+
+# Каскадное удаление досок и категорий (goals/cascade.py)
+GOALS_CASCADE_ASYNC = bool(int(os.environ.get("GOALS_CASCADE_ASYNC", default=0)))  # всегда в фоне, без `?async=1`
+GOALS_CASCADE_CHUNK_SIZE = int(os.environ.get("GOALS_CASCADE_CHUNK_SIZE", default=1000))
+GOALS_CASCADE_STALE_AFTER = 300  # секунд без прогресса, после которых задачу подхватывает другой воркер
+
+# Цели в архиве дольше этого срока переносятся командой `archivegoals` в таблицы архива (goals/archive.py)
+GOALS_ARCHIVE_AFTER_DAYS = int(os.environ.get("GOALS_ARCHIVE_AFTER_DAYS", default=30))
+GOALS_ARCHIVE_BATCH_SIZE = int(os.environ.get("GOALS_ARCHIVE_BATCH_SIZE", default=1000))
+
+# Дельта-синхронизация (goals/sync.py): объектов в одной странице ответа и срок хранения записей об удалениях;
+# старые записи вычищает команда `prunetombstones`, курсоры старше срока получают 410 и синхронизируются заново
+GOALS_SYNC_PAGE_SIZE = int(os.environ.get("GOALS_SYNC_PAGE_SIZE", default=1000))
+GOALS_SYNC_TOMBSTONE_DAYS = int(os.environ.get("GOALS_SYNC_TOMBSTONE_DAYS", default=30))
+
+# Кеш списков досок и категорий (goals/cache.py). Локальная память подходит для одного процесса
+# и тестов; в проде GOALS_CACHE_BACKEND указывает на общий бекенд, например
+# django.core.cache.backends.redis.RedisCache с GOALS_CACHE_LOCATION=redis://...
+GOALS_CACHE_BACKEND = os.environ.get("GOALS_CACHE_BACKEND", default="goals.cache_backends.SizeBoundedLocMemCache")
+GOALS_CACHE = {
+    "BACKEND": GOALS_CACHE_BACKEND,
+    "LOCATION": os.environ.get("GOALS_CACHE_LOCATION", default="goals"),
+    "TIMEOUT": int(os.environ.get("GOALS_CACHE_TIMEOUT", default=300)),
+}
+if GOALS_CACHE_BACKEND == "goals.cache_backends.SizeBoundedLocMemCache":
+    GOALS_CACHE["OPTIONS"] = {
+        "MAX_SIZE": int(os.environ.get("GOALS_CACHE_MAX_SIZE", default=64 * 1024 * 1024)),  # байт
+        "MAX_ENTRIES": int(os.environ.get("GOALS_CACHE_MAX_ENTRIES", default=10000)),
+    }
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "goals": GOALS_CACHE,
+}
+
+# Поток изменений досок (goals/stream.py). LocalBackend доставляет события только в пределах процесса:
+# изменения из других процессов (runcascade, runbot, webhook-воркеры другого процесса, importgoals)
+# и других воркеров до потоков не доходят. Поэтому в docker-compose задан goals.events.PostgresBackend
+# (LISTEN/NOTIFY); LocalBackend по умолчанию — для разработки и тестов с одним процессом
+GOALS_EVENTS_BACKEND = os.environ.get("GOALS_EVENTS_BACKEND", default="goals.events.LocalBackend")
+GOALS_EVENTS_HEARTBEAT = 15  # секунд между пингами простаивающего потока